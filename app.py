@@ -1,22 +1,38 @@
 from flask import Flask
 from config import configure_app, db
-from blueprints.auth.routes import auth_bp
-from blueprints.main.routes import main_bp
-from blueprints.hackathon.routes import hackathon_bp
-from blueprints.certificates.routes import certificates_bp
-from blueprints.csv.routes import csv_bp
-from blueprints.bulk_email.routes import bulk_email_bp
 
-app = Flask(__name__)
-configure_app(app)
+def register_blueprints(app: Flask):
+    """Register blueprints; their route modules defer pandas, PyMuPDF and Pillow until first use"""
+    from blueprints.auth.routes import auth_bp
+    from blueprints.main.routes import main_bp
+    from blueprints.hackathon.routes import hackathon_bp
+    from blueprints.certificates.routes import certificates_bp
+    from blueprints.csv.routes import csv_bp
+    from blueprints.bulk_email.routes import bulk_email_bp
+    
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(main_bp)
+    app.register_blueprint(hackathon_bp)
+    app.register_blueprint(certificates_bp)
+    app.register_blueprint(csv_bp)
+    app.register_blueprint(bulk_email_bp)
+    
+    if app.config.get('PROFILING_ENABLED'):
+        from blueprints.profiling.routes import profiling_bp
+        app.register_blueprint(profiling_bp)
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(main_bp)
-app.register_blueprint(hackathon_bp)
-app.register_blueprint(certificates_bp)
-app.register_blueprint(csv_bp)
-app.register_blueprint(bulk_email_bp)
+def create_app():
+    """Application factory"""
+    app = Flask(__name__)
+    configure_app(app)
+    register_blueprints(app)
+    
+    from instrumentation import init_instrumentation
+    from metrics import init_metrics
+    with app.app_context():
+        init_instrumentation(app, db.engine)
+    init_metrics(app)
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
@@ -0,0 +1,410 @@
+"""
+End-to-end benchmark of a full hackathon lifecycle on synthetic data
+
+    python benchmarks/lifecycle.py --sizes 1000 10000 50000 --output lifecycle-report.json
+
+For each size N a fresh process builds a throwaway database and uploads folder,
+generates a Google-Forms-style registration CSV with N participants and a PNG
+and PDF certificate template, then drives the real routes through Flask's test
+client:
+
+    upload_templates      POST /hackathon/<id>/templates/upload (PNG + PDF)
+    upload_csv            POST /hackathon/<id>/participants/upload
+    send_certificates     POST /hackathon/<id>/participants/send (render + send)
+    upload_contacts       POST /bulk-email/upload
+    send_template_emails  POST /bulk-email/templates/send
+
+Mail goes to an in-process SMTP sink (STARTTLS + AUTH, discards messages), so
+the numbers cover rendering, MIME building and the SMTP round trips without a
+real provider. Each stage records wall time, current and peak RSS; the JSON
+report can be diffed between runs. App output goes to <workdir>/app.log.
+
+Certificate sends render and mail one full-size PNG per participant, so at the
+larger sizes use --send-limit to time that stage on a slice of the hackathon.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import socketserver
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [1000, 10000, 50000]
+MEMBERS_PER_TEAM = 3
+BENCH_USERNAME = 'bench'
+BENCH_PASSWORD = 'bench-password'
+
+# --- SMTP sink -----------------------------------------------------------------
+
+def make_self_signed_cert(directory):
+    """Write a throwaway certificate/key pair for the sink's STARTTLS"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.utcnow()
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now - timedelta(days=1))
+            .not_valid_after(now + timedelta(days=1)).sign(key, hashes.SHA256()))
+
+    cert_path = os.path.join(directory, 'sink-cert.pem')
+    key_path = os.path.join(directory, 'sink-key.pem')
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return cert_path, key_path
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough ESMTP for smtplib: EHLO, STARTTLS, AUTH, MAIL, RCPT, DATA, RSET, QUIT"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+        self.wfile.flush()
+
+    def handle(self):
+        self.reply('220 localhost ESMTP sink')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb in ('EHLO', 'HELO'):
+                self.wfile.write(b'250-localhost\r\n250-SIZE 104857600\r\n250-AUTH PLAIN LOGIN\r\n')
+                self.reply('250 STARTTLS' if not isinstance(self.connection, ssl.SSLSocket) else '250 8BITMIME')
+            elif verb == 'STARTTLS':
+                self.reply('220 Ready to start TLS')
+                self.connection = self.server.tls_context.wrap_socket(self.connection, server_side=True)
+                self.request = self.connection
+                self.rfile = self.connection.makefile('rb')
+                self.wfile = self.connection.makefile('wb')
+            elif verb == 'AUTH':
+                self.reply('235 Authentication successful')
+            elif verb in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line == b'.\r\n':
+                        break
+                    size += len(data_line)
+                self.server.record_message(size)
+                self.reply('250 OK queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, cert_path, key_path):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.tls_context.load_cert_chain(cert_path, key_path)
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def record_message(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='smtp-sink', daemon=True).start()
+        return self.server_address[1]
+
+# --- Synthetic inputs ---------------------------------------------------------------
+
+def write_registration_csv(path, participants):
+    """Google Forms team-registration export with `participants` members in teams of up to 3"""
+    import csv
+    headers = ['Timestamp', 'Team Name (leave empty if solo)', 'Number of Members']
+    for ordinal in ('1st', '2nd', '3rd'):
+        headers += [f'Name of {ordinal} Member:', f'Contact Number of {ordinal} Member:', f'Email of {ordinal} Member:']
+    headers.append('Completion Remarks')
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        started = datetime(2026, 1, 15, 10, 0, 0)
+        for team, first in enumerate(range(0, participants, MEMBERS_PER_TEAM)):
+            members = range(first, min(first + MEMBERS_PER_TEAM, participants))
+            row = [(started + timedelta(seconds=team)).strftime('%Y-%m-%d %H:%M:%S'), f'Team {team:06d}', len(members)]
+            for index in range(MEMBERS_PER_TEAM):
+                member = first + index
+                if member in members:
+                    row += [f'Participant {member:06d}', f'9{member:09d}', f'participant{member:06d}@bench.example.com']
+                else:
+                    row += ['', '', '']
+            row.append('Great project' if team % 10 else '')
+            writer.writerow(row)
+
+def write_contacts_csv(path, contacts):
+    import csv
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Email', 'team'])
+        for index in range(contacts):
+            writer.writerow([f'Contact {index:06d}', f'contact{index:06d}@bench.example.com', f'Team {index // MEMBERS_PER_TEAM:06d}'])
+
+def write_templates(directory):
+    """A landscape A4-ish PNG and a one-page PDF certificate template"""
+    import fitz
+    from PIL import Image, ImageDraw
+
+    png_path = os.path.join(directory, 'bench_template.png')
+    image = Image.new('RGB', (2480, 1754), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([60, 60, 2420, 1694], outline='navy', width=20)
+    draw.text((900, 300), 'CERTIFICATE OF PARTICIPATION', fill='navy')
+    image.save(png_path)
+
+    pdf_path = os.path.join(directory, 'bench_template.pdf')
+    document = fitz.open()
+    page = document.new_page(width=842, height=595)
+    page.draw_rect(fitz.Rect(20, 20, 822, 575), color=(0, 0, 0.5), width=6)
+    page.insert_text((260, 120), 'CERTIFICATE OF PARTICIPATION', fontsize=24)
+    document.save(pdf_path)
+    document.close()
+    return png_path, pdf_path
+
+# --- Measurement --------------------------------------------------------------------
+
+def current_rss_mb():
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class StageRecorder:
+    def __init__(self, log):
+        self.stages = {}
+        self.log = log
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        print(f"  {name} ...", file=sys.stderr, flush=True)
+        info = {}
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(self.log):
+            yield info
+        info['seconds'] = round(time.perf_counter() - started, 3)
+        info['rss_mb'] = round(current_rss_mb(), 1)
+        info['peak_rss_mb'] = round(peak_rss_mb(), 1)
+        self.stages[name] = info
+        print(f"  {name}: {info['seconds']}s, peak RSS {info['peak_rss_mb']} MB", file=sys.stderr, flush=True)
+
+def expect_redirect(response, stage):
+    if response.status_code not in (200, 302):
+        raise RuntimeError(f"{stage} returned HTTP {response.status_code}")
+    return response
+
+# --- One lifecycle run --------------------------------------------------------------
+
+def run_lifecycle(participants, workdir, send_limit=None, template_kind='png'):
+    """Run every stage for one size inside workdir; returns the run record"""
+    os.makedirs(workdir, exist_ok=True)
+    log = open(os.path.join(workdir, 'app.log'), 'w')
+    recorder = StageRecorder(log)
+
+    cert_path, key_path = make_self_signed_cert(workdir)
+    sink = SMTPSink(cert_path, key_path)
+    os.environ.update({
+        'DATABASE_URL': 'sqlite:///' + os.path.join(workdir, 'bench.sqlite3'),
+        'SECRET_KEY': os.environ.get('SECRET_KEY') or 'lifecycle-benchmark-secret-key-0123456789',
+        'SMTP_SERVER': '127.0.0.1',
+        'SMTP_PORT': str(sink.start()),
+        'EMAIL_ADDRESS': 'bench@bench.example.com',
+        'EMAIL_PASSWORD': 'bench',
+        'METRICS_ENABLED': 'false',
+    })
+    # Uploads are stored relative to the working directory
+    os.chdir(workdir)
+    sys.path.insert(0, PACKAGE_ROOT)
+
+    with recorder.stage('generate_inputs') as info:
+        csv_path = os.path.join(workdir, 'registrations.csv')
+        contacts_path = os.path.join(workdir, 'contacts.csv')
+        write_registration_csv(csv_path, participants)
+        write_contacts_csv(contacts_path, participants)
+        png_path, pdf_path = write_templates(workdir)
+        info['csv_bytes'] = os.path.getsize(csv_path)
+
+    with recorder.stage('app_startup'):
+        from werkzeug.security import generate_password_hash
+        from app import create_app
+        from config import db
+        from models import User, Hackathon, CertificateTemplate, Participant
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            user = User(username=BENCH_USERNAME, email='bench@bench.example.com',
+                        password_hash=generate_password_hash(BENCH_PASSWORD))
+            db.session.add(user)
+            db.session.flush()
+            hackathon = Hackathon(name='Benchmark Hackathon', user_id=user.id,
+                                  feedback_form_link='https://forms.example.com/feedback')
+            db.session.add(hackathon)
+            db.session.commit()
+            user_id, hackathon_id = user.id, hackathon.id
+
+        client = app.test_client()
+        expect_redirect(client.post('/auth/login', data={'username': BENCH_USERNAME, 'password': BENCH_PASSWORD}), 'login')
+
+    with recorder.stage('upload_templates'):
+        for kind, path in (('png', png_path), ('pdf', pdf_path)):
+            with open(path, 'rb') as f:
+                expect_redirect(client.post(f'/hackathon/{hackathon_id}/templates/upload', data={
+                    'name': f'Bench {kind.upper()}', 'file': (f, os.path.basename(path))
+                }, content_type='multipart/form-data'), 'upload_templates')
+        with app.app_context():
+            templates = {t.filename.rsplit('.', 1)[1].lower(): t.id
+                         for t in CertificateTemplate.query.filter_by(hackathon_id=hackathon_id)}
+        if set(templates) != {'png', 'pdf'}:
+            raise RuntimeError(f"Template upload failed, got {sorted(templates)}; see {log.name}")
+
+    with recorder.stage('upload_csv') as info:
+        with open(csv_path, 'rb') as f:
+            expect_redirect(client.post(f'/hackathon/{hackathon_id}/participants/upload', data={
+                'csv_file': (f, 'registrations.csv')
+            }, content_type='multipart/form-data'), 'upload_csv')
+        with app.app_context():
+            info['participants'] = Participant.query.filter_by(hackathon_id=hackathon_id).count()
+        if info['participants'] != participants:
+            raise RuntimeError(f"Expected {participants} participants, ingested {info['participants']}")
+
+    with recorder.stage('send_certificates') as info:
+        form = {'template_id': templates[template_kind]}
+        if send_limit:
+            with app.app_context():
+                ids = [row.id for row in Participant.query.filter_by(hackathon_id=hackathon_id)
+                       .order_by(Participant.id).limit(send_limit)]
+            form.update({'selection_mode': 'ids', 'participants': [str(i) for i in ids]})
+        else:
+            form.update({'selection_mode': 'filter', 'status': 'unsent'})
+        before = sink.messages
+        expect_redirect(client.post(f'/hackathon/{hackathon_id}/participants/send', data=form), 'send_certificates')
+        info['template'] = template_kind
+        info['messages'] = sink.messages - before
+
+    with recorder.stage('upload_contacts'):
+        with open(contacts_path, 'rb') as f:
+            expect_redirect(client.post('/bulk-email/upload', data={
+                'contacts_file': (f, 'contacts.csv'), 'use_templates': 'true'
+            }, content_type='multipart/form-data'), 'upload_contacts')
+        expect_redirect(client.post('/bulk-email/templates/create', data={
+            'name': 'Bench reminder',
+            'subject': 'Hello {{name}}',
+            'body': 'Hi {{name}}, your team {{team}} is confirmed. Reply to {{email}} with questions.',
+            'description': 'Lifecycle benchmark',
+        }), 'create_template')
+
+    with recorder.stage('send_template_emails') as info:
+        from blueprints.bulk_email.template_utils import get_user_templates
+        with app.app_context():
+            template_id = get_user_templates(user_id)[0]['id']
+        before = sink.messages
+        expect_redirect(client.post('/bulk-email/templates/send', data={
+            'template_id': template_id, 'sender_name': 'Bench'
+        }), 'send_template_emails')
+        info['messages'] = sink.messages - before
+
+    for name in ('send_certificates', 'send_template_emails'):
+        stage = recorder.stages[name]
+        stage['messages_per_second'] = round(stage['messages'] / stage['seconds'], 1) if stage['seconds'] else 0
+    upload = recorder.stages['upload_csv']
+    upload['rows_per_second'] = round(upload['participants'] / upload['seconds'], 1) if upload['seconds'] else 0
+
+    sink.shutdown()
+    log.close()
+    return {
+        'participants': participants,
+        'send_limit': send_limit,
+        'stages': recorder.stages,
+        'total_seconds': round(sum(stage['seconds'] for stage in recorder.stages.values()), 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'smtp_sink_bytes': sink.bytes,
+    }
+
+# --- Driver -------------------------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PACKAGE_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Participant counts to run')
+    parser.add_argument('--output', default='lifecycle-report.json')
+    parser.add_argument('--workdir', help='Keep run directories here instead of a temporary directory')
+    parser.add_argument('--send-limit', type=int, help='Only render and send certificates for the first N participants')
+    parser.add_argument('--template', choices=['png', 'pdf'], default='png', help='Certificate template to send with')
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        # Child process: one size, record printed as JSON on the last stdout line
+        record = run_lifecycle(args.single, args.workdir, args.send_limit, args.template)
+        sys.stdout.write(json.dumps(record) + '\n')
+        return
+
+    base_dir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix='lifecycle-bench-')
+    runs = []
+    try:
+        for size in args.sizes:
+            print(f"{size} participants", file=sys.stderr, flush=True)
+            command = [sys.executable, os.path.abspath(__file__), '--single', str(size),
+                       '--workdir', os.path.join(base_dir, str(size)), '--template', args.template]
+            if args.send_limit:
+                command += ['--send-limit', str(args.send_limit)]
+            # Separate process per size so peak RSS is not carried over between runs
+            result = subprocess.run(command, stdout=subprocess.PIPE, text=True, check=True)
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'runs': runs,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Load test for the main routes, used to size gunicorn workers and threads
+
+    python benchmarks/route_load.py --base-url http://127.0.0.1:8000 \
+        --username admin --password secret --concurrency 16 --duration 30
+
+Logs in once, then hammers the dashboard, hackathon and participant pages
+from --concurrency threads for --duration seconds and prints throughput and
+latency percentiles per route. Run it against the real server (gunicorn with
+gunicorn.conf.py), not the Flask dev server.
+"""
+import argparse
+import http.cookiejar
+import itertools
+import re
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def login(base_url, username, password):
+    """Log in through the form and return the cookie jar holding the session"""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    data = urllib.parse.urlencode({'username': username, 'password': password}).encode()
+    opener.open(f"{base_url}/auth/login", data=data, timeout=30).read()
+    if not any(cookie.name == 'session' for cookie in jar):
+        raise SystemExit('Login failed: no session cookie returned')
+    return jar
+
+def discover_hackathon_id(opener, base_url):
+    """Pick the first hackathon linked from the hackathon list"""
+    html = opener.open(f"{base_url}/hackathons", timeout=30).read().decode('utf-8', 'replace')
+    match = re.search(r'/hackathons/(\d+)', html)
+    return int(match.group(1)) if match else None
+
+def build_routes(hackathon_id):
+    routes = ['/dashboard', '/hackathons', '/bulk-email/templates']
+    if hackathon_id:
+        routes += [
+            f'/hackathons/{hackathon_id}',
+            f'/hackathon/{hackathon_id}/participants',
+            f'/hackathon/{hackathon_id}/participants/data?limit=100',
+        ]
+    return routes
+
+def run_load(base_url, jar, routes, concurrency, duration):
+    """Request the routes round-robin from worker threads; returns (latencies, errors) keyed by route"""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(offset):
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+        for route in itertools.islice(itertools.cycle(routes), offset, None):
+            if time.monotonic() >= deadline:
+                return
+            started = time.perf_counter()
+            try:
+                with opener.open(base_url + route, timeout=60) as response:
+                    response.read()
+                    ok = response.status == 200
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                if ok:
+                    latencies[route].append(elapsed)
+                else:
+                    errors[route] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--hackathon-id', type=int, help='Defaults to the first hackathon on /hackathons')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20)
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    jar = login(base_url, args.username, args.password)
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    hackathon_id = args.hackathon_id or discover_hackathon_id(opener, base_url)
+    routes = build_routes(hackathon_id)
+
+    latencies, errors = run_load(base_url, jar, routes, args.concurrency, args.duration)
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{args.concurrency} threads, {args.duration:.0f}s: {total} ok requests, "
+          f"{total / args.duration:.1f} req/s, {sum(errors.values())} errors")
+    print(f"{'route':55} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for route in routes:
+        values = sorted(latencies[route])
+        print(f"{route:55} {len(values):>7} {percentile(values, 0.50) * 1000:>8.1f} "
+              f"{percentile(values, 0.95) * 1000:>8.1f} {percentile(values, 0.99) * 1000:>8.1f} {errors[route]:>7}")
+
+if __name__ == '__main__':
+    main()
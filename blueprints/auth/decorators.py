@@ -1,8 +1,6 @@
 from functools import wraps
 from flask import session, flash, redirect, url_for, current_app
-from flask_jwt_extended import decode_token
-from models import User
-import traceback
+from .utils import resolve_identity
 
 def login_required(f):
     @wraps(f)
@@ -12,18 +10,14 @@ def login_required(f):
             flash('Please log in to access this page.', 'error')
             return redirect(url_for('auth.login'))        
         try:
-            # Decode token using Flask-JWT-Extended
-            decoded_token = decode_token(token)
-            user_id = int(decoded_token['sub'])  # Convert string back to int
-            current_user = User.query.get(user_id)
+            # Verified token -> user snapshot, cached per request and for a short TTL
+            current_user = resolve_identity(token)
             if not current_user:
                 flash('Invalid session. Please log in again.', 'error')
                 return redirect(url_for('auth.login'))
         except Exception as e:
-            # Debug: print the actual error
-            print(f"JWT Decode Error: {e}")
-            print(f"Token: {token}")
-            traceback.print_exc()
+            # Never log the token itself
+            current_app.logger.info("Rejected session token: %s", type(e).__name__)
             flash('Your session has expired. Please log in again.', 'error')
             return redirect(url_for('auth.login'))
         return f(current_user, *args, **kwargs)
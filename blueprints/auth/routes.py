@@ -3,6 +3,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from config import db
 from models import User
+from .utils import invalidate_identity
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -57,6 +58,8 @@ def login():
     user = User.query.filter_by(username=username).first()
     if user and check_password_hash(user.password_hash, password):
         token = create_access_token(identity=str(user.id))  
+        if session.get('token'):
+            invalidate_identity(token=session['token'])
         session['token'] = token
         session['user_id'] = user.id
         flash('Login successful!', 'success')
@@ -68,6 +71,8 @@ def login():
 
 @auth_bp.route('/logout')
 def logout():
+    if session.get('token'):
+        invalidate_identity(token=session['token'])
     session.clear()
     flash('You have been logged out.', 'info')
     return redirect(url_for('auth.login'))
@@ -0,0 +1,85 @@
+import time
+import hashlib
+import threading
+from collections import namedtuple
+from flask import g, has_app_context
+from flask_jwt_extended import decode_token
+from sqlalchemy import event
+
+from config import db
+from models import User
+
+IDENTITY_CACHE_TTL = 30  # Seconds a verified token -> user snapshot stays cached
+IDENTITY_CACHE_MAX_ENTRIES = 10000  # Bound on cached tokens per process
+
+# Lightweight, detached view of the logged-in user handed to routes as current_user
+UserSnapshot = namedtuple('UserSnapshot', ['id', 'username', 'email'])
+
+# Per-process cache: sha256(token) -> (expires_at, UserSnapshot)
+_identity_cache = {}
+_identity_lock = threading.Lock()
+
+def _token_key(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def _load_identity(token):
+    """Verify a session token and snapshot its user, or None if the user no longer exists"""
+    decoded_token = decode_token(token)
+    user_id = int(decoded_token['sub'])  # Convert string back to int
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+    return UserSnapshot(id=user.id, username=user.username, email=user.email)
+
+def resolve_identity(token):
+    """
+    Resolve a session token to a UserSnapshot, memoized per request and for a short TTL
+    
+    Raises whatever decode_token raises for an invalid token; returns None for a valid
+    token whose user is gone (not cached, so a recreated account is picked up).
+    """
+    key = _token_key(token)
+    identity = g.get('_identity')
+    if identity and identity[0] == key:
+        return identity[1]
+    
+    now = time.monotonic()
+    with _identity_lock:
+        cached = _identity_cache.get(key)
+        if cached and cached[0] > now:
+            g._identity = (key, cached[1])
+            return cached[1]
+    
+    snapshot = _load_identity(token)
+    if snapshot is None:
+        return None
+    
+    with _identity_lock:
+        if len(_identity_cache) >= IDENTITY_CACHE_MAX_ENTRIES:
+            for stale_key in [k for k, (expires_at, _) in _identity_cache.items() if expires_at <= now]:
+                del _identity_cache[stale_key]
+            if len(_identity_cache) >= IDENTITY_CACHE_MAX_ENTRIES:
+                _identity_cache.clear()
+        _identity_cache[key] = (now + IDENTITY_CACHE_TTL, snapshot)
+    g._identity = (key, snapshot)
+    return snapshot
+
+def invalidate_identity(token=None, user_id=None):
+    """Drop cached identities for a token (logout) or for every token of a user (user change)"""
+    with _identity_lock:
+        if token:
+            _identity_cache.pop(_token_key(token), None)
+        if user_id is not None:
+            for key in [k for k, (_, snapshot) in _identity_cache.items() if snapshot.id == user_id]:
+                del _identity_cache[key]
+    g.pop('_identity', None)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_changed_user(mapper, connection, target):
+    """Keep cached snapshots in step with edits to, or removal of, the user row"""
+    with _identity_lock:
+        for key in [k for k, (_, snapshot) in _identity_cache.items() if snapshot.id == target.id]:
+            del _identity_cache[key]
+    if has_app_context():
+        g.pop('_identity', None)
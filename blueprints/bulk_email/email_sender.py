@@ -4,6 +4,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from datetime import datetime
 from dotenv import load_dotenv
+from metrics import smtp_phase, record_email_sent, record_email_failed
 
 load_dotenv()
 
@@ -61,22 +62,27 @@ This is an automated email. Please do not reply to this message."""
             print(f"ERROR creating custom email: {e}")
             return None
     
-    def send_email(self, msg):
+    def send_email(self, msg, kind='custom'):
         """Send email using SMTP"""
         try:
             print(f"DEBUG: Connecting to SMTP server {self.smtp_server}:{self.smtp_port}")
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()  # Enable security
-            server.login(self.email_address, self.email_password)
+            with smtp_phase('connect'):
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                server.starttls()  # Enable security
+            with smtp_phase('login'):
+                server.login(self.email_address, self.email_password)
             
             text = msg.as_string()
-            server.sendmail(self.email_address, msg['To'], text)
+            with smtp_phase('data'):
+                server.sendmail(self.email_address, msg['To'], text)
             server.quit()
             
+            record_email_sent(kind)
             print(f"DEBUG: Email sent successfully to {msg['To']}")
             return {'success': True}
             
         except Exception as e:
+            record_email_failed(kind, e)
             print(f"ERROR sending email: {e}")
             return {'success': False, 'error': str(e)}
     
@@ -87,6 +93,7 @@ This is an automated email. Please do not reply to this message."""
         msg = self.create_custom_email(recipient_name, recipient_email, subject, custom_message, sender_name)
         if msg:
             return self.send_email(msg)
+        record_email_failed('custom', 'build')
         return {'success': False, 'error': 'Failed to create email'}
     
     def send_bulk_custom_emails(self, contacts, subject, custom_message, sender_name=None, progress_callback=None):
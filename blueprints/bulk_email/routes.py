@@ -1,20 +1,29 @@
-from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify, session
+from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify, session, current_app
 import os
 import json
 from datetime import datetime
+import click
 
 from blueprints.auth.decorators import login_required
-from .utils import process_contacts_file, save_contacts_file, get_contacts_sample_format
+from .utils import (
+    save_contacts_file, get_contacts_sample_format, stream_contacts_file_to_staging,
+    get_contacts_upload, get_staged_contacts_page, get_staged_contacts_by_email,
+    iter_staged_contacts, delete_staged_contacts, delete_expired_staged_contacts
+)
 from .email_sender import BulkEmailSender
 from .template_utils import (
     save_email_template, get_user_templates, get_template_by_id,
     save_meet_link, get_user_meet_links, map_csv_to_template_variables,
-    get_default_templates, TemplateProcessor
+    get_default_templates, TemplateProcessor, search_template_email_logs, decode_log_cursor,
+    auto_map_template_variables, get_sent_recipients
 )
 from .template_email_sender import TemplateEmailSender
-from models import db
+from models import db, EmailTemplate, Job
+from jobs import run_job, JobProgress
+
+bulk_email_bp = Blueprint('bulk_email', __name__, cli_group='bulk-email')
 
-bulk_email_bp = Blueprint('bulk_email', __name__)
+CONTACTS_PAGE_SIZE = 200  # Contacts rendered per page on the template send form
 
 @bulk_email_bp.route('/bulk-email')
 @login_required
@@ -49,24 +58,35 @@ def upload_contacts(current_user):
         flash('Invalid file type. Please upload an Excel (.xlsx, .xls) or CSV file.', 'error')
         return redirect(request.url)
     
-    # Process the file
-    result = process_contacts_file(file_path)
+    # Staged contacts of uploads that were never sent stay until they expire
+    delete_expired_staged_contacts(current_app.config['STAGING_UPLOAD_MAX_AGE_HOURS'])
     
-    if not result['success']:
-        flash(f"Error processing file: {result['error']}", 'error')
-        return render_template('bulk_email/upload.html', 
-                             sample_format=get_contacts_sample_format(),
-                             user=current_user)
-    
-    # Store contacts in session for next step
-    session['bulk_email_contacts'] = result['contacts']
-    session['bulk_email_stats'] = {
-        'total_contacts': result['total_contacts'],
-        'invalid_count': result.get('invalid_count', 0),
-        'skipped_rows': result.get('skipped_rows', 0),
-        'name_column': result.get('name_column', 'Name'),
-        'email_column': result.get('email_column', 'Email')
-    }
+    with run_job('ingest_contacts', current_user.id) as job:
+        # Process the file in chunks into the server-side staging table
+        result = stream_contacts_file_to_staging(file_path, current_user.id)
+        
+        if not result['success']:
+            job.fail(result['error'])
+            flash(f"Error processing file: {result['error']}", 'error')
+            return render_template('bulk_email/upload.html', 
+                                 sample_format=get_contacts_sample_format(),
+                                 user=current_user)
+        
+        # Replace any previous upload; only the upload id and stats live in the session cookie
+        previous_upload = get_contacts_upload(session.get('bulk_email_upload_id'), current_user.id)
+        if previous_upload:
+            delete_staged_contacts(previous_upload.id)
+        
+        session['bulk_email_upload_id'] = result['upload_id']
+        session['bulk_email_stats'] = {
+            'total_contacts': result['total_contacts'],
+            'invalid_count': result.get('invalid_count', 0),
+            'skipped_rows': result.get('skipped_rows', 0),
+            'name_column': result.get('name_column', 'Name'),
+            'email_column': result.get('email_column', 'Email')
+        }
+        job.stats.update(contacts=result['total_contacts'], invalid=result.get('invalid_count', 0))
+        job.stage('ingest')
     
     # Show success message with stats
     success_msg = f"Successfully processed {result['total_contacts']} contacts"
@@ -87,19 +107,39 @@ def upload_contacts(current_user):
     
     return redirect(url_for('bulk_email.compose_email'))
 
+def _get_session_upload(current_user):
+    """Get the contacts upload referenced by the session, or None"""
+    return get_contacts_upload(session.get('bulk_email_upload_id'), current_user.id)
+
+def _clear_session_upload(upload):
+    """Drop staged contacts and the session reference once a send has finished"""
+    delete_staged_contacts(upload.id)
+    session.pop('bulk_email_upload_id', None)
+    session.pop('bulk_email_stats', None)
+
+def _merge_send_results(results, batch_results):
+    """Accumulate per-batch sender results into a single summary"""
+    results['sent'] += batch_results['sent']
+    results['failed'] += batch_results['failed']
+    results['errors'].extend(batch_results['errors'])
+    return results
+
 @bulk_email_bp.route('/bulk-email/compose', methods=['GET', 'POST'])
 @login_required
 def compose_email(current_user):
     """Compose and send bulk email"""
     
-    # Check if we have contacts in session
-    contacts = session.get('bulk_email_contacts', [])
+    # Check if we have staged contacts for this session
+    upload = _get_session_upload(current_user)
     stats = session.get('bulk_email_stats', {})
     
-    if not contacts:
+    if not upload or not upload.total_records:
         flash('No contacts found. Please upload a contacts file first.', 'error')
         return redirect(url_for('bulk_email.upload_contacts'))
     
+    # Only the first few contacts are rendered for the preview panel
+    contacts, _ = get_staged_contacts_page(upload.id, limit=5)
+    
     if request.method == 'GET':
         return render_template('bulk_email/compose.html', 
                              contacts=contacts,
@@ -138,21 +178,26 @@ def compose_email(current_user):
                                  stats=stats,
                                  user=current_user)
         
-        # Send emails
-        def progress_callback(current, total, name):
-            print(f"Progress: {current}/{total} - Sending to {name}")
-        
-        results = email_sender.send_bulk_custom_emails(
-            contacts, 
-            subject,
-            custom_message,
-            sender_name if sender_name else None,
-            progress_callback
-        )
-        
-        # Clear session data
-        session.pop('bulk_email_contacts', None)
-        session.pop('bulk_email_stats', None)
+        with run_job('send_custom_emails', current_user.id) as job:
+            # Send emails
+            def progress_callback(current, total, name):
+                print(f"Progress: {current}/{total} - Sending to {name}")
+            
+            # Stream staged contacts batch by batch instead of holding the whole list
+            results = {'sent': 0, 'failed': 0, 'errors': []}
+            for batch in iter_staged_contacts(upload.id):
+                _merge_send_results(results, email_sender.send_bulk_custom_emails(
+                    batch, 
+                    subject,
+                    custom_message,
+                    sender_name if sender_name else None,
+                    progress_callback
+                ))
+            job.stats.update(sent=results['sent'], failed=results['failed'])
+            job.stage('send')
+        
+        # Clear staged contacts and session data
+        _clear_session_upload(upload)
         
         # Show results
         if results['sent'] > 0:
@@ -183,7 +228,8 @@ def compose_email(current_user):
 def preview_email(current_user):
     """Preview email with sample data"""
     
-    contacts = session.get('bulk_email_contacts', [])
+    upload = _get_session_upload(current_user)
+    contacts, _ = get_staged_contacts_page(upload.id, limit=1) if upload else ([], None)
     if not contacts:
         return jsonify({'success': False, 'error': 'No contacts found'})
     
@@ -220,6 +266,26 @@ This is an automated email. Please do not reply to this message."""
         }
     })
 
+@bulk_email_bp.route('/bulk-email/contacts')
+@login_required
+def list_staged_contacts(current_user):
+    """Page through the staged contacts of the current upload (JSON, for lazy loading)"""
+    
+    upload = _get_session_upload(current_user)
+    if not upload:
+        return jsonify({'success': False, 'error': 'No contacts found'})
+    
+    after = request.args.get('after', -1, type=int)
+    limit = min(max(request.args.get('limit', 200, type=int), 1), 1000)
+    contacts, next_after = get_staged_contacts_page(upload.id, after_position=after, limit=limit)
+    
+    return jsonify({
+        'success': True,
+        'contacts': [{'name': contact['name'], 'email': contact['email']} for contact in contacts],
+        'next_after': next_after,
+        'total': upload.total_records
+    })
+
 # ===============================
 # TEMPLATE-BASED EMAIL ROUTES
 # ===============================
@@ -389,31 +455,29 @@ def create_meet_link(current_user):
 def send_template_email(current_user):
     """Send template-based emails"""
     
-    # Check if we have contacts
-    contacts = session.get('bulk_email_contacts', [])
-    if not contacts:
+    # Check if we have staged contacts
+    upload = _get_session_upload(current_user)
+    if not upload or not upload.total_records:
         flash('No contacts found. Please upload a contacts file first.', 'error')
         return redirect(url_for('bulk_email.upload_contacts'))
     
+    # CSV columns for mapping: name, email, then all other columns of the file
+    csv_columns = ['name', 'email'] + (json.loads(upload.extra_columns) if upload.extra_columns else [])
+    
     if request.method == 'GET':
         # Get user templates and meet links
         templates = get_user_templates(current_user.id)
         meet_links = get_user_meet_links(current_user.id)
         stats = session.get('bulk_email_stats', {})
         
-        # Get CSV columns for mapping
-        csv_columns = []
-        if contacts:
-            csv_columns = list(contacts[0].keys()) if contacts[0] else []
-            print(f"DEBUG: contacts[0] = {contacts[0]}")  # Debug
-            print(f"DEBUG: csv_columns = {csv_columns}")  # Debug
-        else:
-            print("DEBUG: No contacts found in session")  # Debug
+        # First page of contacts; the rest are lazy-loaded from bulk_email.list_staged_contacts
+        contacts, next_after = get_staged_contacts_page(upload.id, limit=CONTACTS_PAGE_SIZE)
         
         return render_template('bulk_email/templates/send.html',
                      templates=templates,
                      meet_links=meet_links,
-                     contacts=contacts,  # Pass ALL contacts so user can select any
+                     contacts=contacts,
+                     next_after=next_after,
                      stats=stats,
                      csv_columns=csv_columns,
                      user=current_user)
@@ -445,54 +509,20 @@ def send_template_email(current_user):
     # AUTO-MAPPING FALLBACK: If no mappings provided, try auto-mapping
     if not variable_mappings:
         print("DEBUG: No explicit variable mappings found, attempting auto-mapping...")
-        
-        # Get available CSV columns
-        csv_columns = []
-        if contacts:
-            csv_columns = list(contacts[0].keys()) if contacts[0] else []
-        
-        print(f"DEBUG: Available CSV columns for auto-mapping: {csv_columns}")
-        
-        # Auto-map variables to CSV columns with same or similar names
-        for var in template['variables']:
-            # Skip static variables
-            if template.get('static_variables') and var in template['static_variables']:
-                continue
-                
-            # Try exact match first
-            if var in csv_columns:
-                variable_mappings[var] = var
-                print(f"DEBUG: Auto-mapped {var} -> {var} (exact match)")
-            else:
-                # Try fuzzy matching
-                var_lower = var.lower()
-                for col in csv_columns:
-                    col_lower = col.lower()
-                    if (var_lower in col_lower or col_lower in var_lower or
-                        (var_lower.replace('_', '') in col_lower.replace('_', '')) or
-                        (col_lower.replace('_', '') in var_lower.replace('_', ''))):
-                        variable_mappings[var] = col
-                        print(f"DEBUG: Auto-mapped {var} -> {col} (fuzzy match)")
-                        break
+        variable_mappings = auto_map_template_variables(template, csv_columns)
     
     print(f"DEBUG: Template variables: {template['variables']}")
     print(f"DEBUG: Form data: {dict(request.form)}")
     print(f"DEBUG: Final variable mappings: {variable_mappings}")
     
-    # Determine which contacts to send to
+    # Determine which contacts to send to: selected ones, or every staged contact in batches
     if selected_contacts:
-        # Filter contacts based on selection
-        contacts_to_send = []
-        selected_emails = set(selected_contacts)
-        for contact in contacts:
-            if contact['email'] in selected_emails:
-                contacts_to_send.append(contact)
+        contact_batches = [get_staged_contacts_by_email(upload.id, selected_contacts)]
+        if not contact_batches[0]:
+            flash('No contacts selected for sending.', 'error')
+            return redirect(request.url)
     else:
-        contacts_to_send = contacts
-    
-    if not contacts_to_send:
-        flash('No contacts selected for sending.', 'error')
-        return redirect(request.url)
+        contact_batches = iter_staged_contacts(upload.id)
     
     # Determine meet link to use
     meet_link_url = None
@@ -523,18 +553,22 @@ def send_template_email(current_user):
         def progress_callback(current, total, name):
             print(f"Template Email Progress: {current}/{total} - Sending to {name}")
         
-        results = template_sender.send_template_emails(
-            template_data,
-            contacts_to_send,
-            variable_mappings,
-            meet_link_url,
-            sender_name,
-            progress_callback
-        )
-        
-        # Clear session data
-        session.pop('bulk_email_contacts', None)
-        session.pop('bulk_email_stats', None)
+        with run_job('send_template_emails', current_user.id) as job:
+            results = {'sent': 0, 'failed': 0, 'errors': []}
+            for batch in contact_batches:
+                _merge_send_results(results, template_sender.send_template_emails(
+                    template_data,
+                    batch,
+                    variable_mappings,
+                    meet_link_url,
+                    sender_name,
+                    progress_callback
+                ))
+            job.stats.update(sent=results['sent'], failed=results['failed'])
+            job.stage('send')
+        
+        # Clear staged contacts and session data
+        _clear_session_upload(upload)
         
         # Show results
         if results['sent'] > 0:
@@ -551,6 +585,45 @@ def send_template_email(current_user):
         flash(f"Error sending template emails: {str(e)}", 'error')
         return redirect(request.url)
 
+@bulk_email_bp.route('/bulk-email/logs')
+@login_required
+def email_logs(current_user):
+    """Browse and search template email logs (keyset paginated JSON API)"""
+    
+    template_id = request.args.get('template_id', type=int)
+    status = request.args.get('status', '').strip() or None
+    recipient = request.args.get('recipient', '').strip() or None
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    
+    try:
+        date_from = datetime.fromisoformat(request.args['date_from']) if request.args.get('date_from') else None
+        date_to = datetime.fromisoformat(request.args['date_to']) if request.args.get('date_to') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format. Use ISO 8601 (YYYY-MM-DD).'}), 400
+    
+    cursor = None
+    if request.args.get('cursor'):
+        cursor = decode_log_cursor(request.args['cursor'])
+        if not cursor:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+    
+    result = search_template_email_logs(
+        current_user.id,
+        template_id=template_id,
+        status=status,
+        recipient=recipient,
+        date_from=date_from,
+        date_to=date_to,
+        cursor=cursor,
+        limit=limit
+    )
+    
+    return jsonify({
+        'success': True,
+        'logs': result['logs'],
+        'next_cursor': result['next_cursor']
+    })
+
 @bulk_email_bp.route('/bulk-email/templates/<int:template_id>/preview')
 @login_required
 def preview_template(current_user, template_id):
@@ -597,3 +670,96 @@ def preview_template(current_user, template_id):
             'success': False,
             'error': str(e)
         })
+
+@bulk_email_bp.cli.command('send-template')
+@click.argument('template_id', type=int)
+@click.argument('contacts_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--map', 'mappings', multiple=True, metavar='VARIABLE=COLUMN',
+              help='Map a template variable to a contacts column (repeatable; auto-mapped when omitted)')
+@click.option('--meet-link', help='Meet link for every meet/link variable')
+@click.option('--sender-name', default='', help='Display name in the From header')
+@click.option('--resume', 'resume_job_id', type=int, metavar='JOB_ID',
+              help='Skip contacts already sent this template by an earlier send-template job')
+@click.option('--track-memory/--no-track-memory', default=None, help='Override JOB_MEMORY_TRACKING for this run')
+@click.option('--profile/--no-profile', default=None, help='Run under cProfile (saved with the other captured profiles)')
+def send_template_command(template_id, contacts_path, mappings, meet_link, sender_name, resume_job_id, track_memory, profile):
+    """
+    Send a template campaign to every contact in an Excel/CSV file
+    
+    Every send is logged as it happens; after an interruption, run the same command with
+    --resume <job id> to skip contacts the earlier job already reached.
+    """
+    template_row = db.session.get(EmailTemplate, template_id)
+    if not template_row:
+        raise click.ClickException(f"Email template {template_id} not found")
+    user_id = template_row.user_id
+    template = get_template_by_id(template_id, user_id)
+    
+    variable_mappings = {}
+    for mapping in mappings:
+        var, _, column = mapping.partition('=')
+        if not column:
+            raise click.BadParameter(f"expected VARIABLE=COLUMN, got '{mapping}'", param_hint='--map')
+        variable_mappings[var.strip()] = column.strip()
+    
+    resume_since = None
+    if resume_job_id is not None:
+        previous_job = db.session.get(Job, resume_job_id)
+        if not previous_job or previous_job.kind != 'send_template_emails' or previous_job.user_id != user_id:
+            raise click.ClickException(f"Job {resume_job_id} is not a template campaign for this template's owner")
+        resume_since = previous_job.started_at
+    
+    try:
+        template_sender = TemplateEmailSender()
+    except ValueError as e:
+        raise click.ClickException(f"Email configuration error: {e}")
+    connection_test = template_sender.test_connection()
+    if not connection_test['success']:
+        raise click.ClickException(f"Email connection failed: {connection_test['error']}")
+    
+    with run_job('send_template_emails', user_id, track_memory=track_memory, profile=profile) as job:
+        click.echo(f"Job {job.id}: sending '{template['name']}' to contacts in {contacts_path}")
+        result = stream_contacts_file_to_staging(contacts_path, user_id)
+        if not result['success']:
+            raise click.ClickException(result['error'])
+        upload = get_contacts_upload(result['upload_id'], user_id)
+        job.stats.update(contacts=result['total_contacts'], invalid=result.get('invalid_count', 0))
+        job.stage('ingest')
+        click.echo(f"Staged {result['total_contacts']} contacts ({result.get('invalid_count', 0)} invalid emails skipped)")
+        
+        if not variable_mappings:
+            csv_columns = ['name', 'email'] + (json.loads(upload.extra_columns) if upload.extra_columns else [])
+            variable_mappings = auto_map_template_variables(template, csv_columns)
+        template_data = template.copy()
+        template_data['user_id'] = user_id
+        
+        results = {'sent': 0, 'failed': 0, 'errors': []}
+        skipped = processed = 0
+        progress = JobProgress('Processed', result['total_contacts'])
+        try:
+            for batch in iter_staged_contacts(upload.id):
+                processed += len(batch)
+                if resume_since is not None:
+                    already_sent = get_sent_recipients(template_id, [contact['email'] for contact in batch], resume_since)
+                    batch = [contact for contact in batch if contact['email'] not in already_sent]
+                    skipped += len(already_sent)
+                if batch:
+                    _merge_send_results(results, template_sender.send_template_emails(
+                        template_data,
+                        batch,
+                        variable_mappings,
+                        meet_link,
+                        sender_name,
+                    ))
+                progress.update(processed)
+        finally:
+            delete_staged_contacts(upload.id)
+        
+        job.stats.update(sent=results['sent'], failed=results['failed'], skipped=skipped)
+        job.stage('send')
+    
+    if job.stats.get('profile'):
+        click.echo(f"Profile: {job.stats['profile']}")
+    click.echo(f"Sent {results['sent']} emails, {results['failed']} failed, {skipped} already sent")
+    for error in results['errors'][:10]:
+        click.echo(f"  {error}")
@@ -6,6 +6,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime
+from metrics import smtp_phase, record_email_sent, record_email_failed
 from .template_utils import TemplateProcessor, log_template_email
 
 class TemplateEmailSender:
@@ -89,9 +90,11 @@ class TemplateEmailSender:
         
         try:
             print(f"DEBUG: Connecting to SMTP server {self.smtp_server}:{self.smtp_port}")
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email_address, self.email_password)
+            with smtp_phase('connect'):
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                server.starttls()
+            with smtp_phase('login'):
+                server.login(self.email_address, self.email_password)
             
             total_contacts = len(contacts)
             
@@ -147,7 +150,9 @@ class TemplateEmailSender:
                     )
                     
                     # Send the email
-                    server.send_message(email_result['message'])
+                    with smtp_phase('data'):
+                        server.send_message(email_result['message'])
+                    record_email_sent('template')
                     
                     # Log successful send
                     log_template_email(
@@ -178,6 +183,7 @@ class TemplateEmailSender:
                     error_msg = f"Failed to send to {contact.get('email', 'unknown')}: {str(e)}"
                     results['errors'].append(error_msg)
                     results['failed'] += 1
+                    record_email_failed('template', e)
                     
                     # Log failed send
                     log_template_email(
@@ -206,6 +212,10 @@ class TemplateEmailSender:
         except Exception as e:
             error_msg = f"SMTP connection error: {str(e)}"
             results['errors'].append(error_msg)
+            # Contacts never attempted because the connection failed
+            unattempted = len(contacts) - results['sent'] - results['failed']
+            if unattempted > 0:
+                record_email_failed('template', e, unattempted)
             print(f"❌ SMTP Error: {str(e)}")
         
         return results
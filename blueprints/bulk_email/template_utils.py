@@ -4,6 +4,8 @@ from jinja2 import Template, Environment, meta
 from flask import session
 from models import EmailTemplate, MeetLink, TemplateEmailLog, db
 from datetime import datetime
+import sys
+from sqlalchemy import and_, or_
 
 class TemplateProcessor:
     """Handles email template processing and variable extraction"""
@@ -239,6 +241,34 @@ def map_csv_to_template_variables(csv_columns, template_variables):
     
     return mapping_suggestions
 
+def auto_map_template_variables(template, csv_columns):
+    """Map a template's non-static variables to contact columns with the same or a similar name"""
+    variable_mappings = {}
+    print(f"DEBUG: Available CSV columns for auto-mapping: {csv_columns}")
+    
+    for var in template['variables']:
+        # Skip static variables
+        if template.get('static_variables') and var in template['static_variables']:
+            continue
+            
+        # Try exact match first
+        if var in csv_columns:
+            variable_mappings[var] = var
+            print(f"DEBUG: Auto-mapped {var} -> {var} (exact match)")
+        else:
+            # Try fuzzy matching
+            var_lower = var.lower()
+            for col in csv_columns:
+                col_lower = col.lower()
+                if (var_lower in col_lower or col_lower in var_lower or
+                    (var_lower.replace('_', '') in col_lower.replace('_', '')) or
+                    (col_lower.replace('_', '') in var_lower.replace('_', ''))):
+                    variable_mappings[var] = col
+                    print(f"DEBUG: Auto-mapped {var} -> {col} (fuzzy match)")
+                    break
+    
+    return variable_mappings
+
 def log_template_email(template_id, recipient_email, recipient_name, subject_sent, body_sent, variables_used, user_id, status='sent', error_message=None):
     """Log sent template email"""
     try:
@@ -262,6 +292,109 @@ def log_template_email(template_id, recipient_email, recipient_name, subject_sen
         print(f"Error logging template email: {e}")
         return False
 
+def get_sent_recipients(template_id, emails, since=None, batch_size=500):
+    """Emails among the given ones that already have a successful send logged for a template (optionally since a time)"""
+    sent = set()
+    emails = list(emails)
+    # Batched IN queries keep the bound parameter count under database limits
+    for start in range(0, len(emails), batch_size):
+        query = db.session.query(TemplateEmailLog.recipient_email).filter(
+            TemplateEmailLog.template_id == template_id,
+            TemplateEmailLog.status == 'sent',
+            TemplateEmailLog.recipient_email.in_(emails[start:start + batch_size])
+        )
+        if since is not None:
+            query = query.filter(TemplateEmailLog.sent_at >= since)
+        sent.update(email for (email,) in query)
+    return sent
+
+def encode_log_cursor(log_entry):
+    """Build the keyset cursor for a log entry (sent_at + id tie-breaker), or None without sent_at"""
+    if log_entry.sent_at is None:
+        return None
+    return f"{log_entry.sent_at.isoformat()}|{log_entry.id}"
+
+def decode_log_cursor(cursor):
+    """Parse a keyset cursor, returning (sent_at, id) or None if malformed"""
+    try:
+        sent_at, log_id = cursor.rsplit('|', 1)
+        return datetime.fromisoformat(sent_at), int(log_id)
+    except (ValueError, AttributeError):
+        return None
+
+def prefix_upper_bound(prefix):
+    """Smallest string sorting (by code point) after every string that starts with prefix, or None if there is none"""
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    next_code_point = ord(prefix[-1]) + 1
+    if 0xD800 <= next_code_point <= 0xDFFF:
+        next_code_point = 0xE000  # Surrogates can't be encoded; skip to the next real character
+    return prefix[:-1] + chr(next_code_point)
+
+def search_template_email_logs(user_id, template_id=None, status=None, recipient=None,
+                               date_from=None, date_to=None, cursor=None, limit=50):
+    """
+    Browse/search template email logs with keyset pagination (newest first)
+    
+    Filters map onto the (user_id, sent_at), (template_id, status) and recipient_email
+    indexes; the cursor avoids OFFSET scans so deep pages stay as cheap as the first.
+    """
+    # Rows without sent_at can't be placed in the (sent_at, id) keyset order
+    query = TemplateEmailLog.query.filter(TemplateEmailLog.user_id == user_id, TemplateEmailLog.sent_at.isnot(None))
+    
+    if template_id is not None:
+        query = query.filter(TemplateEmailLog.template_id == template_id)
+    if status:
+        query = query.filter(TemplateEmailLog.status == status)
+    if recipient:
+        # Prefix match as a code point range rather than LIKE: LIKE can't use a plain index
+        # (SQLite's is case-insensitive, PostgreSQL's needs text_pattern_ops), and '%'/'_'
+        # stay literal. Emails are stored lowercased on ingest.
+        prefix = recipient.strip().lower()
+        recipient_email = TemplateEmailLog.recipient_email
+        if db.engine.dialect.name == 'postgresql':
+            # Code point order regardless of the database collation (ix_template_email_log_recipient_email_c)
+            recipient_email = recipient_email.collate('C')
+        query = query.filter(recipient_email >= prefix)
+        upper_bound = prefix_upper_bound(prefix)
+        if upper_bound is not None:
+            query = query.filter(recipient_email < upper_bound)
+    if date_from:
+        query = query.filter(TemplateEmailLog.sent_at >= date_from)
+    if date_to:
+        query = query.filter(TemplateEmailLog.sent_at <= date_to)
+    
+    if cursor:
+        cursor_sent_at, cursor_id = cursor
+        query = query.filter(or_(
+            TemplateEmailLog.sent_at < cursor_sent_at,
+            and_(TemplateEmailLog.sent_at == cursor_sent_at, TemplateEmailLog.id < cursor_id)
+        ))
+    
+    # Fetch one extra row to know whether another page exists
+    logs = query.order_by(TemplateEmailLog.sent_at.desc(), TemplateEmailLog.id.desc()).limit(limit + 1).all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    
+    log_list = []
+    for log_entry in logs:
+        log_list.append({
+            'id': log_entry.id,
+            'template_id': log_entry.template_id,
+            'recipient_email': log_entry.recipient_email,
+            'recipient_name': log_entry.recipient_name,
+            'subject_sent': log_entry.subject_sent,
+            'status': log_entry.status,
+            'error_message': log_entry.error_message,
+            'sent_at': log_entry.sent_at.isoformat() if log_entry.sent_at else None
+        })
+    
+    return {
+        'logs': log_list,
+        'next_cursor': encode_log_cursor(logs[-1]) if has_more and logs else None
+    }
+
 def get_default_templates():
     """Get some default template examples for new users"""
     return [
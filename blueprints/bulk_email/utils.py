@@ -1,21 +1,67 @@
-import pandas as pd
 import os
-import re
-from datetime import datetime
+import json
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, delete
 from werkzeug.utils import secure_filename
 
+from config import db
+from metrics import track_ingest
+from models import StagingUpload, StagedContact
+
 ALLOWED_EXCEL_EXTENSIONS = {'xlsx', 'xls', 'csv'}
 BULK_EMAIL_UPLOAD_FOLDER = 'uploads/bulk_email'
+INGEST_CHUNK_SIZE = 5000  # Rows per chunk for streaming ingestion
+MAX_REPORTED_INVALID_EMAILS = 100  # Invalid emails kept for reporting when streaming
+# Read every cell as text and only empty cells as missing ('NA', 'null', 'Nan' are kept as written),
+# so the whole-file and streaming readers agree whatever pandas would infer per chunk
+TEXT_READ_OPTIONS = {'dtype': str, 'keep_default_na': False, 'na_values': ['']}
 
 def allowed_excel_file(filename):
     """Check if uploaded file is a valid Excel or CSV"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXCEL_EXTENSIONS
 
+def _as_text(series):
+    """Convert a column to stripped strings, leaving missing values as NaN"""
+    return series.map(str, na_action='ignore').astype(object).str.strip()
+
+def extract_contacts(df, name_col, email_col):
+    """
+    Clean and validate a frame of contact rows (not yet deduplicated)
+    Returns (contacts frame, cleaned emails aligned with it, invalid emails, skipped row count)
+    """
+    import pandas as pd
+    # Email validation pattern
+    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    
+    # Clean the data column-wise (NaN stays NaN so missing values can be detected)
+    names = _as_text(df[name_col]).str.title()  # Capitalize name properly
+    emails = _as_text(df[email_col]).str.lower()
+    
+    # Rows with a missing or empty name/email are skipped
+    present_mask = names.notna() & emails.notna() & (names != '') & (emails != '')
+    skipped_rows = int((~present_mask).sum())
+    
+    # Validate email format
+    valid_mask = present_mask & emails.str.match(email_pattern).fillna(False).astype(bool)
+    invalid_emails = emails[present_mask & ~valid_mask].tolist()
+    
+    # Build contact columns: name, email, then all other columns as strings
+    valid_rows = df[valid_mask]
+    contact_columns = {'name': names[valid_mask], 'email': emails[valid_mask]}
+    for col in df.columns:
+        if col not in [name_col, email_col]:  # Don't duplicate name/email
+            contact_columns[col] = _as_text(valid_rows[col]).fillna('')
+    
+    return pd.DataFrame(contact_columns, index=valid_rows.index), emails[valid_mask], invalid_emails, skipped_rows
+
+@track_ingest('contacts', 'total_contacts')
 def process_contacts_file(file_path):
     """
     Process uploaded Excel/CSV file and extract names and emails
     Expected format: First column = Names, Second column = Emails
     """
+    import pandas as pd
     try:
         print(f"DEBUG: Processing contacts file: {file_path}")
         
@@ -23,9 +69,9 @@ def process_contacts_file(file_path):
         file_ext = os.path.splitext(file_path)[1].lower()
         
         if file_ext == '.csv':
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, **TEXT_READ_OPTIONS)
         else:  # Excel files
-            df = pd.read_excel(file_path)
+            df = pd.read_excel(file_path, **TEXT_READ_OPTIONS)
         
         print(f"DEBUG: File shape: {df.shape}")
         print(f"DEBUG: Columns: {df.columns.tolist()}")
@@ -44,55 +90,13 @@ def process_contacts_file(file_path):
         
         print(f"DEBUG: Using columns - Name: '{name_col}', Email: '{email_col}'")
         
-        # Extract contacts
-        contacts = []
-        invalid_emails = []
-        skipped_rows = 0
+        contacts_df, valid_emails, invalid_emails, skipped_rows = extract_contacts(df, name_col, email_col)
         
-        # Email validation pattern
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+        # Drop duplicate emails, keeping the first occurrence
+        contacts = contacts_df[~valid_emails.duplicated()].to_dict('records')
         
-        for index, row in df.iterrows():
-            name = row.get(name_col, '')
-            email = row.get(email_col, '')
-            
-            # Clean the data
-            if pd.notna(name) and pd.notna(email):
-                name = str(name).strip().title()  # Capitalize name properly
-                email = str(email).strip().lower()
-                
-                # Skip if either is empty
-                if name and email:
-                    # Validate email format
-                    if re.match(email_pattern, email):
-                        # Check for duplicates
-                        if email not in [c['email'] for c in contacts]:
-                            # Create contact dict with all columns
-                            contact = {
-                                'name': name,
-                                'email': email
-                            }
-                            
-                            # Add all other columns as well
-                            for col in df.columns:
-                                if col not in [name_col, email_col]:  # Don't duplicate name/email
-                                    value = row.get(col, '')
-                                    if pd.notna(value):
-                                        contact[col] = str(value).strip()
-                                    else:
-                                        contact[col] = ''
-                            
-                            contacts.append(contact)
-                            print(f"DEBUG: Added contact: {name} ({email})")
-                        else:
-                            print(f"DEBUG: Duplicate email skipped: {email}")
-                    else:
-                        invalid_emails.append(email)
-                        print(f"DEBUG: Invalid email format: {email}")
-                else:
-                    skipped_rows += 1
-            else:
-                skipped_rows += 1
+        print(f"DEBUG: {len(contacts)} contacts, {len(invalid_emails)} invalid emails, "
+              f"{len(contacts_df) - len(contacts)} duplicate emails skipped, {skipped_rows} rows skipped")
         
         result = {
             'success': True,
@@ -117,6 +121,262 @@ def process_contacts_file(file_path):
             'error': f"Error processing file: {str(e)}"
         }
 
+def _excel_cell_text(value):
+    """Cell value as text the way pd.read_excel(**TEXT_READ_OPTIONS) renders it (integral floats lose their '.0')"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def read_contacts_chunks(file_path, chunksize=INGEST_CHUNK_SIZE):
+    """
+    Yield the contacts file as DataFrames of at most chunksize rows
+    Cells are read as text, as in process_contacts_file, so a value never depends on the
+    types pandas would infer for the chunk it lands in.
+    """
+    import pandas as pd
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if file_ext == '.csv':
+        yield from pd.read_csv(file_path, chunksize=chunksize, **TEXT_READ_OPTIONS)
+    elif file_ext == '.xlsx':
+        # pandas cannot chunk Excel files; stream rows with openpyxl's read-only mode instead
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [col if col is not None else f'Unnamed: {i}' for i, col in enumerate(header)]
+            
+            buffer = []
+            blank_rows = []
+            for row in rows:
+                # Hold blank rows back so trailing ones are dropped, as pd.read_excel does
+                if all(value is None for value in row):
+                    blank_rows.append(row)
+                    continue
+                buffer.extend(blank_rows)
+                blank_rows = []
+                buffer.append([_excel_cell_text(value) for value in row])
+                if len(buffer) >= chunksize:
+                    yield pd.DataFrame(buffer, columns=columns, dtype=object)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=columns, dtype=object)
+        finally:
+            workbook.close()
+    else:  # Legacy .xls files have no streaming reader
+        df = pd.read_excel(file_path, **TEXT_READ_OPTIONS)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+        if len(df) == 0:
+            yield df
+
+@track_ingest('contacts', 'total_contacts')
+def stream_contacts_file_to_staging(file_path, user_id, chunksize=INGEST_CHUNK_SIZE):
+    """
+    Streaming variant of process_contacts_file for very large files
+    Reads the file in chunks, validates and deduplicates incrementally with a running
+    seen-set and writes contacts straight to the staging table, so memory stays bounded
+    by the chunk size. Returns the same stats as process_contacts_file plus 'upload_id'
+    instead of the 'contacts' list.
+    """
+    try:
+        print(f"DEBUG: Streaming contacts file: {file_path}")
+        
+        upload = None
+        seen_emails = set()
+        invalid_emails = []
+        invalid_count = 0
+        skipped_rows = 0
+        total_rows = 0
+        position = 0
+        
+        for chunk in read_contacts_chunks(file_path, chunksize):
+            if upload is None:
+                # Get the first two columns (names and emails)
+                if len(chunk.columns) < 2:
+                    return {
+                        'success': False,
+                        'error': "File must have at least 2 columns (Name and Email)",
+                        'available_columns': chunk.columns.tolist()
+                    }
+                
+                # Use first two columns regardless of their names
+                name_col = chunk.columns[0]
+                email_col = chunk.columns[1]
+                extra_cols = [str(col) for col in chunk.columns if col not in [name_col, email_col]]
+                
+                upload = StagingUpload(
+                    id=uuid.uuid4().hex,
+                    user_id=user_id,
+                    kind='contacts',
+                    filename=os.path.basename(file_path),
+                    name_column=str(name_col),
+                    email_column=str(email_col),
+                    extra_columns=json.dumps(extra_cols)
+                )
+                db.session.add(upload)
+                db.session.commit()
+            
+            contacts_df, valid_emails, chunk_invalid, chunk_skipped = extract_contacts(chunk, name_col, email_col)
+            total_rows += len(chunk)
+            skipped_rows += chunk_skipped
+            
+            # Only keep a bounded sample of invalid emails for reporting
+            invalid_count += len(chunk_invalid)
+            invalid_emails.extend(chunk_invalid[:MAX_REPORTED_INVALID_EMAILS - len(invalid_emails)])
+            
+            # Deduplicate within the chunk and against everything staged so far
+            keep_mask = ~valid_emails.duplicated() & ~valid_emails.isin(seen_emails)
+            contacts_df = contacts_df[keep_mask]
+            seen_emails.update(valid_emails[keep_mask].tolist())
+            
+            rows = []
+            for contact in contacts_df.to_dict('records'):
+                name = contact.pop('name')
+                email = contact.pop('email')
+                rows.append({
+                    'upload_id': upload.id,
+                    'position': position,
+                    'name': name,
+                    'email': email,
+                    'extra_data': json.dumps({str(col): value for col, value in contact.items()})
+                })
+                position += 1
+            
+            if rows:
+                db.session.execute(insert(StagedContact), rows)
+            db.session.commit()
+        
+        if upload is None:
+            return {
+                'success': False,
+                'error': "File must have at least 2 columns (Name and Email)",
+                'available_columns': []
+            }
+        
+        upload.total_rows = total_rows
+        upload.total_records = position
+        upload.invalid_count = invalid_count
+        upload.invalid_emails = json.dumps(invalid_emails)
+        upload.skipped_rows = skipped_rows
+        db.session.commit()
+        
+        print(f"DEBUG: Staged {position} contacts from {total_rows} rows (upload {upload.id})")
+        return {
+            'success': True,
+            'upload_id': upload.id,
+            'total_contacts': position,
+            'invalid_count': invalid_count,
+            'invalid_emails': invalid_emails,
+            'skipped_rows': skipped_rows,
+            'name_column': upload.name_column,
+            'email_column': upload.email_column
+        }
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"ERROR streaming contacts file: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'success': False,
+            'error': f"Error processing file: {str(e)}"
+        }
+
+def iter_staged_contacts(upload_id, batch_size=INGEST_CHUNK_SIZE):
+    """Yield staged contacts for an upload in batches of contact dicts, in file order"""
+    last_position = -1
+    while True:
+        # Column query (no ORM instances) so the session identity map stays empty
+        batch = db.session.query(
+            StagedContact.position,
+            StagedContact.name,
+            StagedContact.email,
+            StagedContact.extra_data
+        ).filter(
+            StagedContact.upload_id == upload_id,
+            StagedContact.position > last_position
+        ).order_by(StagedContact.position).limit(batch_size).all()
+        
+        if not batch:
+            break
+        
+        last_position = batch[-1].position
+        yield [staged_contact_to_dict(staged) for staged in batch]
+
+def staged_contact_to_dict(staged):
+    """Rebuild the contact dict format used by the senders from a staged row"""
+    contact = {'name': staged.name, 'email': staged.email}
+    if staged.extra_data:
+        contact.update(json.loads(staged.extra_data))
+    return contact
+
+def get_contacts_upload(upload_id, user_id):
+    """Get a contacts staging upload owned by the user, or None"""
+    if not upload_id:
+        return None
+    return StagingUpload.query.filter_by(id=upload_id, user_id=user_id, kind='contacts').first()
+
+def get_staged_contacts_page(upload_id, after_position=-1, limit=100):
+    """
+    Get one page of staged contacts (keyset on position)
+    Returns (contacts, next_position) where next_position is None on the last page
+    """
+    rows = db.session.query(
+        StagedContact.position,
+        StagedContact.name,
+        StagedContact.email,
+        StagedContact.extra_data
+    ).filter(
+        StagedContact.upload_id == upload_id,
+        StagedContact.position > after_position
+    ).order_by(StagedContact.position).limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    contacts = [staged_contact_to_dict(staged) for staged in rows]
+    return contacts, (rows[-1].position if has_more else None)
+
+def get_staged_contacts_by_email(upload_id, emails, batch_size=500):
+    """Get staged contacts whose email is in the given list, in file order"""
+    emails = list(dict.fromkeys(emails))
+    rows = []
+    # Batched IN queries keep the bound parameter count under database limits
+    for start in range(0, len(emails), batch_size):
+        rows.extend(db.session.query(
+            StagedContact.position,
+            StagedContact.name,
+            StagedContact.email,
+            StagedContact.extra_data
+        ).filter(
+            StagedContact.upload_id == upload_id,
+            StagedContact.email.in_(emails[start:start + batch_size])
+        ).all())
+    
+    rows.sort(key=lambda staged: staged.position)
+    return [staged_contact_to_dict(staged) for staged in rows]
+
+def delete_staged_contacts(upload_id):
+    """Remove a contacts staging upload and its staged rows"""
+    StagedContact.query.filter_by(upload_id=upload_id).delete()
+    StagingUpload.query.filter_by(id=upload_id).delete()
+    db.session.commit()
+
+def delete_expired_staged_contacts(max_age_hours):
+    """Remove contacts staging uploads older than max_age_hours (uploaded but never sent); returns how many"""
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    expired = select(StagingUpload.id).where(StagingUpload.kind == 'contacts', StagingUpload.created_at < cutoff)
+    db.session.execute(delete(StagedContact).where(StagedContact.upload_id.in_(expired)))
+    removed = db.session.execute(delete(StagingUpload).where(StagingUpload.id.in_(expired))).rowcount
+    db.session.commit()
+    return removed
+
 def save_contacts_file(file, user_id):
     """Save uploaded contacts file"""
     if file and allowed_excel_file(file.filename):
@@ -1,10 +1,18 @@
 import os
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file
+from urllib.parse import quote
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, current_app
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
 from blueprints.auth.decorators import login_required
+from blueprints.main.utils import invalidate_dashboard_stats
+from sqlalchemy import update, delete
 from config import db
-from models import Hackathon, CertificateTemplate
-from .utils import save_uploaded_file, template_to_image, get_file_path, delete_certificate_files, add_text_to_image
+from models import Hackathon, CertificateTemplate, Participant
+from tasks import enqueue_file_cleanup
+from .utils import (
+    save_uploaded_file, template_to_image, get_file_path, certificate_file_paths, add_text_to_image,
+    get_file_etag, versioned_upload_url, UPLOADS_ROOT
+)
 
 certificates_bp = Blueprint('certificates', __name__)
 
@@ -63,6 +71,7 @@ def upload_template(current_user, hackathon_id):
         
         db.session.add(template)
         db.session.commit()
+        invalidate_dashboard_stats(current_user.id)
         
         flash(f'Certificate template "{name}" uploaded successfully!', 'success')
         return redirect(url_for('certificates.preview_template', 
@@ -114,8 +123,8 @@ def update_preview(current_user, hackathon_id, template_id):
         # Create preview with text (auto-centered on X-axis)
         temp_path = add_text_to_image(preview_path, sample_name, x_position, y_position, font_size, font_color, center_x=True)
         
-        # Return relative path for frontend - normalize path separators
-        relative_path = temp_path.replace('\\', '/').replace('uploads/', '/uploads/')
+        # Return a content-versioned URL for the frontend - normalize path separators
+        relative_path = versioned_upload_url(os.path.relpath(temp_path, UPLOADS_ROOT).replace('\\', '/'))
         
         print(f"DEBUG: Generated temp path: {temp_path}")
         print(f"DEBUG: Relative path: {relative_path}")
@@ -167,13 +176,24 @@ def delete_template(current_user, hackathon_id, template_id):
     template = CertificateTemplate.query.filter_by(id=template_id, hackathon_id=hackathon_id).first_or_404()
     
     try:
-        # Delete files
-        delete_certificate_files(hackathon_id, template.filename)
-        
-        # Delete database record
         template_name = template.name
-        db.session.delete(template)
+        template_files = certificate_file_paths(hackathon_id, template.filename)
+        
+        # Detach participants that were sent this template, then delete the record
+        db.session.execute(
+            update(Participant).where(Participant.certificate_template_id == template_id)
+            .values(certificate_template_id=None),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.execute(
+            delete(CertificateTemplate).where(CertificateTemplate.id == template_id),
+            execution_options={'synchronize_session': False}
+        )
         db.session.commit()
+        invalidate_dashboard_stats(current_user.id)
+        
+        # Template and preview files are removed in the background
+        enqueue_file_cleanup(template_files)
         
         flash(f'Certificate template "{template_name}" deleted successfully!', 'success')
         return redirect(url_for('certificates.list_templates', hackathon_id=hackathon_id))
@@ -185,16 +205,41 @@ def delete_template(current_user, hackathon_id, template_id):
                               hackathon_id=hackathon_id, 
                               template_id=template_id))
 
+certificates_bp.add_app_template_global(versioned_upload_url)
+
+IMMUTABLE_MAX_AGE = 31536000  # One year, for URLs that carry the file's content hash
+
 @certificates_bp.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    """Serve uploaded files"""
+    """Serve uploaded files with strong validators, conditional/Range support and optional proxy offload"""
     try:
-        file_path = os.path.join('uploads', filename)
-        if os.path.exists(file_path):
-            return send_file(file_path)
-        else:
-            print(f"DEBUG: File not found: {file_path}")
+        file_path = safe_join(UPLOADS_ROOT, filename)
+        if not file_path or not os.path.isfile(file_path):
+            print(f"DEBUG: File not found: {filename}")
             return "File not found", 404
+        
+        etag = get_file_etag(file_path)
+        offload = current_app.config.get('UPLOADS_OFFLOAD')
+        
+        # conditional=True answers If-None-Match / If-Modified-Since with 304 and Range with 206
+        response = send_file(file_path, etag=etag, conditional=True, max_age=None)
+        
+        if request.args.get('v') == etag:
+            # Content-hashed URL: the bytes behind it can never change
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        
+        if offload == 'x-accel-redirect' and response.status_code == 200:
+            # Let nginx stream the bytes from its internal location (a URI, so the name is percent-encoded)
+            response.headers['X-Accel-Redirect'] = current_app.config['UPLOADS_ACCEL_PREFIX'].rstrip('/') + '/' + quote(filename)
+            response.close()  # Release the file handle send_file opened
+            response.set_data(b'')
+        
+        return response
     except Exception as e:
         print(f"ERROR serving file: {e}")
         return "Error serving file", 500
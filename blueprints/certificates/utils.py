@@ -1,12 +1,22 @@
 import os
+import glob
 import uuid
+import hashlib
+import threading
 from werkzeug.utils import secure_filename
-from PIL import Image, ImageDraw, ImageFont
-import fitz  # PyMuPDF for PDF processing
-from flask import current_app
+from flask import current_app, url_for
+from metrics import track_certificate_render
 
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
 UPLOAD_FOLDER = 'uploads/certificates'
+UPLOADS_ROOT = 'uploads'
+
+# Per-process cache: path -> (mtime_ns, size, etag); a file is only re-hashed after it changes
+_file_etag_cache = {}
+_file_etag_lock = threading.Lock()
+
+# Per-thread font registry: font_size -> FreeTypeFont
+_font_registry = threading.local()
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -32,6 +42,8 @@ def save_uploaded_file(file, hackathon_id):
 
 def template_to_image(template_path, page_number=0):
     """Convert template (PDF or image) to image for preview"""
+    from PIL import Image
+    import fitz  # PyMuPDF for PDF processing
     try:
         file_ext = os.path.splitext(template_path)[1].lower()
         
@@ -82,40 +94,63 @@ def template_to_image(template_path, page_number=0):
         traceback.print_exc()
         return None
 
+def _open_font(font_size):
+    """Open the certificate font at a size, falling back to Pillow's default"""
+    from PIL import ImageFont
+    for font_path in ("C:/Windows/Fonts/arial.ttf",  # Windows
+                      "arial.ttf",
+                      "/System/Library/Fonts/Arial.ttf"):  # macOS
+        try:
+            return ImageFont.truetype(font_path, font_size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+def load_font(font_size):
+    """Get the certificate font at a size from a per-thread registry (FreeType faces aren't shared)"""
+    fonts = getattr(_font_registry, 'fonts', None)
+    if fonts is None:
+        fonts = _font_registry.fonts = {}
+    font = fonts.get(font_size)
+    if font is None:
+        font = fonts[font_size] = _open_font(font_size)
+    return font
+
+def reset_font_cache():
+    """Drop loaded fonts (called after fork so workers never share FreeType handles)"""
+    global _font_registry
+    _font_registry = threading.local()
+
+def draw_name(img, text, x, y, font_size, font_color, center_x=True):
+    """Draw text onto an open image in place, centred horizontally by default"""
+    from PIL import ImageDraw
+    draw = ImageDraw.Draw(img)
+    
+    # Try to use a better font, fall back to default
+    font = load_font(font_size)
+    
+    # Calculate text dimensions for centering
+    if center_x:
+        # Get text bounding box
+        bbox = draw.textbbox((0, 0), text, font=font)
+        text_width = bbox[2] - bbox[0]
+        image_width = img.width
+        
+        # Center the text horizontally
+        x = (image_width - text_width) // 2
+    
+    # Add text
+    draw.text((x, y), text, fill=font_color, font=font)
+
 def add_text_to_image(image_path, text, x, y, font_size, font_color, center_x=True):
     """Add text overlay to image and return base64 encoded result"""
+    from PIL import Image
     try:
         print(f"DEBUG: Adding text '{text}' to image at {image_path}")
         
         # Open image
         img = Image.open(image_path)
-        draw = ImageDraw.Draw(img)
-        
-        # Try to use a better font, fall back to default
-        font = None
-        try:
-            font = ImageFont.truetype("C:/Windows/Fonts/arial.ttf", font_size)  # Windows
-        except:
-            try:
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)  # macOS
-                except:
-                    font = ImageFont.load_default()
-        
-        # Calculate text dimensions for centering
-        if center_x:
-            # Get text bounding box
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            image_width = img.width
-            
-            # Center the text horizontally
-            x = (image_width - text_width) // 2
-        
-        # Add text
-        draw.text((x, y), text, fill=font_color, font=font)
+        draw_name(img, text, x, y, font_size, font_color, center_x)
         
         # Save to temporary location with highest quality
         temp_path = image_path.replace('_preview.png', '_preview_temp.png')
@@ -130,36 +165,68 @@ def add_text_to_image(image_path, text, x, y, font_size, font_color, center_x=Tr
         traceback.print_exc()
         return image_path
 
+def get_file_etag(file_path):
+    """Strong ETag for a file: SHA-256 of its content, cached until its mtime or size changes"""
+    stat = os.stat(file_path)
+    with _file_etag_lock:
+        cached = _file_etag_cache.get(file_path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    etag = digest.hexdigest()[:32]
+    
+    with _file_etag_lock:
+        _file_etag_cache[file_path] = (stat.st_mtime_ns, stat.st_size, etag)
+    return etag
+
+def versioned_upload_url(filename):
+    """URL for a file under uploads/ carrying its content hash, so it can be cached as immutable"""
+    file_path = os.path.join(UPLOADS_ROOT, filename)
+    if not os.path.isfile(file_path):
+        return url_for('certificates.uploaded_file', filename=filename)
+    return url_for('certificates.uploaded_file', filename=filename, v=get_file_etag(file_path))
+
 def get_file_path(hackathon_id, filename):
     """Get full file path"""
     return os.path.join(UPLOAD_FOLDER, str(hackathon_id), filename)
 
-def delete_certificate_files(hackathon_id, filename):
-    """Delete certificate template and preview image"""
-    try:
-        # Delete template file
-        template_path = get_file_path(hackathon_id, filename)
-        if os.path.exists(template_path):
-            os.remove(template_path)
-        
-        # Delete preview image (works for both PDF and image templates)
-        base, _ = os.path.splitext(template_path)
-        preview_path = f"{base}_preview.png"
-        if os.path.exists(preview_path):
-            os.remove(preview_path)
-        
-        # Delete temp image
-        temp_path = f"{base}_preview_temp.png"
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
-        return True
-    except Exception as e:
-        print(f"Error deleting files: {e}")
-        return False
+def get_generated_dir(hackathon_id):
+    """Get the directory holding a hackathon's generated certificates"""
+    return os.path.join(UPLOAD_FOLDER, str(hackathon_id), 'generated')
 
+def get_render_key(template_filename, x_position, y_position, font_size, font_color):
+    """
+    Name of the generated/ subdirectory for one template and name placement
+    
+    Template filenames are unique per upload and the placement is hashed in, so a
+    certificate on disk is only reused for the exact template and settings it was drawn with.
+    """
+    stem, _ = os.path.splitext(template_filename)
+    settings = f"{x_position}|{y_position}|{font_size}|{font_color}"
+    return f"{stem}_{hashlib.sha256(settings.encode()).hexdigest()[:8]}"
+
+def get_certificate_path(hackathon_id, participant_name, render_key):
+    """Get the generated certificate path for a participant (one file per name and render key)"""
+    safe_name = "".join(c for c in participant_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    safe_name = safe_name.replace(' ', '_')
+    return os.path.join(get_generated_dir(hackathon_id), render_key, f"{safe_name}_certificate.png")
+
+def certificate_file_paths(hackathon_id, filename):
+    """List the files a template owns: the template, its preview images and its generated certificates"""
+    template_path = get_file_path(hackathon_id, filename)
+    base, _ = os.path.splitext(template_path)
+    stem, _ = os.path.splitext(filename)
+    render_dirs = glob.glob(os.path.join(glob.escape(get_generated_dir(hackathon_id)), f"{glob.escape(stem)}_*"))
+    return [template_path, f"{base}_preview.png", f"{base}_preview_temp.png"] + render_dirs
+
+@track_certificate_render
 def generate_certificate_with_name(hackathon_id, template_filename, participant_name, x_position, y_position, font_size, font_color):
     """Generate a certificate PNG with participant's name using the same method as preview"""
+    from PIL import Image
     try:
         print(f"DEBUG: Generating certificate for {participant_name}")
         
@@ -171,38 +238,26 @@ def generate_certificate_with_name(hackathon_id, template_filename, participant_
         print(f"DEBUG: Source template: {template_path}")
         print(f"DEBUG: Preview image: {preview_path}")
         
-        # Create output directory
-        certificate_dir = os.path.join('uploads', 'certificates', str(hackathon_id), 'generated')
-        os.makedirs(certificate_dir, exist_ok=True)
-        
-        # Create unique filename for this participant
-        safe_name = "".join(c for c in participant_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_name = safe_name.replace(' ', '_')
-        
-        # Generate high-quality PNG with text overlay
-        temp_image_path = add_text_to_image(
-            preview_path, 
-            participant_name, 
-            x_position,  # We don't use this since we auto-center
-            y_position, 
-            font_size, 
-            font_color, 
-            center_x=True
-        )
-        
-        print(f"DEBUG: Generated image with text: {temp_image_path}")
-        
-        # Create final certificate name (PNG format for best quality)
-        certificate_name = f"{safe_name}_certificate.png"
-        certificate_path = os.path.join(certificate_dir, certificate_name)
-        
-        # Copy the high-quality image to final location
-        # Open and save to ensure highest quality
-        img = Image.open(temp_image_path)
-        
-        # Save as PNG with maximum quality
-        img.save(certificate_path, 'PNG', optimize=False)
-        img.close()
+        # Create output directory (one per template and name placement)
+        render_key = get_render_key(template_filename, x_position, y_position, font_size, font_color)
+        certificate_path = get_certificate_path(hackathon_id, participant_name, render_key)
+        os.makedirs(os.path.dirname(certificate_path), exist_ok=True)
+        
+        # Draw the name in memory and write straight to the participant's file; the shared
+        # _preview_temp.png used by the preview route is not safe for concurrent renders
+        with Image.open(preview_path) as img:
+            draw_name(
+                img,
+                participant_name,
+                x_position,  # We don't use this since we auto-center
+                y_position,
+                font_size,
+                font_color,
+                center_x=True
+            )
+            
+            # Save as PNG with maximum quality
+            img.save(certificate_path, 'PNG', optimize=False)
         
         print(f"DEBUG: Successfully generated certificate: {certificate_path}")
         return certificate_path
@@ -215,6 +270,7 @@ def generate_certificate_with_name(hackathon_id, template_filename, participant_
 
 def generate_certificate_pdf_from_png(png_path, participant_name):
     """Convert the high-quality PNG certificate to PDF if needed"""
+    from PIL import Image
     try:
         # Create PDF version from PNG
         pdf_path = png_path.replace('.png', '.pdf')
@@ -1,32 +1,152 @@
-from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify, session
+from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify, session, current_app
 from werkzeug.utils import secure_filename
 import os
-from datetime import datetime
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import click
 
 from blueprints.auth.decorators import login_required
+from blueprints.main.utils import invalidate_dashboard_stats
+from blueprints.hackathon.utils import adjust_hackathon_counters, recompute_hackathon_counters
 from config import db
-from models import Hackathon, Participant, CertificateTemplate
-from .utils import process_csv_file, save_csv_file, get_csv_sample_format
+from models import Hackathon, Participant, CertificateTemplate, ParticipantSelection
+from .utils import (
+    save_csv_file, get_csv_sample_format, stream_csv_file_to_staging,
+    upsert_staged_participants, delete_staged_participants, delete_expired_staged_participants,
+    parse_participant_ids, load_selected_participants,
+    mark_certificates_sent, mark_uncompletion_emails_sent,
+    get_participants_page, participant_to_dict, count_pending_participants,
+    filter_participants_query, selection_to_dict, save_participant_selection,
+    get_selection_filters, resolve_participant_selection,
+    PARTICIPANTS_PAGE_SIZE, PARTICIPANT_STATUSES, COMPLETION_FILTERS, CSV_UPLOAD_FOLDER
+)
 from .smtp import EmailSender
-from blueprints.certificates.utils import generate_certificate_with_name
-from blueprints.certificates.utils import get_file_path, generate_certificate_with_name
+from blueprints.certificates.utils import get_file_path, generate_certificate_with_name, get_generated_dir
+from blueprints.certificates.utils import get_certificate_path, get_render_key, reset_font_cache
+from tasks import enqueue_file_cleanup
+from jobs import run_job, JobProgress
 
 csv_bp = Blueprint('csv', __name__)
 
+CLI_SEND_BATCH_SIZE = 50  # Participants per SMTP batch in `flask csv send-certificates`; progress is committed after each
+
+def _participant_filters(args):
+    """Read the participant listing filters from request args"""
+    status = args.get('status', '').strip()
+    completion = args.get('completion', '').strip()
+    return {
+        'status': status if status in PARTICIPANT_STATUSES else None,
+        'team': args.get('team', '').strip() or None,
+        'completion': completion if completion in COMPLETION_FILTERS else None,
+        'search': args.get('q', '').strip() or None,
+        'remarks': args.get('remarks', '').strip() or None
+    }
+
+def _resolve_send_targets(hackathon_id, form):
+    """
+    Resolve who a send request targets, returning (participants, error)
+    
+    selection_mode is 'ids' (posted checkboxes), 'filter' (filter fields, optionally
+    saved under selection_name) or 'saved' (selection_id); filters resolve in SQL.
+    """
+    mode = form.get('selection_mode', 'ids')
+    
+    if mode == 'filter':
+        filters = _participant_filters(form)
+        selection_name = form.get('selection_name', '').strip()
+        if selection_name:
+            save_participant_selection(hackathon_id, selection_name[:100], filters)
+    elif mode == 'saved':
+        filters = get_selection_filters(hackathon_id, form.get('selection_id', type=int))
+        if filters is None:
+            return [], 'Please choose a saved selection.'
+    else:
+        selected_ids = parse_participant_ids(form.getlist('participants'))
+        if not selected_ids:
+            return [], 'Please select at least one participant.'
+        return load_selected_participants(hackathon_id, selected_ids), None
+    
+    participants = resolve_participant_selection(hackathon_id, filters)
+    if not participants:
+        return [], 'No participants match this selection.'
+    return participants, None
+
 @csv_bp.route('/hackathon/<int:hackathon_id>/participants')
 @login_required
 def list_participants(current_user, hackathon_id):
-    """List all participants for a hackathon"""
+    """List participants for a hackathon (first page; the rest load incrementally)"""
     hackathon = Hackathon.query.filter_by(id=hackathon_id, user_id=current_user.id).first_or_404()
-    participants = Participant.query.filter_by(hackathon_id=hackathon_id).all()
+    filters = _participant_filters(request.args)
+    participants, next_after = get_participants_page(hackathon_id, **filters)
     templates = CertificateTemplate.query.filter_by(hackathon_id=hackathon_id).all()
     
     return render_template('csv/participants.html', 
                          hackathon=hackathon, 
                          participants=participants,
+                         next_after=next_after,
+                         filters=filters,
+                         pending_count=count_pending_participants(hackathon_id),
                          templates=templates,
                          user=current_user)
 
+@csv_bp.route('/hackathon/<int:hackathon_id>/participants/data')
+@login_required
+def participants_data(current_user, hackathon_id):
+    """Page through a hackathon's participants with filters and search (keyset paginated JSON API)"""
+    Hackathon.query.filter_by(id=hackathon_id, user_id=current_user.id).first_or_404()
+    
+    after = request.args.get('after', type=int)
+    limit = min(max(request.args.get('limit', PARTICIPANTS_PAGE_SIZE, type=int), 1), 500)
+    participants, next_after = get_participants_page(
+        hackathon_id, after_id=after, limit=limit, **_participant_filters(request.args)
+    )
+    
+    return jsonify({
+        'success': True,
+        'participants': [participant_to_dict(participant) for participant in participants],
+        'next_after': next_after
+    })
+
+@csv_bp.route('/hackathon/<int:hackathon_id>/participants/selections', methods=['GET', 'POST'])
+@login_required
+def participant_selections(current_user, hackathon_id):
+    """List saved participant selections, or save the posted filters under a name (JSON)"""
+    Hackathon.query.filter_by(id=hackathon_id, user_id=current_user.id).first_or_404()
+    
+    if request.method == 'POST':
+        name = request.form.get('name', '').strip()
+        if not name:
+            return jsonify({'success': False, 'error': 'Selection name is required'}), 400
+        selection = save_participant_selection(hackathon_id, name[:100], _participant_filters(request.form))
+        return jsonify({'success': True, 'selection': selection_to_dict(selection)})
+    
+    selections = ParticipantSelection.query.filter_by(hackathon_id=hackathon_id).order_by(ParticipantSelection.name).all()
+    return jsonify({'success': True, 'selections': [selection_to_dict(selection) for selection in selections]})
+
+@csv_bp.route('/hackathon/<int:hackathon_id>/participants/selections/<int:selection_id>/delete', methods=['POST'])
+@login_required
+def delete_participant_selection(current_user, hackathon_id, selection_id):
+    """Delete a saved participant selection"""
+    Hackathon.query.filter_by(id=hackathon_id, user_id=current_user.id).first_or_404()
+    ParticipantSelection.query.filter_by(id=selection_id, hackathon_id=hackathon_id).delete()
+    db.session.commit()
+    return jsonify({'success': True})
+
+@csv_bp.route('/hackathon/<int:hackathon_id>/participants/selections/count')
+@login_required
+def count_participant_selection(current_user, hackathon_id):
+    """Count the participants a filter or saved selection resolves to (JSON)"""
+    Hackathon.query.filter_by(id=hackathon_id, user_id=current_user.id).first_or_404()
+    
+    if request.args.get('selection_id'):
+        filters = get_selection_filters(hackathon_id, request.args.get('selection_id', type=int))
+        if filters is None:
+            return jsonify({'success': False, 'error': 'Selection not found'}), 404
+    else:
+        filters = _participant_filters(request.args)
+    
+    return jsonify({'success': True, 'count': filter_participants_query(hackathon_id, **filters).count()})
+
 @csv_bp.route('/hackathon/<int:hackathon_id>/participants/upload', methods=['GET', 'POST'])
 @login_required
 def upload_csv(current_user, hackathon_id):
@@ -56,48 +176,35 @@ def upload_csv(current_user, hackathon_id):
         flash('Invalid file type. Please upload a CSV file.', 'error')
         return redirect(request.url)
     
-    # Process CSV file
-    result = process_csv_file(file_path)
-    
-    if not result['success']:
-        flash(f"Error processing CSV: {result['error']}", 'error')
-        if 'available_columns' in result:
-            flash(f"Available columns: {', '.join(result['available_columns'])}", 'info')
-        return redirect(request.url)
+    # Staged rows left behind by imports that failed part-way
+    delete_expired_staged_participants(current_app.config['STAGING_UPLOAD_MAX_AGE_HOURS'])
     
-    # Clear existing participants for this hackathon (optional - you might want to append instead)
-    existing_count = Participant.query.filter_by(hackathon_id=hackathon_id).count()
-    if existing_count > 0:
-        if request.form.get('replace_existing') == 'yes':
-            Participant.query.filter_by(hackathon_id=hackathon_id).delete()
-            flash(f'Replaced {existing_count} existing participants', 'info')
-    
-    # Add new participants to database
-    added_count = 0
-    for participant_data in result['participants']:
-        # Check if participant already exists (by email)
-        existing = Participant.query.filter_by(
-            email=participant_data['email'], 
-            hackathon_id=hackathon_id
-        ).first()
+    with run_job('ingest_participants', current_user.id, hackathon_id) as job:
+        # Process CSV file in chunks into the staging table (bounded memory for large files)
+        result = stream_csv_file_to_staging(file_path, current_user.id, hackathon_id)
         
-        if not existing:
-            participant = Participant(
-                name=participant_data['name'],
-                email=participant_data['email'],
-                hackathon_id=hackathon_id,
-                team_name=participant_data.get('team_name'),
-                member_position=participant_data.get('member_position'),
-                completion_remarks=participant_data.get('completion_remarks', '')
-            )
-            db.session.add(participant)
-            added_count += 1
-        else:
-            # Update completion remarks for existing participants
-            existing.completion_remarks = participant_data.get('completion_remarks', '')
-            db.session.add(existing)
-    
-    db.session.commit()
+        if not result['success']:
+            job.fail(result['error'])
+            flash(f"Error processing CSV: {result['error']}", 'error')
+            if 'available_columns' in result:
+                flash(f"Available columns: {', '.join(result['available_columns'])}", 'info')
+            return redirect(request.url)
+        
+        # Clear existing participants for this hackathon (optional - you might want to append instead)
+        existing_count = hackathon.participant_count
+        if existing_count > 0:
+            if request.form.get('replace_existing') == 'yes':
+                Participant.query.filter_by(hackathon_id=hackathon_id).delete()
+                recompute_hackathon_counters([hackathon_id])
+                flash(f'Replaced {existing_count} existing participants', 'info')
+        
+        # Upsert participants in batched statements, one staged batch at a time
+        added_count = upsert_staged_participants(hackathon_id, result['upload_id'])
+        
+        delete_staged_participants(result['upload_id'])
+        invalidate_dashboard_stats(current_user.id)
+        job.stats.update(participants=result['total_participants'], added=added_count, invalid=result['invalid_count'])
+        job.stage('ingest')
     
     # Show success message with stats
     success_msg = f"Successfully processed {result['total_participants']} participants from {result['total_teams']} teams"
@@ -119,7 +226,8 @@ def upload_csv(current_user, hackathon_id):
 def send_certificates(current_user, hackathon_id):
     """Send certificates to selected participants"""
     hackathon = Hackathon.query.filter_by(id=hackathon_id, user_id=current_user.id).first_or_404()
-    participants = Participant.query.filter_by(hackathon_id=hackathon_id).all()
+    participants, next_after = get_participants_page(hackathon_id)
+    selections = ParticipantSelection.query.filter_by(hackathon_id=hackathon_id).order_by(ParticipantSelection.name).all()
     templates = CertificateTemplate.query.filter_by(hackathon_id=hackathon_id).all()
     
     if not templates:
@@ -134,18 +242,22 @@ def send_certificates(current_user, hackathon_id):
         return render_template('csv/send.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              templates=templates,
                              user=current_user)
     
     # Handle POST request - send certificates
-    selected_participants = request.form.getlist('participants')
+    targets, selection_error = _resolve_send_targets(hackathon_id, request.form)
     template_id = request.form.get('template_id')
     
-    if not selected_participants:
-        flash('Please select at least one participant.', 'error')
+    if selection_error:
+        flash(selection_error, 'error')
         return render_template('csv/send.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              templates=templates,
                              user=current_user)
     
@@ -154,10 +266,12 @@ def send_certificates(current_user, hackathon_id):
         return render_template('csv/send.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              templates=templates,
                              user=current_user)
     
-    template = CertificateTemplate.query.get_or_404(template_id)
+    template = CertificateTemplate.query.filter_by(id=template_id, hackathon_id=hackathon_id).first_or_404()
     
     # Start email sending process
     try:
@@ -170,15 +284,16 @@ def send_certificates(current_user, hackathon_id):
             return render_template('csv/send.html', 
                                  hackathon=hackathon, 
                                  participants=participants,
+                                 next_after=next_after,
+                                 selections=selections,
                                  templates=templates,
                                  user=current_user)
         
-        participants_to_send = []
-        
-        # Generate certificates for selected participants
-        for participant_id in selected_participants:
-            participant = Participant.query.get(participant_id)
-            if participant:
+        with run_job('send_certificates', current_user.id, hackathon_id) as job:
+            participants_to_send = []
+            
+            # Generate certificates for the resolved selection
+            for participant in targets:
                 # Generate certificate with participant's name
                 certificate_path = generate_certificate_with_name(
                     hackathon_id, 
@@ -200,35 +315,37 @@ def send_certificates(current_user, hackathon_id):
                     })
                 else:
                     flash(f'Failed to generate certificate for {participant.name}', 'warning')
-        
-        if not participants_to_send:
-            flash('Failed to generate certificates for any participant. Please try again.', 'error')
-            return render_template('csv/send.html', 
-                                 hackathon=hackathon, 
-                                 participants=participants,
-                                 templates=templates,
-                                 user=current_user)
-        
-        # Send emails
-        def progress_callback(current, total, name):
-            print(f"Progress: {current}/{total} - Sending to {name}")
-        
-        results = email_sender.send_bulk_certificates(
-            participants_to_send, 
-            hackathon.name,
-            hackathon.feedback_form_link,
-            progress_callback
-        )
-        
-        # Update database with sent status
-        for participant_data in participants_to_send:
-            participant = Participant.query.get(participant_data['participant_id'])
-            if participant:
-                participant.certificate_sent = True
-                participant.certificate_template_id = template_id
-                participant.sent_at = datetime.utcnow()
-        
-        db.session.commit()
+            
+            job.stage('render')
+            
+            if not participants_to_send:
+                job.fail('No certificates could be generated')
+                flash('Failed to generate certificates for any participant. Please try again.', 'error')
+                return render_template('csv/send.html', 
+                                     hackathon=hackathon, 
+                                     participants=participants,
+                                     next_after=next_after,
+                                     selections=selections,
+                                     templates=templates,
+                                     user=current_user)
+            
+            # Send emails
+            def progress_callback(current, total, name):
+                print(f"Progress: {current}/{total} - Sending to {name}")
+            
+            results = email_sender.send_bulk_certificates(
+                participants_to_send, 
+                hackathon.name,
+                hackathon.feedback_form_link,
+                progress_callback
+            )
+            
+            # Update database with sent status, only for recipients whose email actually went out
+            mark_certificates_sent(hackathon_id, results['sent_ids'], template.id)
+            db.session.commit()
+            invalidate_dashboard_stats(current_user.id)
+            job.stats.update(rendered=len(participants_to_send), sent=results['sent'], failed=results['failed'])
+            job.stage('send')
         
         # Show results
         if results['sent'] > 0:
@@ -246,6 +363,8 @@ def send_certificates(current_user, hackathon_id):
         return render_template('csv/send.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              templates=templates,
                              user=current_user)
     except Exception as e:
@@ -253,6 +372,8 @@ def send_certificates(current_user, hackathon_id):
         return render_template('csv/send.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              templates=templates,
                              user=current_user)
 
@@ -261,7 +382,8 @@ def send_certificates(current_user, hackathon_id):
 def send_uncompletion_emails(current_user, hackathon_id):
     """Send uncompletion emails to selected participants"""
     hackathon = Hackathon.query.filter_by(id=hackathon_id, user_id=current_user.id).first_or_404()
-    participants = Participant.query.filter_by(hackathon_id=hackathon_id).all()
+    participants, next_after = get_participants_page(hackathon_id)
+    selections = ParticipantSelection.query.filter_by(hackathon_id=hackathon_id).order_by(ParticipantSelection.name).all()
     
     if not participants:
         flash('No participants found. Please upload a CSV file with participant data first.', 'error')
@@ -275,16 +397,20 @@ def send_uncompletion_emails(current_user, hackathon_id):
         return render_template('csv/send_uncompletion.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              user=current_user)
     
     # Handle POST request - send uncompletion emails
-    selected_participants = request.form.getlist('participants')
+    targets, selection_error = _resolve_send_targets(hackathon_id, request.form)
     
-    if not selected_participants:
-        flash('Please select at least one participant.', 'error')
+    if selection_error:
+        flash(selection_error, 'error')
         return render_template('csv/send_uncompletion.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              user=current_user)
     
     # Start email sending process
@@ -298,48 +424,48 @@ def send_uncompletion_emails(current_user, hackathon_id):
             return render_template('csv/send_uncompletion.html', 
                                  hackathon=hackathon, 
                                  participants=participants,
+                                 next_after=next_after,
+                                 selections=selections,
                                  user=current_user)
         
         participants_to_send = []
         
-        # Prepare participants for uncompletion emails
-        for participant_id in selected_participants:
-            participant = Participant.query.get(participant_id)
-            if participant:
-                participants_to_send.append({
-                    'name': participant.name,
-                    'email': participant.email,
-                    'completion_remarks': participant.completion_remarks or 'No specific remarks provided.',
-                    'participant_id': participant.id
-                })
+        # Prepare participants for uncompletion emails from the resolved selection
+        for participant in targets:
+            participants_to_send.append({
+                'name': participant.name,
+                'email': participant.email,
+                'completion_remarks': participant.completion_remarks or 'No specific remarks provided.',
+                'participant_id': participant.id
+            })
         
         if not participants_to_send:
             flash('No valid participants selected. Please try again.', 'error')
             return render_template('csv/send_uncompletion.html', 
                                  hackathon=hackathon, 
                                  participants=participants,
+                                 next_after=next_after,
+                                 selections=selections,
                                  user=current_user)
         
-        # Send uncompletion emails
-        def progress_callback(current, total, name):
-            print(f"Progress: {current}/{total} - Sending uncompletion email to {name}")
-        
-        results = email_sender.send_bulk_uncompletion_emails(
-            participants_to_send, 
-            hackathon.name,
-            hackathon.resubmission_form_link,
-            hackathon.feedback_form_link,
-            progress_callback
-        )
-        
-        # Update database with uncompletion email sent status
-        for participant_data in participants_to_send:
-            participant = Participant.query.get(participant_data['participant_id'])
-            if participant:
-                participant.uncompletion_email_sent = True
-                participant.uncompletion_email_sent_at = datetime.utcnow()
-        
-        db.session.commit()
+        with run_job('send_uncompletion_emails', current_user.id, hackathon_id) as job:
+            # Send uncompletion emails
+            def progress_callback(current, total, name):
+                print(f"Progress: {current}/{total} - Sending uncompletion email to {name}")
+            
+            results = email_sender.send_bulk_uncompletion_emails(
+                participants_to_send, 
+                hackathon.name,
+                hackathon.resubmission_form_link,
+                hackathon.feedback_form_link,
+                progress_callback
+            )
+            
+            # Update database with uncompletion email sent status, only for recipients whose email actually went out
+            mark_uncompletion_emails_sent(hackathon_id, results['sent_ids'])
+            db.session.commit()
+            job.stats.update(sent=results['sent'], failed=results['failed'])
+            job.stage('send')
         
         # Show results
         if results['sent'] > 0:
@@ -357,12 +483,16 @@ def send_uncompletion_emails(current_user, hackathon_id):
         return render_template('csv/send_uncompletion.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              user=current_user)
     except Exception as e:
         flash(f"Error sending uncompletion emails: {str(e)}", 'error')
         return render_template('csv/send_uncompletion.html', 
                              hackathon=hackathon, 
                              participants=participants,
+                             next_after=next_after,
+                             selections=selections,
                              user=current_user)
 
 @csv_bp.route('/hackathon/<int:hackathon_id>/participants/<int:participant_id>/delete', methods=['POST'])
@@ -373,8 +503,15 @@ def delete_participant(current_user, hackathon_id, participant_id):
     participant = Participant.query.filter_by(id=participant_id, hackathon_id=hackathon_id).first_or_404()
     
     participant_name = participant.name
+    adjust_hackathon_counters(
+        hackathon_id,
+        participants=-1,
+        certificates_sent=-1 if participant.certificate_sent else 0,
+        uncompletion_emails_sent=-1 if participant.uncompletion_email_sent else 0
+    )
     db.session.delete(participant)
     db.session.commit()
+    invalidate_dashboard_stats(current_user.id)
     
     flash(f'Participant "{participant_name}" deleted successfully.', 'success')
     return redirect(url_for('csv.list_participants', hackathon_id=hackathon_id))
@@ -385,9 +522,244 @@ def clear_all_participants(current_user, hackathon_id):
     """Clear all participants for a hackathon"""
     hackathon = Hackathon.query.filter_by(id=hackathon_id, user_id=current_user.id).first_or_404()
     
-    count = Participant.query.filter_by(hackathon_id=hackathon_id).count()
+    count = hackathon.participant_count
     Participant.query.filter_by(hackathon_id=hackathon_id).delete()
+    hackathon.participant_count = 0
+    hackathon.certificates_sent_count = 0
+    hackathon.uncompletion_emails_sent_count = 0
     db.session.commit()
+    invalidate_dashboard_stats(current_user.id)
+    
+    # Generated certificates and uploaded CSVs are removed in the background
+    enqueue_file_cleanup([
+        get_generated_dir(hackathon_id),
+        os.path.join(CSV_UPLOAD_FOLDER, str(hackathon_id))
+    ])
     
     flash(f'Cleared {count} participants successfully.', 'success')
     return redirect(url_for('csv.list_participants', hackathon_id=hackathon_id))
+
+def _cli_hackathon_and_template(hackathon_id, template_id=None):
+    """Load a hackathon (and one of its certificate templates) for a CLI command, or stop with an error"""
+    hackathon = db.session.get(Hackathon, hackathon_id)
+    if not hackathon:
+        raise click.ClickException(f"Hackathon {hackathon_id} not found")
+    if template_id is None:
+        return hackathon, None
+    template = CertificateTemplate.query.filter_by(id=template_id, hackathon_id=hackathon_id).first()
+    if not template:
+        raise click.ClickException(f"Certificate template {template_id} not found for hackathon {hackathon_id}")
+    return hackathon, template
+
+def _template_render_key(template):
+    """Render key for a certificate template's current name placement"""
+    return get_render_key(template.filename, template.name_x_position, template.name_y_position,
+                          template.font_size, template.font_color)
+
+@csv_bp.cli.command('ingest-participants')
+@click.argument('hackathon_id', type=int)
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--replace', is_flag=True, help='Delete the hackathon\'s existing participants first')
+@click.option('--track-memory/--no-track-memory', default=None, help='Override JOB_MEMORY_TRACKING for this run')
+@click.option('--profile/--no-profile', default=None, help='Run under cProfile (saved with the other captured profiles)')
+def ingest_participants_command(hackathon_id, csv_path, replace, track_memory, profile):
+    """
+    Ingest a participants CSV into a hackathon
+    
+    The upsert is keyed on email, so re-running after an interruption just completes the import.
+    """
+    hackathon, _ = _cli_hackathon_and_template(hackathon_id)
+    user_id = hackathon.user_id
+    
+    with run_job('ingest_participants', user_id, hackathon_id, track_memory, profile) as job:
+        click.echo(f"Job {job.id}: ingesting {csv_path} into '{hackathon.name}'")
+        result = stream_csv_file_to_staging(csv_path, user_id, hackathon_id)
+        if not result['success']:
+            if 'available_columns' in result:
+                click.echo(f"Available columns: {', '.join(result['available_columns'])}")
+            raise click.ClickException(result['error'])
+        click.echo(f"Staged {result['total_participants']} participants from {result['total_teams']} teams "
+                   f"({result['invalid_count']} invalid entries skipped)")
+        
+        try:
+            if replace and hackathon.participant_count > 0:
+                Participant.query.filter_by(hackathon_id=hackathon_id).delete()
+                recompute_hackathon_counters([hackathon_id])
+                click.echo('Removed existing participants')
+            added_count = upsert_staged_participants(hackathon_id, result['upload_id'])
+        finally:
+            delete_staged_participants(result['upload_id'])
+        
+        invalidate_dashboard_stats(user_id)
+        job.stats.update(participants=result['total_participants'], added=added_count, invalid=result['invalid_count'])
+        job.stage('ingest')
+    
+    if job.stats.get('profile'):
+        click.echo(f"Profile: {job.stats['profile']}")
+    click.echo(f"Added {added_count} new participants, updated {result['total_participants'] - added_count}")
+
+@csv_bp.cli.command('render-certificates')
+@click.argument('hackathon_id', type=int)
+@click.option('--template-id', type=int, required=True, help='Certificate template to render with')
+@click.option('--workers', type=click.IntRange(min=1), default=os.cpu_count() or 1, show_default=True,
+              help='Render processes')
+@click.option('--status', type=click.Choice(PARTICIPANT_STATUSES), help='Only render participants with this status')
+@click.option('--force', is_flag=True, help='Re-render certificates that already exist')
+@click.option('--track-memory/--no-track-memory', default=None, help='Override JOB_MEMORY_TRACKING for this run')
+@click.option('--profile/--no-profile', default=None, help='Run under cProfile (saved with the other captured profiles)')
+def render_certificates_command(hackathon_id, template_id, workers, status, force, track_memory, profile):
+    """
+    Render certificates for a hackathon's participants across worker processes
+    
+    Certificates already rendered with this template and name placement are skipped unless
+    --force, so an interrupted run resumes where it stopped; send-certificates then attaches
+    the rendered files.
+    """
+    hackathon, template = _cli_hackathon_and_template(hackathon_id, template_id)
+    
+    # One file per name, so render each distinct name once
+    names = [name for (name,) in filter_participants_query(hackathon_id, status=status)
+             .with_entities(Participant.name).distinct().order_by(Participant.name)]
+    render_key = _template_render_key(template)
+    pending = [name for name in names if force or not os.path.exists(get_certificate_path(hackathon_id, name, render_key))]
+    
+    with run_job('render_certificates', hackathon.user_id, hackathon_id, track_memory, profile) as job:
+        click.echo(f"Job {job.id}: rendering {len(pending)} certificates for '{hackathon.name}' with "
+                   f"'{template.name}' on {workers} workers ({len(names) - len(pending)} already rendered)")
+        
+        render = functools.partial(
+            generate_certificate_with_name, hackathon_id, template.filename,
+            x_position=template.name_x_position,
+            y_position=template.name_y_position,
+            font_size=template.font_size,
+            font_color=template.font_color
+        )
+        failed_names = []
+        progress = JobProgress('Rendered', len(pending))
+        
+        if workers == 1 or len(pending) < 2:
+            results = map(render, pending)
+            executor = None
+        else:
+            # Workers only render files; the database stays in this process
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=reset_font_cache)
+            results = executor.map(render, pending, chunksize=max(1, min(32, len(pending) // (workers * 8))))
+        try:
+            for done, (name, certificate_path) in enumerate(zip(pending, results), 1):
+                if not certificate_path:
+                    failed_names.append(name)
+                progress.update(done)
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+        
+        rendered = len(pending) - len(failed_names)
+        job.stats.update(rendered=rendered, skipped=len(names) - len(pending), failed=len(failed_names), workers=workers)
+        job.stage('render')
+        if failed_names and not rendered:
+            job.fail('No certificates could be generated')
+    
+    if job.stats.get('profile'):
+        click.echo(f"Profile: {job.stats['profile']}")
+    click.echo(f"Rendered {rendered} certificates, {len(failed_names)} failed")
+    for name in failed_names[:10]:
+        click.echo(f"  failed: {name}")
+
+@csv_bp.cli.command('send-certificates')
+@click.argument('hackathon_id', type=int)
+@click.option('--template-id', type=int, required=True, help='Certificate template recorded on sent participants')
+@click.option('--status', type=click.Choice(PARTICIPANT_STATUSES), default='unsent', show_default=True,
+              help='Participants to send to')
+@click.option('--batch-size', type=click.IntRange(min=1), default=CLI_SEND_BATCH_SIZE, show_default=True,
+              help='Participants per SMTP batch; sent status is committed after each')
+@click.option('--limit', type=click.IntRange(min=1), help='Stop after this many participants')
+@click.option('--track-memory/--no-track-memory', default=None, help='Override JOB_MEMORY_TRACKING for this run')
+@click.option('--profile/--no-profile', default=None, help='Run under cProfile (saved with the other captured profiles)')
+def send_certificates_command(hackathon_id, template_id, status, batch_size, limit, track_memory, profile):
+    """
+    Email rendered certificates to a hackathon's participants
+    
+    Only unsent participants are targeted by default and delivery is recorded after every
+    batch, so re-running after an interruption continues with whoever is left. Certificates
+    not yet rendered with this template are rendered on the fly (run render-certificates first for big events).
+    """
+    hackathon, template = _cli_hackathon_and_template(hackathon_id, template_id)
+    hackathon_name, feedback_link, user_id = hackathon.name, hackathon.feedback_form_link, hackathon.user_id
+    render_key = _template_render_key(template)
+    
+    try:
+        email_sender = EmailSender()
+    except ValueError as e:
+        raise click.ClickException(f"Email configuration error: {e}")
+    connection_test = email_sender.test_connection()
+    if not connection_test['success']:
+        raise click.ClickException(f"Email connection failed: {connection_test['error']}")
+    
+    total = filter_participants_query(hackathon_id, status=status).count()
+    if limit:
+        total = min(total, limit)
+    
+    with run_job('send_certificates', user_id, hackathon_id, track_memory, profile) as job:
+        click.echo(f"Job {job.id}: sending {total} certificates for '{hackathon_name}'")
+        progress = JobProgress('Sent', total)
+        counts = {'processed': 0, 'rendered': 0, 'sent': 0, 'failed': 0}
+        errors = []
+        after_id = None
+        
+        while counts['processed'] < total:
+            participants, after_id = get_participants_page(
+                hackathon_id, after_id=after_id, limit=min(batch_size, total - counts['processed']), status=status
+            )
+            if not participants:
+                break
+            
+            participants_to_send = []
+            for participant in participants:
+                certificate_path = get_certificate_path(hackathon_id, participant.name, render_key)
+                if not os.path.exists(certificate_path):
+                    certificate_path = generate_certificate_with_name(
+                        hackathon_id,
+                        template.filename,
+                        participant.name,
+                        template.name_x_position,
+                        template.name_y_position,
+                        template.font_size,
+                        template.font_color
+                    )
+                    if certificate_path:
+                        counts['rendered'] += 1
+                
+                if certificate_path:
+                    participants_to_send.append({
+                        'name': participant.name,
+                        'email': participant.email,
+                        'certificate_path': certificate_path,
+                        'participant_id': participant.id,
+                        'completion_remarks': participant.completion_remarks
+                    })
+                else:
+                    counts['failed'] += 1
+                    errors.append(f"Failed to generate certificate for {participant.name}")
+            
+            results = email_sender.send_bulk_certificates(participants_to_send, hackathon_name, feedback_link)
+            mark_certificates_sent(hackathon_id, results['sent_ids'], template.id)
+            db.session.commit()
+            
+            counts['processed'] += len(participants)
+            counts['sent'] += results['sent']
+            counts['failed'] += results['failed']
+            errors.extend(results['errors'])
+            progress.update(counts['processed'])
+            
+            if after_id is None:
+                break
+        
+        invalidate_dashboard_stats(user_id)
+        job.stats.update(rendered=counts['rendered'], sent=counts['sent'], failed=counts['failed'])
+        job.stage('send')
+    
+    if job.stats.get('profile'):
+        click.echo(f"Profile: {job.stats['profile']}")
+    click.echo(f"Sent {counts['sent']} certificates, {counts['failed']} failed")
+    for error in errors[:10]:
+        click.echo(f"  {error}")
@@ -6,6 +6,7 @@ from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime
 from dotenv import load_dotenv
+from metrics import smtp_phase, record_email_sent, record_email_failed
 
 load_dotenv()
 
@@ -99,22 +100,27 @@ This is an automated email. Please do not reply to this message.
             print(f"ERROR creating email: {e}")
             return None
     
-    def send_email(self, msg):
+    def send_email(self, msg, kind='certificate'):
         """Send email using SMTP"""
         try:
             print(f"DEBUG: Connecting to SMTP server {self.smtp_server}:{self.smtp_port}")
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()  # Enable security
-            server.login(self.email_address, self.email_password)
+            with smtp_phase('connect'):
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                server.starttls()  # Enable security
+            with smtp_phase('login'):
+                server.login(self.email_address, self.email_password)
             
             text = msg.as_string()
-            server.sendmail(self.email_address, msg['To'], text)
+            with smtp_phase('data'):
+                server.sendmail(self.email_address, msg['To'], text)
             server.quit()
             
+            record_email_sent(kind)
             print(f"DEBUG: Email sent successfully to {msg['To']}")
             return {'success': True}
             
         except Exception as e:
+            record_email_failed(kind, e)
             print(f"ERROR sending email: {e}")
             return {'success': False, 'error': str(e)}
     
@@ -125,12 +131,14 @@ This is an automated email. Please do not reply to this message.
         msg = self.create_certificate_email(recipient_name, recipient_email, hackathon_name, certificate_path, feedback_link, completion_remarks)
         if msg:
             return self.send_email(msg)
+        record_email_failed('certificate', 'build')
         return {'success': False, 'error': 'Failed to create email'}
     
     def send_bulk_certificates(self, participants_data, hackathon_name, feedback_link=None, progress_callback=None):
         """
         Send certificates to multiple participants
-        participants_data: list of dict with 'name', 'email', 'certificate_path', 'completion_remarks' (optional)
+        participants_data: list of dict with 'name', 'email', 'certificate_path', 'completion_remarks' (optional), 'participant_id' (optional)
+        Ids of participants whose email was accepted are collected in results['sent_ids']
         """
         print(f"DEBUG: Starting bulk certificate sending for {len(participants_data)} participants")
         
@@ -138,7 +146,8 @@ This is an automated email. Please do not reply to this message.
             'total': len(participants_data),
             'sent': 0,
             'failed': 0,
-            'errors': []
+            'errors': [],
+            'sent_ids': []
         }
         
         for i, participant in enumerate(participants_data):
@@ -159,6 +168,8 @@ This is an automated email. Please do not reply to this message.
                 
                 if result['success']:
                     results['sent'] += 1
+                    if participant.get('participant_id') is not None:
+                        results['sent_ids'].append(participant['participant_id'])
                     print(f"✅ Sent certificate to {participant['name']} ({participant['email']})")
                 else:
                     results['failed'] += 1
@@ -243,13 +254,15 @@ This is an automated email. Please do not reply to this message.
         
         msg = self.create_uncompletion_email(recipient_name, recipient_email, hackathon_name, completion_remarks, resubmission_link, feedback_link)
         if msg:
-            return self.send_email(msg)
+            return self.send_email(msg, kind='uncompletion')
+        record_email_failed('uncompletion', 'build')
         return {'success': False, 'error': 'Failed to create uncompletion email'}
 
     def send_bulk_uncompletion_emails(self, participants_data, hackathon_name, resubmission_link, feedback_link=None, progress_callback=None):
         """
         Send uncompletion emails to multiple participants
-        participants_data: list of dict with 'name', 'email', 'completion_remarks'
+        participants_data: list of dict with 'name', 'email', 'completion_remarks', 'participant_id' (optional)
+        Ids of participants whose email was accepted are collected in results['sent_ids']
         """
         print(f"DEBUG: Starting bulk uncompletion email sending for {len(participants_data)} participants")
         
@@ -257,7 +270,8 @@ This is an automated email. Please do not reply to this message.
             'total': len(participants_data),
             'sent': 0,
             'failed': 0,
-            'errors': []
+            'errors': [],
+            'sent_ids': []
         }
         
         for i, participant in enumerate(participants_data):
@@ -275,6 +289,8 @@ This is an automated email. Please do not reply to this message.
                 
                 if result['success']:
                     results['sent'] += 1
+                    if participant.get('participant_id') is not None:
+                        results['sent_ids'].append(participant['participant_id'])
                     print(f"✅ Sent uncompletion email to {participant['name']} ({participant['email']})")
                 else:
                     results['failed'] += 1
@@ -1,59 +1,170 @@
-import pandas as pd
 import os
-import re
-from datetime import datetime
+import json
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import insert, update, select, delete, or_
+from sqlalchemy.dialects import postgresql, sqlite
 from werkzeug.utils import secure_filename
 
+from config import db
+from metrics import track_ingest
+from models import Participant, ParticipantSelection, StagingUpload, StagedParticipant
+from blueprints.hackathon.utils import adjust_hackathon_counters
+
 ALLOWED_CSV_EXTENSIONS = {'csv'}
 CSV_UPLOAD_FOLDER = 'uploads/csv'
+INGEST_CHUNK_SIZE = 5000  # Rows per chunk for streaming ingestion
+MAX_REPORTED_INVALID_EMAILS = 100  # Invalid emails kept for reporting when streaming
+SELECTION_BATCH_SIZE = 500  # Ids per IN clause when loading or updating a selection
+PARTICIPANTS_PAGE_SIZE = 100  # Participants per page in listings and the participants API
+PARTICIPANT_STATUSES = ('sent', 'unsent', 'uncompletion_sent', 'pending')
+COMPLETION_FILTERS = ('with_remarks', 'without_remarks')
+# Read every cell as text and only empty cells as missing, so team names and remarks come out
+# as written ('5', not '5.0') and chunked reads agree with whole-file reads
+CSV_READ_OPTIONS = {'dtype': str, 'keep_default_na': False, 'na_values': ['']}
+SELECTION_FILTER_KEYS = ('status', 'team', 'completion', 'search', 'remarks')
 
 def allowed_csv_file(filename):
     """Check if uploaded file is a valid CSV"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_CSV_EXTENSIONS
 
+def find_csv_columns(available_cols):
+    """
+    Locate team member, team name and completion remarks columns
+    Column names are expected to be lowercased and stripped already
+    """
+    # Expected column patterns for team registration
+    member_patterns = [
+        {'name': 'name of 1st member:', 'email': 'email of 1st member:'},
+        {'name': 'name of 2nd member:', 'email': 'email of 2nd member:'},
+        {'name': 'name of 3rd member:', 'email': 'email of 3rd member:'}
+    ]
+    
+    # Find the actual column names that match our patterns
+    found_columns = []
+    
+    for i, pattern in enumerate(member_patterns):
+        name_col = None
+        email_col = None
+        
+        # Find name column (flexible matching)
+        for col in available_cols:
+            if f'{i+1}st member' in col or f'{i+1}nd member' in col or f'{i+1}rd member' in col:
+                if 'name' in col:
+                    name_col = col
+                elif 'email' in col:
+                    email_col = col
+        
+        if name_col and email_col:
+            found_columns.append({'name': name_col, 'email': email_col, 'member_num': i+1})
+            print(f"DEBUG: Found member {i+1} columns - Name: {name_col}, Email: {email_col}")
+    
+    # Find team name and completion remarks columns
+    team_name_col = None
+    completion_remarks_col = None
+    
+    for col in available_cols:
+        if 'team name' in col or 'team' in col:
+            team_name_col = col
+        elif 'completion remarks' in col or 'remarks' in col or 'completion' in col:
+            completion_remarks_col = col
+    
+    print(f"DEBUG: Team name column: {team_name_col}")
+    print(f"DEBUG: Completion remarks column: {completion_remarks_col}")
+    
+    return found_columns, team_name_col, completion_remarks_col
+
+def extract_participants(df, found_columns, team_name_col, completion_remarks_col, row_offset=0):
+    """
+    Extract valid participants (not yet deduplicated) and invalid emails from team rows
+    row_offset is the number of team rows before this frame, used for default team names
+    """
+    import pandas as pd
+    team_count = len(df)
+    
+    # Email validation pattern
+    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    
+    # Per-team columns: default team name is "Team <row number>"
+    default_team_names = 'Team ' + pd.Series(range(row_offset + 1, row_offset + team_count + 1), index=df.index).astype(str)
+    if team_name_col:
+        team_names = df[team_name_col].astype(str).str.strip().where(df[team_name_col].notna(), default_team_names)
+    else:
+        team_names = default_team_names
+    
+    if completion_remarks_col:
+        completion_remarks = df[completion_remarks_col].astype(str).str.strip().where(df[completion_remarks_col].notna(), '')
+    else:
+        completion_remarks = pd.Series('', index=df.index)
+    
+    # Reshape 1st/2nd/3rd member columns into long form: one row per (team, member)
+    members = pd.concat([
+        pd.DataFrame({
+            'row': range(team_count),
+            'member_position': member_info['member_num'],
+            'name': df[member_info['name']].values,
+            'email': df[member_info['email']].values,
+            'team_name': team_names.values,
+            'completion_remarks': completion_remarks.values
+        })
+        for member_info in found_columns
+    ], ignore_index=True)
+    
+    # Keep the original row-major order (team by team, then member position)
+    members = members.sort_values(['row', 'member_position'], kind='stable')
+    
+    # Clean the data: both name and email must be present and non-empty
+    members = members[members['name'].notna() & members['email'].notna()]
+    members['name'] = members['name'].astype(str).str.strip().str.title()  # Capitalize name properly
+    members['email'] = members['email'].astype(str).str.strip().str.lower()
+    members = members[(members['name'] != '') & (members['email'] != '')]
+    
+    # Validate email format
+    valid_mask = members['email'].str.match(email_pattern).astype(bool)
+    invalid_emails = members.loc[~valid_mask, 'email'].tolist()
+    
+    return members[valid_mask], invalid_emails
+
+def participant_records(members):
+    """Convert a participants frame into the list-of-dicts result format"""
+    return [
+        {
+            'name': name,
+            'email': email,
+            'team_name': team_name,
+            'member_position': int(member_position),
+            'completion_remarks': remarks
+        }
+        for name, email, team_name, member_position, remarks in zip(
+            members['name'].tolist(),
+            members['email'].tolist(),
+            members['team_name'].tolist(),
+            members['member_position'].tolist(),
+            members['completion_remarks'].tolist()
+        )
+    ]
+
+@track_ingest('participants', 'total_participants')
 def process_csv_file(file_path):
     """
     Process uploaded CSV file and extract names and emails from team registration format
     Expected columns: Team-based registration with up to 3 members per team
     """
+    import pandas as pd
     try:
         print(f"DEBUG: Processing CSV file: {file_path}")
         
         # Read CSV file
-        df = pd.read_csv(file_path)
+        df = pd.read_csv(file_path, **CSV_READ_OPTIONS)
         
         print(f"DEBUG: CSV shape: {df.shape}")
         print(f"DEBUG: Original columns: {df.columns.tolist()}")
         
         # Convert column names to lowercase for easier matching
         df.columns = df.columns.str.lower().str.strip()
-        
-        # Expected column patterns for team registration
-        member_patterns = [
-            {'name': 'name of 1st member:', 'email': 'email of 1st member:'},
-            {'name': 'name of 2nd member:', 'email': 'email of 2nd member:'},
-            {'name': 'name of 3rd member:', 'email': 'email of 3rd member:'}
-        ]
-        
-        # Find the actual column names that match our patterns
-        found_columns = []
         available_cols = df.columns.tolist()
         
-        for i, pattern in enumerate(member_patterns):
-            name_col = None
-            email_col = None
-            
-            # Find name column (flexible matching)
-            for col in available_cols:
-                if f'{i+1}st member' in col or f'{i+1}nd member' in col or f'{i+1}rd member' in col:
-                    if 'name' in col:
-                        name_col = col
-                    elif 'email' in col:
-                        email_col = col
-            
-            if name_col and email_col:
-                found_columns.append({'name': name_col, 'email': email_col, 'member_num': i+1})
-                print(f"DEBUG: Found member {i+1} columns - Name: {name_col}, Email: {email_col}")
+        found_columns, team_name_col, completion_remarks_col = find_csv_columns(available_cols)
         
         if not found_columns:
             return {
@@ -64,72 +175,15 @@ def process_csv_file(file_path):
         
         print(f"DEBUG: Found {len(found_columns)} member column sets")
         
-        # Find team name and completion remarks columns
-        team_name_col = None
-        completion_remarks_col = None
-        
-        for col in available_cols:
-            if 'team name' in col or 'team' in col:
-                team_name_col = col
-            elif 'completion remarks' in col or 'remarks' in col or 'completion' in col:
-                completion_remarks_col = col
-        
-        print(f"DEBUG: Team name column: {team_name_col}")
-        print(f"DEBUG: Completion remarks column: {completion_remarks_col}")
-        
-        # Extract participants from each team row
-        participants = []
-        invalid_emails = []
-        team_count = 0
+        # Extract participants from all team rows at once (vectorized)
+        team_count = len(df)
+        valid_members, invalid_emails = extract_participants(df, found_columns, team_name_col, completion_remarks_col)
         
-        # Email validation pattern
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+        # Drop duplicate emails, keeping the first occurrence
+        participants = participant_records(valid_members.drop_duplicates(subset='email', keep='first'))
         
-        for index, row in df.iterrows():
-            team_count += 1
-            team_name = row.get(team_name_col, f'Team {team_count}') if team_name_col else f'Team {team_count}'
-            completion_remarks = row.get(completion_remarks_col, '') if completion_remarks_col else ''
-            
-            # Clean completion remarks
-            if pd.notna(completion_remarks):
-                completion_remarks = str(completion_remarks).strip()
-            else:
-                completion_remarks = ''
-            
-            # Process each member in the team
-            for member_info in found_columns:
-                name_col = member_info['name']
-                email_col = member_info['email']
-                member_num = member_info['member_num']
-                
-                # Get name and email for this member
-                name = row.get(name_col, '')
-                email = row.get(email_col, '')
-                
-                # Clean the data
-                if pd.notna(name) and pd.notna(email):
-                    name = str(name).strip().title()  # Capitalize name properly
-                    email = str(email).strip().lower()
-                    
-                    # Skip if either is empty
-                    if name and email:
-                        # Validate email format
-                        if re.match(email_pattern, email):
-                            # Check for duplicates
-                            if email not in [p['email'] for p in participants]:
-                                participants.append({
-                                    'name': name,
-                                    'email': email,
-                                    'team_name': str(team_name).strip() if pd.notna(team_name) else f'Team {team_count}',
-                                    'member_position': member_num,
-                                    'completion_remarks': completion_remarks
-                                })
-                                print(f"DEBUG: Added participant: {name} ({email}) from {team_name} with remarks: {completion_remarks[:50]}...")
-                            else:
-                                print(f"DEBUG: Duplicate email skipped: {email}")
-                        else:
-                            invalid_emails.append(email)
-                            print(f"DEBUG: Invalid email format: {email}")
+        print(f"DEBUG: {len(invalid_emails)} invalid emails, "
+              f"{len(valid_members) - len(participants)} duplicate emails skipped")
         
         result = {
             'success': True,
@@ -152,6 +206,389 @@ def process_csv_file(file_path):
             'error': f"Error processing CSV file: {str(e)}"
         }
 
+@track_ingest('participants', 'total_participants')
+def stream_csv_file_to_staging(file_path, user_id, hackathon_id, chunksize=INGEST_CHUNK_SIZE):
+    """
+    Streaming variant of process_csv_file for very large files
+    Reads the CSV in chunks, validates and deduplicates incrementally with a running
+    seen-set and writes participants straight to the staging table, so memory stays
+    bounded by the chunk size. Returns the same stats as process_csv_file plus
+    'upload_id' instead of the 'participants' list.
+    """
+    import pandas as pd
+    try:
+        print(f"DEBUG: Streaming CSV file: {file_path}")
+        
+        # Read only the header to locate columns
+        header = pd.read_csv(file_path, nrows=0, **CSV_READ_OPTIONS).columns.str.lower().str.strip()
+        available_cols = header.tolist()
+        
+        found_columns, team_name_col, completion_remarks_col = find_csv_columns(available_cols)
+        
+        if not found_columns:
+            return {
+                'success': False,
+                'error': "Could not find team member columns. Expected format: 'Name of 1st Member:', 'Email of 1st Member:', etc.",
+                'available_columns': available_cols
+            }
+        
+        upload = StagingUpload(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            hackathon_id=hackathon_id,
+            kind='participants',
+            filename=os.path.basename(file_path)
+        )
+        db.session.add(upload)
+        db.session.commit()
+        
+        seen_emails = set()
+        invalid_emails = []
+        invalid_count = 0
+        team_count = 0
+        position = 0
+        
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, **CSV_READ_OPTIONS):
+            chunk.columns = header
+            valid_members, chunk_invalid = extract_participants(
+                chunk, found_columns, team_name_col, completion_remarks_col, row_offset=team_count
+            )
+            team_count += len(chunk)
+            
+            # Only keep a bounded sample of invalid emails for reporting
+            invalid_count += len(chunk_invalid)
+            invalid_emails.extend(chunk_invalid[:MAX_REPORTED_INVALID_EMAILS - len(invalid_emails)])
+            
+            # Deduplicate within the chunk and against everything staged so far
+            valid_members = valid_members.drop_duplicates(subset='email', keep='first')
+            valid_members = valid_members[~valid_members['email'].isin(seen_emails)]
+            seen_emails.update(valid_members['email'].tolist())
+            
+            rows = participant_records(valid_members)
+            for row in rows:
+                row['upload_id'] = upload.id
+                row['position'] = position
+                position += 1
+            
+            if rows:
+                db.session.execute(insert(StagedParticipant), rows)
+            db.session.commit()
+        
+        upload.total_rows = team_count
+        upload.total_records = position
+        upload.invalid_count = invalid_count
+        upload.invalid_emails = json.dumps(invalid_emails)
+        db.session.commit()
+        
+        print(f"DEBUG: Staged {position} participants from {team_count} teams (upload {upload.id})")
+        return {
+            'success': True,
+            'upload_id': upload.id,
+            'total_teams': team_count,
+            'total_participants': position,
+            'invalid_count': invalid_count,
+            'invalid_emails': invalid_emails
+        }
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"ERROR streaming CSV: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'success': False,
+            'error': f"Error processing CSV file: {str(e)}"
+        }
+
+def iter_staged_participants(upload_id, batch_size=INGEST_CHUNK_SIZE):
+    """Yield staged participants for an upload in batches of dicts, in file order"""
+    last_position = -1
+    while True:
+        # Column query (no ORM instances) so the session identity map stays empty
+        batch = db.session.query(
+            StagedParticipant.position,
+            StagedParticipant.name,
+            StagedParticipant.email,
+            StagedParticipant.team_name,
+            StagedParticipant.member_position,
+            StagedParticipant.completion_remarks
+        ).filter(
+            StagedParticipant.upload_id == upload_id,
+            StagedParticipant.position > last_position
+        ).order_by(StagedParticipant.position).limit(batch_size).all()
+        
+        if not batch:
+            break
+        
+        last_position = batch[-1].position
+        yield [
+            {
+                'name': staged.name,
+                'email': staged.email,
+                'team_name': staged.team_name,
+                'member_position': staged.member_position,
+                'completion_remarks': staged.completion_remarks
+            }
+            for staged in batch
+        ]
+
+def upsert_staged_participants(hackathon_id, upload_id, batch_size=INGEST_CHUNK_SIZE):
+    """
+    Insert new staged participants into the hackathon and refresh completion remarks
+    on existing ones (matched by email) using batched statements
+    Returns the number of newly added participants
+    """
+    # One query for every existing participant of the hackathon
+    existing_ids = dict(db.session.query(Participant.email, Participant.id).filter(
+        Participant.hackathon_id == hackathon_id
+    ).all())
+    
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        insert_stmt = postgresql.insert(Participant)
+    elif dialect == 'sqlite':
+        insert_stmt = sqlite.insert(Participant)
+    else:
+        insert_stmt = None
+    
+    if insert_stmt is not None:
+        # Rows inserted concurrently since the lookup above hit the (hackathon_id, email)
+        # unique constraint and are skipped; RETURNING reports only the rows really added
+        insert_stmt = insert_stmt.on_conflict_do_nothing(
+            index_elements=['hackathon_id', 'email']
+        ).returning(Participant.email, Participant.id)
+    
+    seen_emails = set()
+    added_count = 0
+    for batch in iter_staged_participants(upload_id, batch_size):
+        new_rows = []
+        updated_rows = []
+        for participant_data in batch:
+            email = participant_data['email']
+            if email in seen_emails:
+                continue  # The first row for an email wins, as in process_csv_file
+            seen_emails.add(email)
+            
+            participant_id = existing_ids.get(email)
+            if participant_id is None:
+                new_rows.append({
+                    'name': participant_data['name'],
+                    'email': email,
+                    'hackathon_id': hackathon_id,
+                    'team_name': participant_data.get('team_name'),
+                    'member_position': participant_data.get('member_position'),
+                    'completion_remarks': participant_data.get('completion_remarks') or ''
+                })
+            else:
+                # Update completion remarks for existing participants
+                updated_rows.append({
+                    'id': participant_id,
+                    'completion_remarks': participant_data.get('completion_remarks') or ''
+                })
+        
+        if new_rows:
+            if insert_stmt is not None:
+                inserted_ids = dict(db.session.execute(insert_stmt, new_rows).all())
+            else:
+                db.session.execute(insert(Participant), new_rows)
+                inserted_ids = dict(db.session.query(Participant.email, Participant.id).filter(
+                    Participant.hackathon_id == hackathon_id,
+                    Participant.email.in_([row['email'] for row in new_rows])
+                ).all())
+            existing_ids.update(inserted_ids)
+            adjust_hackathon_counters(hackathon_id, participants=len(inserted_ids))
+            added_count += len(inserted_ids)
+            
+            # Rows skipped on conflict already exist: only their remarks are refreshed
+            skipped = {row['email']: row['completion_remarks'] for row in new_rows if row['email'] not in inserted_ids}
+            if skipped:
+                for email, participant_id in db.session.query(Participant.email, Participant.id).filter(
+                    Participant.hackathon_id == hackathon_id,
+                    Participant.email.in_(list(skipped))
+                ):
+                    existing_ids[email] = participant_id
+                    updated_rows.append({'id': participant_id, 'completion_remarks': skipped[email]})
+        if updated_rows:
+            # ORM bulk UPDATE by primary key (executemany)
+            db.session.execute(update(Participant), updated_rows)
+        db.session.commit()
+    
+    return added_count
+
+def delete_staged_participants(upload_id):
+    """Remove a participants staging upload and its staged rows"""
+    StagedParticipant.query.filter_by(upload_id=upload_id).delete()
+    StagingUpload.query.filter_by(id=upload_id).delete()
+    db.session.commit()
+
+def delete_expired_staged_participants(max_age_hours):
+    """Remove participants staging uploads older than max_age_hours (left by failed imports); returns how many"""
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    expired = select(StagingUpload.id).where(StagingUpload.kind == 'participants', StagingUpload.created_at < cutoff)
+    db.session.execute(delete(StagedParticipant).where(StagedParticipant.upload_id.in_(expired)))
+    removed = db.session.execute(delete(StagingUpload).where(StagingUpload.id.in_(expired))).rowcount
+    db.session.commit()
+    return removed
+
+def filter_participants_query(hackathon_id, status=None, team=None, completion=None, search=None, remarks=None):
+    """Build the participant query for a hackathon narrowed by status, team, completion remarks and search"""
+    query = Participant.query.filter(Participant.hackathon_id == hackathon_id)
+    
+    if status == 'sent':
+        query = query.filter(Participant.certificate_sent == True)
+    elif status == 'unsent':
+        query = query.filter(Participant.certificate_sent == False)
+    elif status == 'uncompletion_sent':
+        query = query.filter(Participant.uncompletion_email_sent == True)
+    elif status == 'pending':
+        query = query.filter(Participant.certificate_sent == False, Participant.uncompletion_email_sent == False)
+    
+    if team:
+        query = query.filter(Participant.team_name == team)
+    
+    if completion == 'with_remarks':
+        query = query.filter(Participant.completion_remarks.isnot(None), Participant.completion_remarks != '')
+    elif completion == 'without_remarks':
+        query = query.filter(or_(Participant.completion_remarks.is_(None), Participant.completion_remarks == ''))
+    
+    if remarks:
+        query = query.filter(Participant.completion_remarks.ilike(f"%{remarks.strip()}%"))
+    
+    if search:
+        pattern = f"%{search.strip()}%"
+        query = query.filter(or_(Participant.name.ilike(pattern), Participant.email.ilike(pattern)))
+    
+    return query
+
+def get_participants_page(hackathon_id, after_id=None, limit=PARTICIPANTS_PAGE_SIZE, **filters):
+    """
+    Fetch one page of a hackathon's participants with keyset pagination on id
+    
+    Ids follow insertion order, so pages come out in creation order; returns
+    (participants, next_after) where next_after is None on the last page.
+    """
+    query = filter_participants_query(hackathon_id, **filters)
+    if after_id is not None:
+        query = query.filter(Participant.id > after_id)
+    
+    # Fetch one extra row to know whether another page exists
+    participants = query.order_by(Participant.id).limit(limit + 1).all()
+    has_more = len(participants) > limit
+    participants = participants[:limit]
+    
+    return participants, (participants[-1].id if has_more and participants else None)
+
+def participant_to_dict(participant):
+    """Serialize a participant for the participants API"""
+    return {
+        'id': participant.id,
+        'name': participant.name,
+        'email': participant.email,
+        'team_name': participant.team_name,
+        'member_position': participant.member_position,
+        'completion_remarks': participant.completion_remarks,
+        'certificate_sent': bool(participant.certificate_sent),
+        'uncompletion_email_sent': bool(participant.uncompletion_email_sent),
+        'sent_at': participant.sent_at.isoformat() if participant.sent_at else None
+    }
+
+def count_pending_participants(hackathon_id):
+    """Count participants that have neither a certificate nor an uncompletion email"""
+    return filter_participants_query(hackathon_id, status='pending').count()
+
+def selection_to_dict(selection):
+    """Serialize a saved participant selection"""
+    return {
+        'id': selection.id,
+        'name': selection.name,
+        'filters': json.loads(selection.filters),
+        'created_at': selection.created_at.isoformat() if selection.created_at else None
+    }
+
+def save_participant_selection(hackathon_id, name, filters):
+    """Store (or overwrite) a named participant filter for a hackathon"""
+    filters = {key: value for key, value in filters.items() if key in SELECTION_FILTER_KEYS and value}
+    selection = ParticipantSelection.query.filter_by(hackathon_id=hackathon_id, name=name).first()
+    if selection is None:
+        selection = ParticipantSelection(hackathon_id=hackathon_id, name=name)
+        db.session.add(selection)
+    selection.filters = json.dumps(filters)
+    db.session.commit()
+    return selection
+
+def get_selection_filters(hackathon_id, selection_id):
+    """Load the filters of a saved selection, or None if it does not belong to the hackathon"""
+    selection = ParticipantSelection.query.filter_by(id=selection_id, hackathon_id=hackathon_id).first()
+    if selection is None:
+        return None
+    filters = json.loads(selection.filters)
+    return {key: value for key, value in filters.items() if key in SELECTION_FILTER_KEYS}
+
+def resolve_participant_selection(hackathon_id, filters):
+    """Resolve a filter selection to its participants with a single query, in id order"""
+    return filter_participants_query(hackathon_id, **filters).order_by(Participant.id).all()
+
+def parse_participant_ids(values):
+    """Turn posted participant ids into a de-duplicated list of ints, keeping order"""
+    ids = []
+    seen = set()
+    for value in values:
+        try:
+            participant_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        if participant_id not in seen:
+            seen.add(participant_id)
+            ids.append(participant_id)
+    return ids
+
+def load_selected_participants(hackathon_id, participant_ids, batch_size=SELECTION_BATCH_SIZE):
+    """Load the selected participants of a hackathon with batched IN queries, in selection order"""
+    by_id = {}
+    for start in range(0, len(participant_ids), batch_size):
+        batch = participant_ids[start:start + batch_size]
+        for participant in Participant.query.filter(
+            Participant.hackathon_id == hackathon_id,
+            Participant.id.in_(batch)
+        ):
+            by_id[participant.id] = participant
+    return [by_id[participant_id] for participant_id in participant_ids if participant_id in by_id]
+
+def mark_certificates_sent(hackathon_id, participant_ids, template_id, batch_size=SELECTION_BATCH_SIZE):
+    """Record delivered certificates with one UPDATE per batch and keep the hackathon counters in step"""
+    sent_at = datetime.utcnow()
+    newly_sent = 0
+    for start in range(0, len(participant_ids), batch_size):
+        batch = participant_ids[start:start + batch_size]
+        scope = (Participant.hackathon_id == hackathon_id, Participant.id.in_(batch))
+        newly_sent += Participant.query.filter(*scope, Participant.certificate_sent == False).count()
+        db.session.execute(
+            update(Participant).where(*scope).values(
+                certificate_sent=True,
+                certificate_template_id=template_id,
+                sent_at=sent_at
+            ).execution_options(synchronize_session=False)
+        )
+    adjust_hackathon_counters(hackathon_id, certificates_sent=newly_sent)
+    return newly_sent
+
+def mark_uncompletion_emails_sent(hackathon_id, participant_ids, batch_size=SELECTION_BATCH_SIZE):
+    """Record delivered uncompletion emails with one UPDATE per batch and keep the hackathon counters in step"""
+    sent_at = datetime.utcnow()
+    newly_sent = 0
+    for start in range(0, len(participant_ids), batch_size):
+        batch = participant_ids[start:start + batch_size]
+        scope = (Participant.hackathon_id == hackathon_id, Participant.id.in_(batch))
+        newly_sent += Participant.query.filter(*scope, Participant.uncompletion_email_sent == False).count()
+        db.session.execute(
+            update(Participant).where(*scope).values(
+                uncompletion_email_sent=True,
+                uncompletion_email_sent_at=sent_at
+            ).execution_options(synchronize_session=False)
+        )
+    adjust_hackathon_counters(hackathon_id, uncompletion_emails_sent=newly_sent)
+    return newly_sent
+
 def save_csv_file(file, hackathon_id):
     """Save uploaded CSV file"""
     if file and allowed_csv_file(file.filename):
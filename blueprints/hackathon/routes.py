@@ -1,7 +1,14 @@
+import os
+import click
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from blueprints.auth.decorators import login_required
+from blueprints.main.utils import invalidate_dashboard_stats
 from config import db
-from models import Hackathon
+from models import Hackathon, Participant
+from blueprints.certificates.utils import UPLOAD_FOLDER
+from blueprints.csv.utils import CSV_UPLOAD_FOLDER
+from tasks import enqueue_file_cleanup
+from .utils import recompute_hackathon_counters, delete_hackathon_records
 
 hackathon_bp = Blueprint('hackathon', __name__)
 
@@ -32,6 +39,7 @@ def create_hackathon(current_user):
         )
         db.session.add(new_hackathon)
         db.session.commit()
+        invalidate_dashboard_stats(current_user.id)
         
         flash(f'Hackathon "{name}" created successfully!', 'success')
         return redirect(url_for('hackathon.hackathon_detail', id=new_hackathon.id))
@@ -45,17 +53,21 @@ def create_hackathon(current_user):
 def hackathon_detail(current_user, id):
     hackathon = Hackathon.query.filter_by(id=id, user_id=current_user.id).first_or_404()
     
-    # Get counts for stats
+    # Get counts for stats (denormalized counters, no participant scan)
     template_count = len(hackathon.certificate_templates)
-    participant_count = len(hackathon.participants)
-    sent_count = len([p for p in hackathon.participants if p.certificate_sent])
+    participant_count = hackathon.participant_count
+    sent_count = hackathon.certificates_sent_count
+    
+    # Only the first few participants are shown on the detail page
+    recent_participants = Participant.query.filter_by(hackathon_id=id).order_by(Participant.id).limit(5).all()
     
     return render_template('hackathon/detail.html', 
                          hackathon=hackathon, 
                          user=current_user,
                          template_count=template_count,
                          participant_count=participant_count,
-                         sent_count=sent_count)
+                         sent_count=sent_count,
+                         recent_participants=recent_participants)
 
 @hackathon_bp.route('/hackathons/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -88,6 +100,13 @@ def edit_hackathon(current_user, id):
         flash('Failed to update hackathon. Please try again.', 'error')
         return render_template('hackathon/edit.html', hackathon=hackathon, user=current_user)
 
+@hackathon_bp.cli.command('reconcile-counters')
+def reconcile_counters():
+    """Rebuild every hackathon's progress counters from the participant table"""
+    updated = recompute_hackathon_counters()
+    db.session.commit()
+    click.echo(f"Reconciled progress counters for {updated} hackathons")
+
 @hackathon_bp.route('/hackathons/<int:id>/delete', methods=['POST'])
 @login_required
 def delete_hackathon(current_user, id):
@@ -95,8 +114,15 @@ def delete_hackathon(current_user, id):
     
     try:
         hackathon_name = hackathon.name
-        db.session.delete(hackathon)
+        delete_hackathon_records(id)
         db.session.commit()
+        invalidate_dashboard_stats(current_user.id)
+        
+        # Templates, previews, generated certificates and CSVs are removed in the background
+        enqueue_file_cleanup([
+            os.path.join(UPLOAD_FOLDER, str(id)),
+            os.path.join(CSV_UPLOAD_FOLDER, str(id))
+        ])
         
         flash(f'Hackathon "{hackathon_name}" deleted successfully!', 'success')
         return redirect(url_for('hackathon.list_hackathons'))
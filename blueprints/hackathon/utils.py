@@ -0,0 +1,67 @@
+from sqlalchemy import func, select, update, delete, case
+
+from config import db
+from models import (
+    Hackathon, Participant, CertificateTemplate, ParticipantSelection,
+    StagingUpload, StagedParticipant, Job
+)
+
+def adjust_hackathon_counters(hackathon_id, participants=0, certificates_sent=0, uncompletion_emails_sent=0):
+    """
+    Apply deltas to a hackathon's progress counters inside the current transaction
+    Uses column arithmetic (col = col + delta) so concurrent writers don't lose updates
+    """
+    values = {}
+    if participants:
+        values['participant_count'] = Hackathon.participant_count + participants
+    if certificates_sent:
+        values['certificates_sent_count'] = Hackathon.certificates_sent_count + certificates_sent
+    if uncompletion_emails_sent:
+        values['uncompletion_emails_sent_count'] = Hackathon.uncompletion_emails_sent_count + uncompletion_emails_sent
+    
+    if values:
+        db.session.execute(
+            update(Hackathon).where(Hackathon.id == hackathon_id).values(**values),
+            execution_options={'synchronize_session': False}
+        )
+
+def recompute_hackathon_counters(hackathon_ids=None):
+    """
+    Rebuild progress counters from the participant table inside the current transaction
+    Recomputes every hackathon when hackathon_ids is None
+    """
+    def participant_aggregate(expression):
+        return select(expression).where(Participant.hackathon_id == Hackathon.id).scalar_subquery()
+    
+    stmt = update(Hackathon).values(
+        participant_count=participant_aggregate(func.count(Participant.id)),
+        certificates_sent_count=participant_aggregate(
+            func.coalesce(func.sum(case((Participant.certificate_sent == True, 1), else_=0)), 0)
+        ),
+        uncompletion_emails_sent_count=participant_aggregate(
+            func.coalesce(func.sum(case((Participant.uncompletion_email_sent == True, 1), else_=0)), 0)
+        )
+    )
+    if hackathon_ids is not None:
+        stmt = stmt.where(Hackathon.id.in_(hackathon_ids))
+    
+    result = db.session.execute(stmt, execution_options={'synchronize_session': False})
+    return result.rowcount
+
+def delete_hackathon_records(hackathon_id):
+    """
+    Delete a hackathon and all rows that belong to it with set-based DELETEs
+    Children go first so foreign keys hold at every step; the caller commits
+    """
+    upload_ids = select(StagingUpload.id).where(StagingUpload.hackathon_id == hackathon_id)
+    statements = [
+        delete(StagedParticipant).where(StagedParticipant.upload_id.in_(upload_ids)),
+        delete(StagingUpload).where(StagingUpload.hackathon_id == hackathon_id),
+        delete(ParticipantSelection).where(ParticipantSelection.hackathon_id == hackathon_id),
+        delete(Job).where(Job.hackathon_id == hackathon_id),
+        delete(Participant).where(Participant.hackathon_id == hackathon_id),
+        delete(CertificateTemplate).where(CertificateTemplate.hackathon_id == hackathon_id),
+        delete(Hackathon).where(Hackathon.id == hackathon_id),
+    ]
+    for stmt in statements:
+        db.session.execute(stmt, execution_options={'synchronize_session': False})
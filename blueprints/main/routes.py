@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, session, redirect, url_for
 from blueprints.auth.decorators import login_required
-from models import Hackathon, CertificateTemplate, Participant
+from models import Hackathon
+from .utils import get_dashboard_stats
 
 main_bp = Blueprint('main', __name__)
 
@@ -13,25 +14,16 @@ def index():
 @main_bp.route('/dashboard')
 @login_required
 def dashboard(current_user):
-    # Fetch user's hackathons
-    hackathons = Hackathon.query.filter_by(user_id=current_user.id).order_by(Hackathon.created_at.desc()).all()
-    
-    # Calculate stats
-    total_hackathons = len(hackathons)
-    total_templates = CertificateTemplate.query.join(Hackathon).filter(Hackathon.user_id == current_user.id).count()
-    total_participants = Participant.query.join(Hackathon).filter(Hackathon.user_id == current_user.id).count()
-    certificates_sent = Participant.query.join(Hackathon).filter(
-        Hackathon.user_id == current_user.id,
-        Participant.certificate_sent == True
-    ).count()
+    # Aggregated counters (single query, cached per user)
+    stats = get_dashboard_stats(current_user.id)
     
     # Get recent hackathons (latest 5)
-    recent_hackathons = hackathons[:5]
+    recent_hackathons = Hackathon.query.filter_by(user_id=current_user.id).order_by(Hackathon.created_at.desc()).limit(5).all()
     
     return render_template('main/dashboard.html', 
                          user=current_user,
-                         total_hackathons=total_hackathons,
-                         total_templates=total_templates,
-                         total_participants=total_participants,
-                         certificates_sent=certificates_sent,
+                         total_hackathons=stats['total_hackathons'],
+                         total_templates=stats['total_templates'],
+                         total_participants=stats['total_participants'],
+                         certificates_sent=stats['certificates_sent'],
                          recent_hackathons=recent_hackathons)
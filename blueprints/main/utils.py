@@ -0,0 +1,56 @@
+import time
+import threading
+from sqlalchemy import func, select
+
+from config import db
+from models import Hackathon, CertificateTemplate
+
+# Seconds a cached per-user stats entry stays valid. The cache is per process and
+# invalidate_dashboard_stats only clears the calling worker's entry, so under several
+# gunicorn workers the others may show counts up to this old after an upload or send.
+DASHBOARD_STATS_TTL = 5
+
+# Per-process cache: user_id -> (expires_at, stats)
+_dashboard_stats_cache = {}
+_dashboard_stats_lock = threading.Lock()
+
+def compute_dashboard_stats(user_id):
+    """Compute all dashboard counters for a user in a single aggregated query"""
+    user_hackathons = select(Hackathon.id).where(Hackathon.user_id == user_id).scalar_subquery()
+    
+    total_templates = select(func.count(CertificateTemplate.id)).where(
+        CertificateTemplate.hackathon_id.in_(user_hackathons)
+    ).scalar_subquery()
+    
+    # Participant totals come from the per-hackathon counters, not a participant scan
+    row = db.session.execute(select(
+        func.count(Hackathon.id).label('total_hackathons'),
+        total_templates.label('total_templates'),
+        func.coalesce(func.sum(Hackathon.participant_count), 0).label('total_participants'),
+        func.coalesce(func.sum(Hackathon.certificates_sent_count), 0).label('certificates_sent')
+    ).where(Hackathon.user_id == user_id)).one()
+    
+    return {
+        'total_hackathons': row.total_hackathons or 0,
+        'total_templates': row.total_templates or 0,
+        'total_participants': row.total_participants or 0,
+        'certificates_sent': row.certificates_sent or 0
+    }
+
+def get_dashboard_stats(user_id):
+    """Get dashboard counters for a user, served from a short-lived per-user cache"""
+    now = time.monotonic()
+    with _dashboard_stats_lock:
+        cached = _dashboard_stats_cache.get(user_id)
+        if cached and cached[0] > now:
+            return dict(cached[1])
+    
+    stats = compute_dashboard_stats(user_id)
+    with _dashboard_stats_lock:
+        _dashboard_stats_cache[user_id] = (now + DASHBOARD_STATS_TTL, stats)
+    return dict(stats)
+
+def invalidate_dashboard_stats(user_id):
+    """Drop a user's cached dashboard counters after participants, templates or send state change (this process only)"""
+    with _dashboard_stats_lock:
+        _dashboard_stats_cache.pop(user_id, None)
@@ -0,0 +1 @@
+# Profiling blueprint package
@@ -0,0 +1,75 @@
+import os
+import time
+from flask import Blueprint, render_template, request, g, flash, redirect, url_for, send_from_directory, abort
+from blueprints.auth.decorators import login_required
+from .utils import (
+    PROFILE_HEADER, PROFILE_QUERY_FLAG, PROFILE_NAME_RE, get_profile_dir, is_profiling_operator,
+    current_session_user, start_capture, stop_capture, save_profile, list_profiles, format_profile_stats
+)
+
+# Only registered when PROFILING_ENABLED is set, so the request hooks below cost nothing otherwise
+profiling_bp = Blueprint('profiling', __name__)
+
+@profiling_bp.before_app_request
+def start_request_profile():
+    if not request.headers.get(PROFILE_HEADER) and not request.args.get(PROFILE_QUERY_FLAG):
+        return
+    if not is_profiling_operator(current_session_user()):
+        return
+    profiler = start_capture()
+    if profiler is not None:
+        g._profiler = profiler
+        g._profile_started = time.perf_counter()
+
+def _finish_request_profile():
+    profiler = g.pop('_profiler', None)
+    if profiler is None:
+        return None
+    stop_capture(profiler)
+    label = f"{request.method} {request.path}"
+    return save_profile(profiler, 'request', label, time.perf_counter() - g._profile_started, get_profile_dir())
+
+@profiling_bp.after_app_request
+def finish_request_profile(response):
+    filename = _finish_request_profile()
+    if filename:
+        response.headers['X-Profile-Id'] = filename
+    return response
+
+@profiling_bp.teardown_app_request
+def teardown_request_profile(exception=None):
+    # after_request is skipped when a request dies with an unhandled error
+    _finish_request_profile()
+
+@profiling_bp.route('/profiles')
+@login_required
+def list_captured_profiles(current_user):
+    if not is_profiling_operator(current_user):
+        flash('You are not allowed to view profiles.', 'error')
+        return redirect(url_for('main.dashboard'))
+
+    profiles = list_profiles(get_profile_dir())
+    return render_template('profiling/index.html', profiles=profiles,
+                           header=PROFILE_HEADER, query_flag=PROFILE_QUERY_FLAG)
+
+@profiling_bp.route('/profiles/<name>')
+@login_required
+def download_profile(current_user, name):
+    if not is_profiling_operator(current_user) or not PROFILE_NAME_RE.match(name):
+        abort(404)
+    return send_from_directory(get_profile_dir(), name, as_attachment=True)
+
+@profiling_bp.route('/profiles/<name>/stats')
+@login_required
+def profile_stats(current_user, name):
+    if not is_profiling_operator(current_user) or not PROFILE_NAME_RE.match(name):
+        abort(404)
+    path = os.path.join(get_profile_dir(), name)
+    if not os.path.exists(path):
+        abort(404)
+
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'ncalls'):
+        sort = 'cumulative'
+    return render_template('profiling/index.html', profiles=None, name=name, sort=sort,
+                           stats=format_profile_stats(path, sort=sort))
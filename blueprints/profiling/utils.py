@@ -0,0 +1,188 @@
+import os
+import re
+import time
+import logging
+import functools
+import threading
+from datetime import datetime
+from flask import current_app, session, g, has_app_context, has_request_context
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR_NAME = 'profiles'  # Under the Flask instance folder
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_FLAG = '_profile'
+PROFILE_STATS_LIMIT = 60  # Functions shown on the stats page
+
+# <timestamp>_<kind>_<label>_<ms>ms.prof
+PROFILE_NAME_RE = re.compile(r'^(?P<stamp>\d{8}-\d{6}-\d{6})_(?P<kind>request|job)_(?P<label>[A-Za-z0-9.-]+)_(?P<ms>\d+)ms\.prof$')
+
+def get_profile_dir(app=None):
+    app = app or current_app
+    return os.path.join(app.instance_path, PROFILE_DIR_NAME)
+
+def get_profiling_operators(app=None):
+    app = app or current_app
+    return {name.strip() for name in app.config.get('PROFILING_OPERATORS', '').split(',') if name.strip()}
+
+def is_profiling_operator(user):
+    """Only usernames listed in PROFILING_OPERATORS may trigger or read profiles"""
+    return bool(user) and user.username in get_profiling_operators()
+
+def current_session_user():
+    """Resolve the logged-in user from the session without the login_required redirects"""
+    from blueprints.auth.utils import resolve_identity
+    token = session.get('token')
+    if not token:
+        return None
+    try:
+        return resolve_identity(token)
+    except Exception:
+        return None
+
+JOB_CAPTURE_WAIT_SECONDS = 30  # How long a job waits for another thread's capture (e.g. the request that enqueued it) to end
+
+# One capture at a time per process: cProfile profiles a single thread, and newer
+# Pythons refuse to run two profilers at once
+_capture_lock = threading.Lock()
+_thread_capture = threading.local()  # The capture owned by this thread, if any
+
+def start_capture(timeout=None):
+    """Start a cProfile capture on this thread, or return None if another one is running (after waiting up to timeout)"""
+    import cProfile
+    acquired = _capture_lock.acquire(timeout=timeout) if timeout else _capture_lock.acquire(blocking=False)
+    if not acquired:
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except Exception:
+        _capture_lock.release()
+        raise
+    _thread_capture.profiler = profiler
+    return profiler
+
+def stop_capture(profiler):
+    profiler.disable()
+    _thread_capture.profiler = None
+    _capture_lock.release()
+
+def start_job_capture():
+    """
+    Start profiling a job on this thread; returns a handle for finish_job_capture, or None
+    
+    A capture this thread already owns (the request running the job inline) is paused so
+    the job gets a file of its own; a capture on another thread (the request that enqueued
+    a background job) is waited for, up to JOB_CAPTURE_WAIT_SECONDS.
+    """
+    import cProfile
+    outer = getattr(_thread_capture, 'profiler', None)
+    if outer is not None:
+        outer.disable()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        _thread_capture.profiler = profiler
+    else:
+        profiler = start_capture(timeout=JOB_CAPTURE_WAIT_SECONDS)
+        if profiler is None:
+            return None
+    return {'profiler': profiler, 'outer': outer, 'started': time.perf_counter()}
+
+def finish_job_capture(capture, label, app=None):
+    """Stop a job capture, resume any paused outer capture and save the profile; returns the file name"""
+    profiler, outer = capture['profiler'], capture['outer']
+    if outer is not None:
+        profiler.disable()
+        _thread_capture.profiler = outer
+        outer.enable()
+    else:
+        stop_capture(profiler)
+    app = app or current_app._get_current_object()
+    with app.app_context():
+        return save_profile(profiler, 'job', label, time.perf_counter() - capture['started'], get_profile_dir(app))
+
+def _slug(label):
+    return re.sub(r'[^A-Za-z0-9.-]+', '-', label).strip('-')[:80] or 'root'
+
+def save_profile(profiler, kind, label, elapsed, profile_dir):
+    """Dump a finished profiler to profile_dir and prune the oldest files; returns the file name"""
+    os.makedirs(profile_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    filename = f"{stamp}_{kind}_{_slug(label)}_{int(elapsed * 1000)}ms.prof"
+    profiler.dump_stats(os.path.join(profile_dir, filename))
+    prune_profiles(profile_dir, current_app.config['PROFILING_MAX_FILES'])
+    return filename
+
+def prune_profiles(profile_dir, max_files):
+    names = sorted(name for name in os.listdir(profile_dir) if PROFILE_NAME_RE.match(name))
+    for name in names[:max(0, len(names) - max_files)]:
+        try:
+            os.unlink(os.path.join(profile_dir, name))
+        except FileNotFoundError:
+            pass
+
+def list_profiles(profile_dir):
+    """Captured profiles, newest first"""
+    if not os.path.isdir(profile_dir):
+        return []
+    profiles = []
+    for name in os.listdir(profile_dir):
+        match = PROFILE_NAME_RE.match(name)
+        if not match:
+            continue
+        profiles.append({
+            'name': name,
+            'kind': match.group('kind'),
+            'label': match.group('label'),
+            'duration_ms': int(match.group('ms')),
+            'captured_at': datetime.strptime(match.group('stamp'), '%Y%m%d-%H%M%S-%f'),
+            'size': os.path.getsize(os.path.join(profile_dir, name)),
+        })
+    profiles.sort(key=lambda profile: profile['name'], reverse=True)
+    return profiles
+
+def format_profile_stats(path, sort='cumulative', limit=PROFILE_STATS_LIMIT):
+    """pstats report of the top functions as text"""
+    import io
+    import pstats
+    stream = io.StringIO()
+    stats = pstats.Stats(path, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+def job_profiling_requested():
+    """Jobs are profiled when PROFILING_JOBS is set or the request starting them is being profiled"""
+    if not has_app_context() or not current_app.config.get('PROFILING_ENABLED'):
+        return False
+    if current_app.config.get('PROFILING_JOBS'):
+        return True
+    return has_request_context() and g.get('_profiler') is not None
+
+def profiled(func, label=None, enabled=None):
+    """
+    Wrap a background job so it runs under cProfile
+    
+    Returns func unchanged unless profiling is on and requested (see job_profiling_requested),
+    so there is no overhead otherwise:
+        enqueue_task(profiled(remove_paths, 'cleanup'), paths)
+    """
+    if enabled is None:
+        enabled = job_profiling_requested()
+    if not enabled or not has_app_context():
+        return func
+    
+    label = label or getattr(func, '__name__', 'job')
+    app = current_app._get_current_object()
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        capture = start_job_capture()
+        if capture is None:
+            logger.info("Another capture is running, job %s runs unprofiled", label)
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            filename = finish_job_capture(capture, label, app)
+            logger.debug("Profiled job %s -> %s", label, filename)
+    return wrapper
@@ -2,6 +2,8 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 import os
 from dotenv import load_dotenv
 
@@ -11,6 +13,62 @@ db = SQLAlchemy()
 jwt = JWTManager()
 migrate = Migrate()
 
+# Engine profiles (DB_ENGINE_PROFILE): 'auto' picks one from the database URL,
+# 'sqlite' / 'postgresql' force one, 'none' leaves SQLAlchemy defaults untouched
+ENGINE_PROFILES = ('auto', 'sqlite', 'postgresql', 'none')
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def resolve_engine_profile(database_uri, profile=None):
+    """Pick the engine profile for a database URI"""
+    profile = (profile or os.environ.get('DB_ENGINE_PROFILE') or 'auto').strip().lower()
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE '{profile}' (expected one of {', '.join(ENGINE_PROFILES)})")
+    if profile != 'auto':
+        return profile
+    
+    backend = make_url(database_uri).get_backend_name()
+    if backend == 'sqlite':
+        return 'sqlite'
+    if backend == 'postgresql':
+        return 'postgresql'
+    return 'none'
+
+def sqlite_engine_settings():
+    """SQLite profile: WAL so readers never block on the send workers' writes"""
+    return {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'mmap_size': _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+    }
+
+def postgresql_engine_options():
+    """PostgreSQL profile: sized connection pool with liveness checks"""
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 10),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+    }
+
+def _register_sqlite_pragmas(engine, settings):
+    """Apply the SQLite PRAGMAs on every new DBAPI connection"""
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous={settings['synchronous']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings['busy_timeout'])}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings['mmap_size'])}")
+        cursor.close()
+
 def configure_app(app: Flask):
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///db.sqlite3'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -18,7 +76,54 @@ def configure_app(app: Flask):
     app.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']  
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = False  
     
+    # Uploaded file serving: '' streams from Python, 'x-accel-redirect' hands off to nginx
+    # (internal location at UPLOADS_ACCEL_PREFIX), 'x-sendfile' to Apache/lighttpd
+    app.config['UPLOADS_OFFLOAD'] = os.environ.get('UPLOADS_OFFLOAD', '').strip().lower()
+    app.config['UPLOADS_ACCEL_PREFIX'] = os.environ.get('UPLOADS_ACCEL_PREFIX', '/protected-uploads/')
+    app.config['USE_X_SENDFILE'] = app.config['UPLOADS_OFFLOAD'] == 'x-sendfile'
+    
+    # Request instrumentation (Server-Timing header and slow-request log, see instrumentation.py)
+    app.config['INSTRUMENTATION_ENABLED'] = _env_bool('INSTRUMENTATION_ENABLED', True)
+    app.config['SERVER_TIMING_ENABLED'] = _env_bool('SERVER_TIMING_ENABLED', False)  # Always sent in debug mode
+    app.config['SLOW_REQUEST_MS'] = _env_int('SLOW_REQUEST_MS', 1000)
+    app.config['SLOW_REQUEST_SQL_COUNT'] = _env_int('SLOW_REQUEST_SQL_COUNT', 100)
+    app.config['SLOW_SQL_MS'] = _env_int('SLOW_SQL_MS', 250)
+    
+    # On-demand cProfile capture (see blueprints/profiling); off unless enabled, and only
+    # usernames in PROFILING_OPERATORS may trigger captures or read them
+    app.config['PROFILING_ENABLED'] = _env_bool('PROFILING_ENABLED', False)
+    app.config['PROFILING_OPERATORS'] = os.environ.get('PROFILING_OPERATORS', '')
+    app.config['PROFILING_JOBS'] = _env_bool('PROFILING_JOBS', False)  # Capture every background job
+    app.config['PROFILING_MAX_FILES'] = _env_int('PROFILING_MAX_FILES', 200)
+    
+    # Prometheus metrics endpoint (see metrics.py); only served without a token when
+    # METRICS_ENABLED is set explicitly
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')
+    app.config['METRICS_ENABLED'] = _env_bool('METRICS_ENABLED', bool(app.config['METRICS_TOKEN']))
+    
+    # Staged uploads not sent or imported within this many hours are removed on the next upload
+    app.config['STAGING_UPLOAD_MAX_AGE_HOURS'] = _env_int('STAGING_UPLOAD_MAX_AGE_HOURS', 24)
+    
+    # Bulk job memory accounting (see jobs.py); tracemalloc slows jobs down, so off by default
+    app.config['JOB_MEMORY_TRACKING'] = _env_bool('JOB_MEMORY_TRACKING', False)
+    app.config['JOB_MEMORY_TOP_N'] = _env_int('JOB_MEMORY_TOP_N', 10)
+    
+    # Database engine profile
+    profile = resolve_engine_profile(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['DB_ENGINE_PROFILE'] = profile
+    if profile == 'postgresql':
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = postgresql_engine_options()
+    elif profile == 'sqlite':
+        app.config['SQLITE_SETTINGS'] = sqlite_engine_settings()
+        # Python-level lock wait, matched to busy_timeout
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'connect_args': {'timeout': app.config['SQLITE_SETTINGS']['busy_timeout'] / 1000}
+        }
+    
     db.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
-
+    
+    if profile == 'sqlite':
+        with app.app_context():
+            _register_sqlite_pragmas(db.engine, app.config['SQLITE_SETTINGS'])
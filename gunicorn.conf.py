@@ -0,0 +1,79 @@
+"""
+Gunicorn configuration for the certificate mailer
+
+Sizing (override with the environment variables below):
+- Page and AJAX requests are short and mostly wait on the database, so each
+  worker runs several threads (gthread). Certificate rendering is CPU-bound
+  Pillow/PyMuPDF work that holds the GIL, so processes, not threads, add
+  render throughput: start with one worker per core and 4 threads each.
+- Sends block on SMTP for seconds per message; keep `timeout` well above the
+  longest synchronous send batch or move large sends to `flask` CLI jobs.
+- With SQLite, WAL (see DB_ENGINE_PROFILE in config.py) lets readers run while
+  one writer commits; prefer PostgreSQL beyond a couple of workers, and keep
+  workers * threads <= DB_POOL_SIZE + DB_MAX_OVERFLOW.
+
+Measured with benchmarks/route_load.py (--concurrency 16 --duration 20) on a single
+core shared with the load generator, SQLite in WAL mode, 5 hackathons x 2,000
+participants. Figures are requests/s and the p95 range across the six routes:
+
+    workers x threads    req/s    p95 ms
+    1 x 1                221      90-96
+    1 x 4                234      89-121
+    1 x 8                236      91-148
+    2 x 4                216      111-162
+
+Four threads added about 6% throughput over one; eight only raised the participant
+page p95.
+A second worker on the same core cost both throughput and latency, hence one worker
+per core. Multi-core scaling was not measured; re-run on your hardware, e.g.:
+
+    python benchmarks/route_load.py --base-url http://127.0.0.1:8000 \\
+        --username admin --password secret --concurrency 16 --duration 30
+
+and raise WEB_CONCURRENCY / WEB_THREADS while p95 latency stays flat.
+
+Metrics: workers share PROMETHEUS_MULTIPROC_DIR so /metrics on any worker
+reports totals for the whole server. The directory is emptied at startup.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Must be set before the app (and prometheus_client) is imported by preload
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'certificate-mailer-metrics'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth from large uploads/renders
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 1000))
+max_requests_jitter = 100
+
+# Build the app once in the master; workers fork from it
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+def on_starting(server):
+    # Samples left over from a previous run would be added to the new totals
+    # (runs after preload; the master's own samples are never scraped)
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def post_fork(server, worker):
+    from wsgi import init_worker
+    init_worker()
+    server.log.info(f"Worker {worker.pid} initialized")
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,118 @@
+"""
+Per-request instrumentation
+
+Records wall time, SQL statement count/time (SQLAlchemy cursor events) and
+template render time for every request, returns them in a Server-Timing
+header and logs requests that cross the slow thresholds:
+
+    INSTRUMENTATION_ENABLED   master switch (default on)
+    SERVER_TIMING_ENABLED     emit the Server-Timing header to every client (default off; always on in debug mode)
+    SLOW_REQUEST_MS           log requests slower than this (default 1000)
+    SLOW_REQUEST_SQL_COUNT    log requests running more statements than this (default 100)
+    SLOW_SQL_MS               log single statements slower than this (default 250)
+"""
+import time
+from flask import Flask, current_app, g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+
+class RequestTimings:
+    """Accumulated timings for the current request"""
+    __slots__ = ('started', 'sql_count', 'sql_time', 'template_time', 'template_starts', 'slow_statements')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_starts = []
+        self.slow_statements = []
+
+def _current_timings():
+    """Timings for the active request, or None outside a request (background jobs, CLI)"""
+    if not has_request_context():
+        return None
+    return g.get('_request_timings')
+
+def _register_sql_events(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_timings() is not None:
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        timings = _current_timings()
+        starts = conn.info.get('query_start')
+        if timings is None or not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        timings.sql_count += 1
+        timings.sql_time += elapsed
+        if elapsed * 1000 >= current_app.config['SLOW_SQL_MS']:
+            timings.slow_statements.append((elapsed, statement))
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute
+        starts = exception_context.connection.info.get('query_start') if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+def _before_render(sender, template, context, **extra):
+    timings = _current_timings()
+    if timings is not None:
+        timings.template_starts.append(time.perf_counter())
+
+def _after_render(sender, template, context, **extra):
+    timings = _current_timings()
+    if timings is None or not timings.template_starts:
+        return
+    started = timings.template_starts.pop()
+    # Only the outermost render counts, so nested render_template calls are not double-counted
+    if not timings.template_starts:
+        timings.template_time += time.perf_counter() - started
+
+def _start_request():
+    g._request_timings = RequestTimings()
+
+def _finish_request(response):
+    timings = g.pop('_request_timings', None)
+    if timings is None:
+        return response
+
+    total_ms = (time.perf_counter() - timings.started) * 1000
+    sql_ms = timings.sql_time * 1000
+    template_ms = timings.template_time * 1000
+    config = current_app.config
+
+    # Timings reveal how the app spends its time, so clients only get them when asked for
+    if config['SERVER_TIMING_ENABLED'] or current_app.debug:
+        response.headers.add('Server-Timing', f'app;dur={total_ms:.1f}')
+        response.headers.add('Server-Timing', f'sql;dur={sql_ms:.1f};desc="{timings.sql_count} queries"')
+        response.headers.add('Server-Timing', f'tpl;dur={template_ms:.1f}')
+
+    if total_ms >= config['SLOW_REQUEST_MS'] or timings.sql_count > config['SLOW_REQUEST_SQL_COUNT']:
+        current_app.logger.warning(
+            "Slow request %s %s -> %s: %.1fms total, %d queries in %.1fms, templates %.1fms",
+            request.method, request.path, response.status_code, total_ms, timings.sql_count, sql_ms, template_ms
+        )
+    for elapsed, statement in timings.slow_statements:
+        current_app.logger.warning("Slow SQL on %s (%.1fms): %s", request.path, elapsed * 1000, ' '.join(statement.split())[:500])
+
+    return response
+
+def init_instrumentation(app: Flask, engine):
+    """Hook request, SQL and template timing into the app"""
+    app.config.setdefault('INSTRUMENTATION_ENABLED', True)
+    app.config.setdefault('SERVER_TIMING_ENABLED', False)
+    app.config.setdefault('SLOW_REQUEST_MS', 1000)
+    app.config.setdefault('SLOW_REQUEST_SQL_COUNT', 100)
+    app.config.setdefault('SLOW_SQL_MS', 250)
+    if not app.config['INSTRUMENTATION_ENABLED']:
+        return
+
+    _register_sql_events(engine)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
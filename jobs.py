@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import time
+import sysconfig
+import threading
+import tracemalloc
+import click
+from contextlib import contextmanager
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert, update
+
+from config import db
+from models import Job
+
+JOB_MEMORY_TOP_N = 10  # Allocation sites kept per stage in the memory report
+JOB_ERROR_MAX_LENGTH = 2000
+PROGRESS_INTERVAL_SECONDS = 2  # Minimum gap between progress lines from CLI jobs
+
+PACKAGE_ROOT = os.path.dirname(os.path.abspath(__file__))
+# Prefixes stripped from allocation sites in reports, longest first
+_SOURCE_ROOTS = sorted({PACKAGE_ROOT, sysconfig.get_paths()['purelib'], sysconfig.get_paths()['stdlib']}, key=len, reverse=True)
+
+# tracemalloc is process-wide: started by the first tracked job, stopped by the last
+_tracing_jobs = 0
+_tracing_lock = threading.Lock()
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+def current_rss_mb():
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_rss_mb():
+    """Highest RSS this process has reached so far, or None on platforms without getrusage"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+def _location(frame):
+    filename = frame.filename
+    for root in _SOURCE_ROOTS:
+        if filename.startswith(root + os.sep):
+            filename = filename[len(root) + 1:]
+            break
+    return f"{filename}:{frame.lineno}"
+
+class MemoryTracker:
+    """RSS and tracemalloc snapshots at a job's stage boundaries"""
+
+    def __init__(self, top_n=JOB_MEMORY_TOP_N):
+        self.top_n = top_n
+        self.stages = []
+        self.previous = None
+        self.started = None
+        self.rss_start_mb = None
+
+    def start(self):
+        global _tracing_jobs
+        with _tracing_lock:
+            if _tracing_jobs == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _tracing_jobs += 1
+        tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        self.rss_start_mb = current_rss_mb()
+        self.previous = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def snapshot(self, stage):
+        """Record memory at the end of a stage: top allocation sites and growth since the last boundary"""
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        self.stages.append({
+            'stage': stage,
+            'elapsed_seconds': round(time.perf_counter() - self.started, 3),
+            'rss_mb': current_rss_mb(),
+            'traced_current_mb': round(current / (1024 * 1024), 2),
+            'traced_peak_mb': round(peak / (1024 * 1024), 2),
+            'top': [
+                {'location': _location(stat.traceback[0]), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:self.top_n]
+            ],
+            'growth': [
+                {'location': _location(stat.traceback[0]), 'size_diff_kb': round(stat.size_diff / 1024, 1), 'count_diff': stat.count_diff}
+                for stat in snapshot.compare_to(self.previous, 'lineno')[:self.top_n]
+                if stat.size_diff > 0
+            ],
+        })
+        self.previous = snapshot
+        tracemalloc.reset_peak()  # Next stage reports its own peak
+
+    def stop(self):
+        global _tracing_jobs
+        self.previous = None
+        with _tracing_lock:
+            _tracing_jobs -= 1
+            if _tracing_jobs == 0:
+                tracemalloc.stop()
+        return {
+            'rss_start_mb': self.rss_start_mb,
+            'rss_end_mb': current_rss_mb(),
+            'process_peak_rss_mb': peak_rss_mb(),
+            'traced_peak_mb': max((stage['traced_peak_mb'] for stage in self.stages), default=0),
+            'stages': self.stages,
+        }
+
+def _write_job(job_id=None, **values):
+    """
+    Insert or update a Job row on its own connection and transaction
+    
+    Keeps job bookkeeping out of the request session, so recording a job never commits
+    (and expires) the objects the route is working with.
+    """
+    with db.engine.begin() as connection:
+        if job_id is None:
+            return connection.execute(insert(Job).values(**values)).inserted_primary_key[0]
+        connection.execute(update(Job).where(Job.id == job_id).values(**values))
+        return job_id
+
+class JobContext:
+    """Handle passed to the body of run_job: stats to record and stage boundaries to mark"""
+
+    def __init__(self, job_id, tracker):
+        self.id = job_id
+        self.tracker = tracker
+        self.stats = {}
+        self.stage_seconds = {}
+        self.error = None
+        self._stage_started = time.perf_counter()
+
+    def fail(self, message):
+        """Mark the job failed without raising (e.g. a rejected upload)"""
+        self.error = message
+
+    def stage(self, name):
+        """Mark the end of a stage (ingest, render, send)"""
+        now = time.perf_counter()
+        self.stage_seconds[name] = round(now - self._stage_started, 3)
+        self._stage_started = now
+        if self.tracker:
+            self.tracker.snapshot(name)
+
+class JobProgress:
+    """Progress lines ('label: done/total, rate, ETA') for jobs run from the CLI, at most one per interval"""
+    
+    def __init__(self, label, total, interval=PROGRESS_INTERVAL_SECONDS):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.started = self.last_printed = time.perf_counter()
+    
+    def update(self, done):
+        now = time.perf_counter()
+        if done < self.total and now - self.last_printed < self.interval:
+            return
+        self.last_printed = now
+        elapsed = now - self.started
+        rate = done / elapsed if elapsed > 0 else 0
+        eta = f", ETA {(self.total - done) / rate:.0f}s" if rate and done < self.total else ''
+        click.echo(f"{self.label}: {done}/{self.total} ({rate:.1f}/s{eta})")
+
+@contextmanager
+def run_job(kind, user_id=None, hackathon_id=None, track_memory=None, profile=None):
+    """
+    Record a bulk operation as a Job row for its whole duration
+
+    Memory tracking (tracemalloc, noticeably slower) runs when track_memory is True,
+    or when it is None and JOB_MEMORY_TRACKING is set. The job runs under cProfile when
+    profile is True, or when it is None and job profiling is requested (PROFILING_JOBS,
+    or a profiled request); the capture's file name is stored in the job stats.
+    """
+    from blueprints.profiling.utils import job_profiling_requested, start_job_capture, finish_job_capture
+    if track_memory is None:
+        track_memory = current_app.config.get('JOB_MEMORY_TRACKING', False)
+    if profile is None:
+        profile = job_profiling_requested()
+
+    job_id = _write_job(kind=kind, status='running', user_id=user_id, hackathon_id=hackathon_id,
+                        started_at=datetime.utcnow())
+
+    tracker = None
+    if track_memory:
+        tracker = MemoryTracker(current_app.config.get('JOB_MEMORY_TOP_N', JOB_MEMORY_TOP_N))
+        tracker.start()
+    job = JobContext(job_id, tracker)
+    capture = start_job_capture() if profile else None
+
+    error = None
+    try:
+        yield job
+    except BaseException as e:
+        error = e
+        db.session.rollback()
+        raise
+    finally:
+        if capture:
+            job.stats['profile'] = finish_job_capture(capture, kind)
+        report = tracker.stop() if tracker else None
+        if error is not None:
+            job.error = str(error) or type(error).__name__
+        _write_job(
+            job_id,
+            status='failed' if job.error else 'completed',
+            error=job.error[:JOB_ERROR_MAX_LENGTH] if job.error else None,
+            finished_at=datetime.utcnow(),
+            stats=json.dumps(dict(job.stats, stage_seconds=job.stage_seconds)),
+            memory_report=json.dumps(report) if report else None
+        )
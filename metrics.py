@@ -0,0 +1,134 @@
+"""
+Prometheus metrics for the render, send and ingest pipelines
+
+Served at /metrics in the text exposition format. Under gunicorn every worker
+writes its samples to PROMETHEUS_MULTIPROC_DIR (set up in gunicorn.conf.py) and
+a scrape of any worker aggregates them all; without that variable the
+in-process registry is used.
+
+    METRICS_ENABLED   expose /metrics (default: on only when METRICS_TOKEN is set)
+    METRICS_TOKEN     when set, scrapes must send 'Authorization: Bearer <token>'
+"""
+import os
+import hmac
+import time
+import socket
+import smtplib
+import functools
+from flask import Flask, Response, request, abort, current_app
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+RENDER_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SMTP_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+INGEST_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+CERTIFICATE_RENDER_SECONDS = Histogram(
+    'certmailer_certificate_render_seconds', 'Time to render one certificate',
+    ['outcome'], buckets=RENDER_BUCKETS
+)
+SMTP_PHASE_SECONDS = Histogram(
+    'certmailer_smtp_phase_seconds', 'SMTP latency by phase (connect includes STARTTLS, data is the message transfer)',
+    ['phase'], buckets=SMTP_BUCKETS
+)
+EMAILS_SENT = Counter('certmailer_emails_sent_total', 'Messages accepted by the SMTP server', ['kind'])
+EMAILS_FAILED = Counter('certmailer_emails_failed_total', 'Messages that could not be sent', ['kind', 'reason'])
+INGEST_ROWS = Counter('certmailer_ingest_rows_total', 'Records ingested from uploaded files', ['source'])
+INGEST_SECONDS = Histogram('certmailer_ingest_seconds', 'Time to ingest one uploaded file', ['source'], buckets=INGEST_BUCKETS)
+INGEST_ROWS_PER_SECOND = Gauge(
+    'certmailer_ingest_rows_per_second', 'Throughput of the most recent ingest', ['source'],
+    multiprocess_mode='mostrecent'
+)
+QUEUE_DEPTH = Gauge(
+    'certmailer_background_queue_depth', 'Background tasks waiting or running',
+    multiprocess_mode='livesum'
+)
+
+def failure_reason(error):
+    """Map a send failure (exception or short reason string) to a bounded label value"""
+    if isinstance(error, str):
+        return error
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return 'auth'
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return 'recipient_refused'
+    if isinstance(error, smtplib.SMTPSenderRefused):
+        return 'sender_refused'
+    if isinstance(error, smtplib.SMTPDataError):
+        return 'data_rejected'
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return 'disconnected'
+    if isinstance(error, (TimeoutError, socket.timeout)):
+        return 'timeout'
+    if isinstance(error, (smtplib.SMTPConnectError, ConnectionError, socket.gaierror)):
+        return 'connect'
+    if isinstance(error, smtplib.SMTPException):
+        return 'smtp_error'
+    return 'other'
+
+def smtp_phase(phase):
+    """Context manager timing one SMTP phase: connect, login or data"""
+    return SMTP_PHASE_SECONDS.labels(phase=phase).time()
+
+def record_email_sent(kind):
+    EMAILS_SENT.labels(kind=kind).inc()
+
+def record_email_failed(kind, error, count=1):
+    EMAILS_FAILED.labels(kind=kind, reason=failure_reason(error)).inc(count)
+
+def track_certificate_render(func):
+    """Time a render function that returns the output path, or None on failure"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        outcome = 'ok' if result else 'error'
+        CERTIFICATE_RENDER_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - started)
+        return result
+    return wrapper
+
+def track_ingest(source, rows_key):
+    """Time an ingest function returning a result dict; rows come from result[rows_key] on success"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - started
+            if result.get('success'):
+                rows = result.get(rows_key, 0)
+                INGEST_ROWS.labels(source=source).inc(rows)
+                INGEST_SECONDS.labels(source=source).observe(elapsed)
+                INGEST_ROWS_PER_SECOND.labels(source=source).set(rows / elapsed if elapsed > 0 else 0)
+            return result
+        return wrapper
+    return decorator
+
+def update_queue_depth(depth):
+    QUEUE_DEPTH.set(depth)
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            abort(401)
+
+    from tasks import queue_depth
+    update_queue_depth(queue_depth())
+    return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
+
+def init_metrics(app: Flask):
+    """Expose /metrics"""
+    app.config.setdefault('METRICS_TOKEN', '')
+    app.config.setdefault('METRICS_ENABLED', bool(app.config['METRICS_TOKEN']))
+    if app.config['METRICS_ENABLED']:
+        app.add_url_rule('/metrics', 'metrics', metrics_view)
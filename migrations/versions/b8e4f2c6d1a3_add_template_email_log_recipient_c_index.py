@@ -0,0 +1,27 @@
+"""Add code point ordered recipient index to template email logs (PostgreSQL)
+
+Revision ID: b8e4f2c6d1a3
+Revises: a7d3e5f1c2b9
+Create Date: 2026-10-19 21:14:37.528406
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e4f2c6d1a3'
+down_revision = 'a7d3e5f1c2b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The recipient prefix search compares under COLLATE "C" on PostgreSQL; SQLite's
+    # default BINARY collation already orders by code point and uses the plain index
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE INDEX ix_template_email_log_recipient_email_c ON template_email_log ((recipient_email COLLATE "C"))')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX ix_template_email_log_recipient_email_c')
@@ -0,0 +1,52 @@
+"""Add unique (hackathon_id, email) constraint to Participant
+
+Revision ID: c5e8f3a17b20
+Revises: a41f6b2c8d95
+Create Date: 2026-10-19 11:48:55.102736
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8f3a17b20'
+down_revision = 'a41f6b2c8d95'
+branch_labels = None
+depends_on = None
+
+
+# Rows sharing the current row's (hackathon_id, email), the row itself included
+DUPLICATES = "FROM participant AS dup WHERE dup.hackathon_id = participant.hackathon_id AND dup.email = participant.email"
+
+
+def upgrade():
+    # Carry sent flags from duplicates onto the oldest row, so deleting them never
+    # makes an already-mailed participant look unsent
+    op.execute(
+        "UPDATE participant SET "
+        f"certificate_sent = EXISTS (SELECT 1 {DUPLICATES} AND dup.certificate_sent), "
+        f"sent_at = (SELECT MAX(dup.sent_at) {DUPLICATES}), "
+        "certificate_template_id = COALESCE("
+        f"(SELECT dup.certificate_template_id {DUPLICATES} AND dup.certificate_sent "
+        "ORDER BY dup.sent_at DESC LIMIT 1), participant.certificate_template_id), "
+        f"uncompletion_email_sent = EXISTS (SELECT 1 {DUPLICATES} AND dup.uncompletion_email_sent), "
+        f"uncompletion_email_sent_at = (SELECT MAX(dup.uncompletion_email_sent_at) {DUPLICATES}) "
+        "WHERE id IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM participant GROUP BY hackathon_id, email HAVING COUNT(*) > 1) AS keepers"
+        ")"
+    )
+
+    # Remove duplicate (hackathon_id, email) rows left by older uploads, keeping the oldest
+    op.execute(
+        "DELETE FROM participant WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM participant GROUP BY hackathon_id, email) AS keepers"
+        ")"
+    )
+
+    with op.batch_alter_table('participant', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_participant_hackathon_id_email', ['hackathon_id', 'email'])
+
+
+def downgrade():
+    with op.batch_alter_table('participant', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_participant_hackathon_id_email', type_='unique')
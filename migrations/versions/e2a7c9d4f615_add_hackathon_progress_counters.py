@@ -0,0 +1,40 @@
+"""Add denormalized progress counters to Hackathon
+
+Revision ID: e2a7c9d4f615
+Revises: d9b4e6c2a718
+Create Date: 2026-10-19 13:05:44.219870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c9d4f615'
+down_revision = 'd9b4e6c2a718'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('hackathon', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('participant_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('certificates_sent_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('uncompletion_emails_sent_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill the counters from existing participants
+    op.execute(
+        "UPDATE hackathon SET "
+        "participant_count = (SELECT COUNT(*) FROM participant WHERE participant.hackathon_id = hackathon.id), "
+        "certificates_sent_count = (SELECT COUNT(*) FROM participant WHERE participant.hackathon_id = hackathon.id "
+        "AND participant.certificate_sent = TRUE), "
+        "uncompletion_emails_sent_count = (SELECT COUNT(*) FROM participant WHERE participant.hackathon_id = hackathon.id "
+        "AND participant.uncompletion_email_sent = TRUE)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('hackathon', schema=None) as batch_op:
+        batch_op.drop_column('uncompletion_emails_sent_count')
+        batch_op.drop_column('certificates_sent_count')
+        batch_op.drop_column('participant_count')
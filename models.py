@@ -18,6 +18,17 @@ class Hackathon(db.Model):
     participants = db.relationship('Participant', backref='hackathon', lazy=True)
     resubmission_form_link = db.Column(db.String(255))  # Link for resubmission form
     feedback_form_link = db.Column(db.String(255))  # Link for feedback form
+    
+    # Denormalized progress counters, maintained by every participant write path
+    # (rebuild with `flask hackathon reconcile-counters`)
+    participant_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    certificates_sent_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    uncompletion_emails_sent_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Hackathon lists are per user, newest first
+    __table_args__ = (
+        db.Index('ix_hackathon_user_id_created_at', 'user_id', 'created_at'),
+    )
 
 class CertificateTemplate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -29,6 +40,10 @@ class CertificateTemplate(db.Model):
     font_color = db.Column(db.String(7), default='#000000')
     hackathon_id = db.Column(db.Integer, db.ForeignKey('hackathon.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_certificate_template_hackathon_id', 'hackathon_id'),
+    )
 
 class Participant(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -50,6 +65,15 @@ class Participant(db.Model):
     certificate_template_id = db.Column(db.Integer, db.ForeignKey('certificate_template.id'))
     sent_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # One participant per email per hackathon (target of the CSV upload upsert);
+    # also serves every hackathon_id-only lookup as its leading column
+    __table_args__ = (
+        db.UniqueConstraint('hackathon_id', 'email', name='uq_participant_hackathon_id_email'),
+        db.Index('ix_participant_hackathon_id_certificate_sent', 'hackathon_id', 'certificate_sent'),
+        db.Index('ix_participant_email', 'email'),
+        db.Index('ix_participant_certificate_template_id', 'certificate_template_id'),
+    )
 
 class EmailTemplate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -69,6 +93,11 @@ class EmailTemplate(db.Model):
     
     # Relationship
     user = db.relationship('User', backref='email_templates')
+    
+    # Template lists are per user, most recently updated first
+    __table_args__ = (
+        db.Index('ix_email_template_user_id_updated_at', 'user_id', 'updated_at'),
+    )
 
 class MeetLink(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -81,6 +110,10 @@ class MeetLink(db.Model):
     
     # Relationship
     user = db.relationship('User', backref='meet_links')
+    
+    __table_args__ = (
+        db.Index('ix_meet_link_user_id_is_active', 'user_id', 'is_active'),
+    )
 
 class TemplateEmailLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -100,3 +133,89 @@ class TemplateEmailLog(db.Model):
     # Relationships
     template = db.relationship('EmailTemplate', backref='email_logs')
     user = db.relationship('User', backref='template_email_logs')
+    
+    # Indexes backing the log browsing/search API (keyset pagination on sent_at, id)
+    __table_args__ = (
+        db.Index('ix_template_email_log_user_id_sent_at', 'user_id', 'sent_at'),
+        db.Index('ix_template_email_log_template_id_status', 'template_id', 'status'),
+        db.Index('ix_template_email_log_recipient_email', 'recipient_email'),
+        # Recipient prefix search compares in code point order (COLLATE "C") on PostgreSQL
+        db.Index('ix_template_email_log_recipient_email_c', recipient_email.collate('C')).ddl_if(dialect='postgresql'),
+    )
+
+class ParticipantSelection(db.Model):
+    """Named participant filter for a hackathon, resolved in SQL at send time"""
+    id = db.Column(db.Integer, primary_key=True)
+    hackathon_id = db.Column(db.Integer, db.ForeignKey('hackathon.id'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    filters = db.Column(db.Text, nullable=False)  # JSON: {"status": "unsent", "team": "...", "remarks": "..."}
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('hackathon_id', 'name', name='uq_participant_selection_hackathon_id_name'),
+    )
+
+class StagingUpload(db.Model):
+    """Server-side record of a parsed upload (participants CSV or contacts file)"""
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, used as the upload id
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    hackathon_id = db.Column(db.Integer, db.ForeignKey('hackathon.id'))  # Only for participant uploads
+    kind = db.Column(db.String(20), nullable=False)  # 'participants' or 'contacts'
+    filename = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Ingestion stats
+    total_rows = db.Column(db.Integer, default=0)  # Rows read from the file
+    total_records = db.Column(db.Integer, default=0)  # Valid, deduplicated records staged
+    invalid_count = db.Column(db.Integer, default=0)
+    invalid_emails = db.Column(db.Text)  # JSON: bounded sample of invalid emails
+    skipped_rows = db.Column(db.Integer, default=0)
+    
+    # Contacts files: source column names
+    name_column = db.Column(db.String(255))
+    email_column = db.Column(db.String(255))
+    extra_columns = db.Column(db.Text)  # JSON: ["time_slot", "position"]
+
+class StagedParticipant(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    upload_id = db.Column(db.String(32), db.ForeignKey('staging_upload.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # Order in the source file
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    team_name = db.Column(db.String(100))
+    member_position = db.Column(db.Integer)
+    completion_remarks = db.Column(db.Text)
+    
+    __table_args__ = (
+        db.UniqueConstraint('upload_id', 'position', name='uq_staged_participant_upload_id_position'),
+    )
+
+class StagedContact(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    upload_id = db.Column(db.String(32), db.ForeignKey('staging_upload.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # Order in the source file
+    name = db.Column(db.String(255), nullable=False)
+    email = db.Column(db.String(255), nullable=False)
+    extra_data = db.Column(db.Text)  # JSON of all other columns for this contact
+    
+    __table_args__ = (
+        db.UniqueConstraint('upload_id', 'position', name='uq_staged_contact_upload_id_position'),
+        db.Index('ix_staged_contact_upload_id_email', 'upload_id', 'email'),
+    )
+
+class Job(db.Model):
+    """One bulk operation (ingest, render or send) with its outcome and optional memory report"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)  # 'ingest_participants', 'send_certificates', ...
+    status = db.Column(db.String(20), nullable=False, default='running')  # 'running', 'completed', 'failed'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    hackathon_id = db.Column(db.Integer, db.ForeignKey('hackathon.id'))
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    stats = db.Column(db.Text)  # JSON: {"sent": 120, "failed": 2}
+    error = db.Column(db.Text)
+    memory_report = db.Column(db.Text)  # JSON: peak RSS and per-stage tracemalloc snapshots, when enabled
+    
+    __table_args__ = (
+        db.Index('ix_job_hackathon_id_started_at', 'hackathon_id', 'started_at'),
+    )
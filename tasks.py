@@ -0,0 +1,97 @@
+import os
+import queue
+import logging
+import threading
+import time
+
+from metrics import update_queue_depth
+
+logger = logging.getLogger(__name__)
+
+CLEANUP_BATCH_SIZE = 500  # Files unlinked per batch before yielding to request threads
+
+# Single in-process background worker: (func, args, kwargs) items run in order
+_task_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+def _run_tasks():
+    while True:
+        func, args, kwargs = _task_queue.get()
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception("Background task %s failed", getattr(func, '__name__', func))
+        finally:
+            _task_queue.task_done()
+            update_queue_depth(_task_queue.unfinished_tasks)
+
+def enqueue_task(func, *args, **kwargs):
+    """Run func(*args, **kwargs) on the background worker, starting it on first use"""
+    global _worker
+    from blueprints.profiling.utils import profiled
+    func = profiled(func)  # Unchanged unless a profile capture was requested
+    
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_tasks, name='background-tasks', daemon=True)
+            _worker.start()
+    _task_queue.put((func, args, kwargs))
+    update_queue_depth(_task_queue.unfinished_tasks)
+
+def reset_after_fork():
+    """Give a forked worker its own queue and lock; the parent's worker thread does not survive fork"""
+    global _task_queue, _worker, _worker_lock
+    _task_queue = queue.Queue()
+    _worker = None
+    _worker_lock = threading.Lock()
+
+def queue_depth():
+    """Number of background tasks waiting or running"""
+    return _task_queue.unfinished_tasks
+
+def wait_for_tasks():
+    """Block until every queued background task has finished"""
+    _task_queue.join()
+
+def remove_paths(paths, batch_size=CLEANUP_BATCH_SIZE):
+    """
+    Delete files and directory trees, unlinking in batches
+    
+    Missing paths are ignored; directories are removed bottom-up once emptied.
+    Returns the number of files removed.
+    """
+    files = []
+    directories = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirnames, filenames in os.walk(path, topdown=False):
+                files.extend(os.path.join(root, filename) for filename in filenames)
+                directories.append(root)
+        elif os.path.exists(path):
+            files.append(path)
+    
+    removed = 0
+    for start in range(0, len(files), batch_size):
+        for file_path in files[start:start + batch_size]:
+            try:
+                os.unlink(file_path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        time.sleep(0)  # Let request threads run between batches
+    
+    for directory in directories:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass  # Not empty (new files arrived) or already gone
+    
+    logger.debug("Background cleanup removed %d files", removed)
+    return removed
+
+def enqueue_file_cleanup(paths):
+    """Schedule removal of files and directories on the background worker"""
+    paths = [path for path in paths if path]
+    if paths:
+        enqueue_task(remove_paths, paths)
@@ -0,0 +1,40 @@
+import os
+import sys
+import pytest
+
+# The app is run from the repository root rather than installed
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Application on a fresh SQLite database with the full schema, inside an app context"""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.sqlite3'}")
+    monkeypatch.setenv('SECRET_KEY', 'test-secret-key-0123456789abcdef0123456789')
+    monkeypatch.setenv('METRICS_ENABLED', 'false')
+    
+    from app import create_app
+    from config import db
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Factory building the app with extra environment variables, e.g. make_app(METRICS_TOKEN='x')"""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.sqlite3'}")
+    monkeypatch.setenv('SECRET_KEY', 'test-secret-key-0123456789abcdef0123456789')
+    for name in ('METRICS_ENABLED', 'METRICS_TOKEN', 'SERVER_TIMING_ENABLED'):
+        monkeypatch.delenv(name, raising=False)
+    
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        from app import create_app
+        return create_app()
+    return make
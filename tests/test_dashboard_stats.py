@@ -0,0 +1,36 @@
+from sqlalchemy import update
+
+from config import db
+from models import User, Hackathon
+from blueprints.main import utils as main_utils
+from blueprints.main.utils import get_dashboard_stats, invalidate_dashboard_stats
+
+def set_participant_count(hackathon_id, count):
+    db.session.execute(update(Hackathon).where(Hackathon.id == hackathon_id).values(participant_count=count))
+    db.session.commit()
+
+def test_cached_stats_refresh_on_invalidation_and_expiry(app, monkeypatch):
+    user = User(username='owner', email='owner@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    hackathon = Hackathon(name='Hack', user_id=user.id, participant_count=3)
+    db.session.add(hackathon)
+    db.session.commit()
+    
+    clock = [1000.0]
+    monkeypatch.setattr(main_utils.time, 'monotonic', lambda: clock[0])
+    invalidate_dashboard_stats(user.id)
+    assert get_dashboard_stats(user.id)['total_participants'] == 3
+    
+    # Served from the cache until invalidated
+    set_participant_count(hackathon.id, 5)
+    assert get_dashboard_stats(user.id)['total_participants'] == 3
+    invalidate_dashboard_stats(user.id)
+    assert get_dashboard_stats(user.id)['total_participants'] == 5
+    
+    # Another worker's change (no local invalidation) shows once the entry expires
+    set_participant_count(hackathon.id, 8)
+    clock[0] += main_utils.DASHBOARD_STATS_TTL - 1
+    assert get_dashboard_stats(user.id)['total_participants'] == 5
+    clock[0] += 2
+    assert get_dashboard_stats(user.id)['total_participants'] == 8
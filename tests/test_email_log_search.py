@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+from config import db
+from models import User, EmailTemplate, TemplateEmailLog
+from blueprints.bulk_email.template_utils import search_template_email_logs, decode_log_cursor, prefix_upper_bound
+
+def add_logs(recipients):
+    user = User(username='owner', email='owner@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    template = EmailTemplate(name='Invite', subject='Hi', body='Hello', user_id=user.id)
+    db.session.add(template)
+    db.session.flush()
+    start = datetime(2026, 1, 1)
+    for i, email in enumerate(recipients):
+        db.session.add(TemplateEmailLog(
+            template_id=template.id, recipient_email=email, recipient_name='Someone',
+            subject_sent='Hi', body_sent='Hello', user_id=user.id,
+            sent_at=start + timedelta(minutes=i)
+        ))
+    db.session.commit()
+    return user.id
+
+def test_recipient_wildcards_match_literally(app):
+    user_id = add_logs(['a_b@example.com', 'axb@example.com', 'a%c@example.com', 'abc@example.com'])
+    
+    found = search_template_email_logs(user_id, recipient='a_')['logs']
+    assert [log['recipient_email'] for log in found] == ['a_b@example.com']
+    
+    found = search_template_email_logs(user_id, recipient='A%')['logs']
+    assert [log['recipient_email'] for log in found] == ['a%c@example.com']
+
+def test_pages_cover_every_log_once(app):
+    user_id = add_logs([f"user{i}@example.com" for i in range(7)])
+    # Same sent_at for a second batch so the id tie-breaker is exercised
+    same_time = datetime(2026, 2, 1)
+    for i in range(3):
+        db.session.add(TemplateEmailLog(
+            template_id=1, recipient_email=f"tie{i}@example.com", recipient_name='Someone',
+            subject_sent='Hi', body_sent='Hello', user_id=user_id, sent_at=same_time
+        ))
+    db.session.commit()
+    
+    seen, cursor = [], None
+    while True:
+        page = search_template_email_logs(user_id, cursor=cursor, limit=3)
+        seen.extend(log['id'] for log in page['logs'])
+        if not page['next_cursor']:
+            break
+        cursor = decode_log_cursor(page['next_cursor'])
+    assert sorted(seen) == list(range(1, 11))
+    assert len(seen) == len(set(seen))
+
+def test_logs_without_sent_at_are_skipped(app):
+    user_id = add_logs([f"user{i}@example.com" for i in range(3)])
+    db.session.execute(db.update(TemplateEmailLog).where(TemplateEmailLog.id == 3).values(sent_at=None))
+    db.session.commit()
+    
+    page = search_template_email_logs(user_id, limit=1)
+    assert page['next_cursor'] is not None
+    page = search_template_email_logs(user_id, cursor=decode_log_cursor(page['next_cursor']), limit=1)
+    assert [log['id'] for log in page['logs']] == [1]
+    assert page['next_cursor'] is None
+
+def test_prefix_upper_bound():
+    assert prefix_upper_bound('abc') == 'abd'
+    assert prefix_upper_bound('a\U0001F600') == 'a\U0001F601'
+    assert prefix_upper_bound('a\U0010FFFF') == 'b'
+    assert prefix_upper_bound('\U0010FFFF') is None
+    assert prefix_upper_bound('a\uD7FF') == 'a\uE000'
+
+def test_recipient_prefix_beyond_the_bmp(app):
+    # Characters above U+FFFF after the prefix must still match
+    user_id = add_logs(['a\U0001F600@example.com', 'a@example.com', 'b\U0001F600@example.com', '\U0001F600@example.com'])
+    
+    found = search_template_email_logs(user_id, recipient='a')['logs']
+    assert sorted(log['recipient_email'] for log in found) == ['a@example.com', 'a\U0001F600@example.com']
+    
+    found = search_template_email_logs(user_id, recipient='\U0001F600')['logs']
+    assert [log['recipient_email'] for log in found] == ['\U0001F600@example.com']
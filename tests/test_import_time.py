@@ -0,0 +1,64 @@
+"""
+Importing and building the app must not pull in the heavy parsing and imaging libraries
+
+Runs in a fresh interpreter so modules already imported by other tests don't hide a regression.
+Blueprints are imported inside create_app(), so both steps are checked.
+"""
+import os
+import re
+import sys
+import subprocess
+
+from conftest import REPO_ROOT
+
+HEAVY_MODULES = ('pandas', 'numpy', 'fitz', 'PIL')
+# Import time of 'import app' plus the imports create_app() triggers; 0.65-0.8s here. A coarse
+# backstop against startup creep: a single heavy library is caught by the sys.modules check
+IMPORT_TIME_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', 1000))
+
+# Top-level lines only (no indent before the module name): their cumulative times don't overlap
+IMPORTTIME_RE = re.compile(r'^import time:\s+\d+ \|\s+(?P<cumulative>\d+) \| (?P<module>\S+)$')
+START_MARKER = 'probe: start'
+END_MARKER = 'probe: end'
+
+PROBE = """
+import sys
+print({start!r}, file=sys.stderr, flush=True)
+import app
+print(','.join(name for name in {modules!r} if name in sys.modules))
+app.create_app()
+print(','.join(name for name in {modules!r} if name in sys.modules))
+print({end!r}, file=sys.stderr, flush=True)
+"""
+
+def run_probe(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'test.sqlite3'}",
+               SECRET_KEY='test-secret-key-0123456789abcdef0123456789', METRICS_ENABLED='false')
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    probe = PROBE.format(modules=HEAVY_MODULES, start=START_MARKER, end=END_MARKER)
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+def test_app_startup_skips_heavy_modules(tmp_path):
+    after_import, after_create = run_probe(tmp_path).stdout.splitlines()[-2:]
+    assert after_import == '', f"import app loaded {after_import}"
+    assert after_create == '', f"create_app() loaded {after_create}"
+
+def test_app_startup_import_time_within_budget(tmp_path):
+    lines = run_probe(tmp_path).stderr.splitlines()
+    startup = lines[lines.index(START_MARKER) + 1:lines.index(END_MARKER)]
+    
+    imports = {}
+    for line in startup:
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            imports[match.group('module')] = int(match.group('cumulative'))
+    assert 'app' in imports, "no importtime line for app"
+    
+    total_ms = sum(imports.values()) / 1000
+    slowest = ', '.join(f"{name} {us / 1000:.0f}ms" for name, us in sorted(imports.items(), key=lambda item: -item[1])[:5])
+    assert total_ms <= IMPORT_TIME_BUDGET_MS, (
+        f"import app + create_app() imports took {total_ms:.0f}ms, budget {IMPORT_TIME_BUDGET_MS}ms ({slowest})"
+    )
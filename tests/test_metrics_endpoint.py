@@ -0,0 +1,10 @@
+def test_metrics_off_by_default(make_app):
+    assert make_app().test_client().get('/metrics').status_code == 404
+
+def test_metrics_token_enables_endpoint(make_app):
+    client = make_app(METRICS_TOKEN='scrape-token').test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'}).status_code == 200
+
+def test_metrics_explicitly_enabled_without_token(make_app):
+    assert make_app(METRICS_ENABLED='true').test_client().get('/metrics').status_code == 200
@@ -0,0 +1,106 @@
+import csv
+
+import pytest
+from sqlalchemy import event
+
+from config import db
+from models import User, Hackathon, Participant, StagingUpload, StagedParticipant
+from blueprints.csv.utils import (
+    process_csv_file, stream_csv_file_to_staging, iter_staged_participants,
+    upsert_staged_participants, delete_staged_participants
+)
+
+HEADER = ['Team Name', 'Name of 1st Member', 'Email of 1st Member', 'Name of 2nd Member', 'Email of 2nd Member',
+          'Completion Remarks']
+
+@pytest.fixture
+def hackathon(app):
+    user = User(username='owner', email='owner@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    hackathon = Hackathon(name='Hack', user_id=user.id)
+    db.session.add(hackathon)
+    db.session.commit()
+    return hackathon
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+def test_streamed_ingest_matches_whole_file(hackathon, tmp_path):
+    # Team names and remarks are numeric in some chunks and text or empty in others, and
+    # emails repeat across chunks, so per-chunk type inference or dedup would show up
+    rows = []
+    for i in range(40):
+        team = 'Team One' if i == 1 else ('' if i % 5 == 0 else str(i))
+        remarks = ['5', 'NA', '', '2.50', 'done'][i % 5]
+        second = f"m{i % 7}@example.com" if i % 4 else ''
+        rows.append([team, f"first {i}", f"f{i}@example.com", f"second {i}" if second else '', second, remarks])
+    path = tmp_path / 'participants.csv'
+    write_csv(path, rows)
+    
+    whole = process_csv_file(str(path))
+    streamed = stream_csv_file_to_staging(str(path), hackathon.user_id, hackathon.id, chunksize=6)
+    staged = [participant for batch in iter_staged_participants(streamed['upload_id']) for participant in batch]
+    
+    assert whole['success'] and streamed['success']
+    assert staged == whole['participants']
+    assert streamed['total_participants'] == whole['total_participants']
+    assert {'5', 'NA'} <= {participant['completion_remarks'] for participant in staged}
+    assert '12' in {participant['team_name'] for participant in staged}
+
+def stage(hackathon, emails_and_remarks):
+    upload = StagingUpload(id='u' * 32, user_id=hackathon.user_id, hackathon_id=hackathon.id, kind='participants')
+    db.session.add(upload)
+    for position, (email, remarks) in enumerate(emails_and_remarks):
+        db.session.add(StagedParticipant(upload_id=upload.id, position=position, name='Someone', email=email,
+                                         completion_remarks=remarks))
+    db.session.commit()
+    return upload.id
+
+def test_upsert_keeps_first_duplicate_across_batches(hackathon):
+    upload_id = stage(hackathon, [('a@example.com', 'first'), ('b@example.com', ''), ('a@example.com', 'second')])
+    
+    assert upsert_staged_participants(hackathon.id, upload_id, batch_size=2) == 2
+    delete_staged_participants(upload_id)
+    
+    remarks = dict(db.session.query(Participant.email, Participant.completion_remarks))
+    assert remarks == {'a@example.com': 'first', 'b@example.com': ''}
+    assert db.session.get(Hackathon, hackathon.id).participant_count == 2
+
+def test_upsert_counts_only_inserted_rows(hackathon):
+    db.session.add(Participant(name='Existing', email='a@example.com', hackathon_id=hackathon.id, completion_remarks='old'))
+    db.session.commit()
+    upload_id = stage(hackathon, [('a@example.com', 'new'), ('b@example.com', '')])
+    
+    assert upsert_staged_participants(hackathon.id, upload_id) == 1
+    
+    assert dict(db.session.query(Participant.email, Participant.completion_remarks)) == {
+        'a@example.com': 'new', 'b@example.com': ''
+    }
+    # The existing row was added outside the counters, so only the new one is counted
+    assert db.session.get(Hackathon, hackathon.id).participant_count == 1
+
+def test_upsert_skips_rows_inserted_concurrently(hackathon):
+    upload_id = stage(hackathon, [('a@example.com', 'new'), ('b@example.com', '')])
+    
+    # Another writer adds a@example.com after the existing-participant lookup, just before the insert
+    def concurrent_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO participant') and not concurrent_insert.done:
+            concurrent_insert.done = True
+            cursor.execute("INSERT INTO participant (name, email, hackathon_id, completion_remarks) VALUES (?, ?, ?, ?)",
+                           ('Other', 'a@example.com', hackathon.id, 'old'))
+    concurrent_insert.done = False
+    
+    event.listen(db.engine, 'before_cursor_execute', concurrent_insert)
+    try:
+        assert upsert_staged_participants(hackathon.id, upload_id) == 1
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', concurrent_insert)
+    
+    assert dict(db.session.query(Participant.email, Participant.completion_remarks)) == {
+        'a@example.com': 'new', 'b@example.com': ''
+    }
+    assert db.session.get(Hackathon, hackathon.id).participant_count == 1
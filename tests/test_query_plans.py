@@ -0,0 +1,95 @@
+"""
+Hot list, count and lookup queries must be served by an index
+
+Each case runs the real helper, records the SELECTs it issues and checks SQLite's
+EXPLAIN QUERY PLAN for a full table scan ('SCAN <table>').
+"""
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from config import db
+from models import Hackathon, Participant, CertificateTemplate
+from blueprints.main.utils import compute_dashboard_stats
+from blueprints.csv.utils import (
+    get_participants_page, count_pending_participants, filter_participants_query,
+    load_selected_participants, mark_certificates_sent, iter_staged_participants
+)
+from blueprints.bulk_email.utils import get_staged_contacts_page, get_staged_contacts_by_email, iter_staged_contacts
+from blueprints.bulk_email.template_utils import (
+    get_user_templates, get_user_meet_links, search_template_email_logs, get_sent_recipients
+)
+
+USER_ID = 1
+HACKATHON_ID = 1
+UPLOAD_ID = 'a' * 32
+
+SCAN_RE = re.compile(r'^SCAN (\w+)')
+
+HOT_QUERIES = {
+    'dashboard stats': lambda: compute_dashboard_stats(USER_ID),
+    'hackathon list': lambda: Hackathon.query.filter_by(user_id=USER_ID).order_by(Hackathon.created_at.desc()).all(),
+    'hackathon lookup': lambda: Hackathon.query.filter_by(id=HACKATHON_ID, user_id=USER_ID).first(),
+    'certificate templates': lambda: CertificateTemplate.query.filter_by(hackathon_id=HACKATHON_ID).all(),
+    'participants page': lambda: get_participants_page(HACKATHON_ID),
+    'participants next page': lambda: get_participants_page(HACKATHON_ID, after_id=100),
+    'unsent participants page': lambda: get_participants_page(HACKATHON_ID, status='unsent'),
+    'pending count': lambda: count_pending_participants(HACKATHON_ID),
+    'sent count': lambda: filter_participants_query(HACKATHON_ID, status='sent').count(),
+    'participant email lookup': lambda: Participant.query.filter_by(email='someone@example.com').all(),
+    'selected participants': lambda: load_selected_participants(HACKATHON_ID, [1, 2, 3]),
+    'mark certificates sent': lambda: mark_certificates_sent(HACKATHON_ID, [1, 2, 3], 1),
+    'staged participants': lambda: list(iter_staged_participants(UPLOAD_ID)),
+    'staged contacts page': lambda: get_staged_contacts_page(UPLOAD_ID),
+    'staged contacts batches': lambda: list(iter_staged_contacts(UPLOAD_ID)),
+    'staged contacts by email': lambda: get_staged_contacts_by_email(UPLOAD_ID, ['someone@example.com']),
+    'email templates': lambda: get_user_templates(USER_ID),
+    'meet links': lambda: get_user_meet_links(USER_ID),
+    'email log page': lambda: search_template_email_logs(USER_ID),
+    'email log next page': lambda: search_template_email_logs(USER_ID, cursor=(datetime(2026, 1, 1), 100)),
+    'email log by template and status': lambda: search_template_email_logs(USER_ID, template_id=1, status='failed'),
+    'email log by recipient': lambda: search_template_email_logs(USER_ID, recipient='someone@'),
+    'email log date range': lambda: search_template_email_logs(
+        USER_ID, date_from=datetime(2026, 1, 1), date_to=datetime(2026, 2, 1)
+    ),
+    'sent recipients': lambda: get_sent_recipients(1, ['someone@example.com']),
+}
+
+@contextmanager
+def recorded_selects():
+    """Collect (statement, parameters) for every SELECT run on the engine"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+def full_table_scans(statement, parameters):
+    """Plan lines of a statement that scan a whole table"""
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    scans = []
+    for row in plan:
+        match = SCAN_RE.match(row.detail)
+        if match and match.group(1) in db.metadata.tables:
+            scans.append(row.detail)
+    return scans
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_index(app, name):
+    with recorded_selects() as statements:
+        HOT_QUERIES[name]()
+    db.session.rollback()
+    
+    assert statements, f"{name} ran no SELECT"
+    for statement, parameters in statements:
+        scans = full_table_scans(statement, parameters)
+        assert not scans, f"{name} falls back to a full scan: {scans}\n{statement}"
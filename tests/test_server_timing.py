@@ -0,0 +1,13 @@
+def test_no_server_timing_by_default(make_app):
+    response = make_app().test_client().get('/auth/login')
+    assert 'Server-Timing' not in response.headers
+
+def test_server_timing_in_debug_mode(make_app):
+    app = make_app()
+    app.debug = True
+    response = app.test_client().get('/auth/login')
+    assert response.headers.get('Server-Timing', '').startswith('app;dur=')
+
+def test_server_timing_when_enabled(make_app):
+    response = make_app(SERVER_TIMING_ENABLED='true').test_client().get('/auth/login')
+    assert response.headers.get('Server-Timing', '').startswith('app;dur=')
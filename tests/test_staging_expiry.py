@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from config import db
+from models import User, Hackathon, StagingUpload, StagedContact, StagedParticipant
+from blueprints.bulk_email.utils import delete_expired_staged_contacts
+from blueprints.csv.utils import delete_expired_staged_participants
+
+def add_upload(user_id, kind, age_hours, hackathon_id=None):
+    upload = StagingUpload(id=f"{kind[0]}{age_hours:031d}", user_id=user_id, hackathon_id=hackathon_id, kind=kind,
+                           created_at=datetime.utcnow() - timedelta(hours=age_hours))
+    db.session.add(upload)
+    if kind == 'contacts':
+        db.session.add(StagedContact(upload_id=upload.id, position=0, name='Someone', email='someone@example.com'))
+    else:
+        db.session.add(StagedParticipant(upload_id=upload.id, position=0, name='Someone', email='someone@example.com'))
+    return upload.id
+
+def test_only_expired_uploads_of_each_kind_are_removed(app):
+    user = User(username='owner', email='owner@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    hackathon = Hackathon(name='Hack', user_id=user.id)
+    db.session.add(hackathon)
+    db.session.flush()
+    fresh_contacts = add_upload(user.id, 'contacts', 1)
+    add_upload(user.id, 'contacts', 48)
+    fresh_participants = add_upload(user.id, 'participants', 1, hackathon.id)
+    old_participants = add_upload(user.id, 'participants', 48, hackathon.id)
+    db.session.commit()
+    
+    assert delete_expired_staged_contacts(24) == 1
+    assert {upload.id for upload in StagingUpload.query} == {fresh_contacts, fresh_participants, old_participants}
+    assert [staged.upload_id for staged in StagedContact.query] == [fresh_contacts]
+    
+    assert delete_expired_staged_participants(24) == 1
+    assert [staged.upload_id for staged in StagedParticipant.query] == [fresh_participants]
@@ -0,0 +1,27 @@
+import logging
+
+from tasks import enqueue_task, wait_for_tasks, remove_paths
+
+def test_failed_task_is_logged_with_traceback(caplog):
+    def broken():
+        raise RuntimeError('disk on fire')
+    
+    with caplog.at_level(logging.ERROR, logger='tasks'):
+        enqueue_task(broken)
+        wait_for_tasks()
+    
+    record = next(record for record in caplog.records if record.name == 'tasks')
+    assert 'broken' in record.getMessage()
+    assert record.exc_info and 'disk on fire' in str(record.exc_info[1])
+
+def test_remove_paths_logs_instead_of_printing(tmp_path, capsys, caplog):
+    (tmp_path / 'nested').mkdir()
+    (tmp_path / 'nested' / 'a.png').write_bytes(b'x')
+    (tmp_path / 'b.png').write_bytes(b'x')
+    
+    with caplog.at_level(logging.DEBUG, logger='tasks'):
+        assert remove_paths([str(tmp_path)]) == 2
+    
+    assert not tmp_path.exists()
+    assert capsys.readouterr().out == ''
+    assert 'removed 2 files' in caplog.text
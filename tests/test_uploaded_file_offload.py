@@ -0,0 +1,16 @@
+from urllib.parse import quote
+
+from blueprints.certificates import routes as certificate_routes
+
+def test_accel_redirect_is_percent_encoded(make_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(certificate_routes, 'UPLOADS_ROOT', str(tmp_path))
+    name = 'my cert 100%?#é.png'
+    (tmp_path / 'certificates' / '1').mkdir(parents=True)
+    (tmp_path / 'certificates' / '1' / name).write_bytes(b'png bytes')
+    
+    client = make_app(UPLOADS_OFFLOAD='x-accel-redirect').test_client()
+    response = client.get('/uploads/' + quote(f"certificates/1/{name}"))
+    
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == '/protected-uploads/certificates/1/my%20cert%20100%25%3F%23%C3%A9.png'
+    assert response.data == b''
@@ -0,0 +1,34 @@
+"""
+Production WSGI entry point
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is built once in the master (preload) so workers fork with routes,
+blueprints and compiled templates already in memory; init_worker() then gives
+each worker its own database connections, task queue and font registry.
+"""
+from app import create_app
+from config import db
+
+app = create_app()
+
+def warm_template_cache(flask_app):
+    """Compile every Jinja template up front so forked workers inherit the compiled cache"""
+    for name in flask_app.jinja_env.list_templates(extensions=['html']):
+        flask_app.jinja_env.get_template(name)
+
+def init_worker(flask_app=app):
+    """Per-worker initialization, run right after fork"""
+    from tasks import reset_after_fork
+    from blueprints.certificates.utils import reset_font_cache
+    
+    # Pooled connections opened in the master must never be used by two processes;
+    # close=False leaves the parent's sockets alone and just forgets them here
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    
+    reset_after_fork()
+    reset_font_cache()
+
+warm_template_cache(app)